@@ -0,0 +1,96 @@
+"""Shared helpers for the benchmark scripts: percentiles, result files, comparisons"""
+import atexit
+import importlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def import_main():
+    """Import main.py without touching the checkout.
+
+    Importing main creates subreddits.json, data/ files and cogs/__init__.py
+    in the working directory, so the import runs from a throwaway directory
+    and main's file paths are pointed there afterwards.
+    """
+    if "main" in sys.modules:
+        return sys.modules["main"]
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    workdir = tempfile.mkdtemp(prefix="bench-main-")
+    atexit.register(shutil.rmtree, workdir, True)
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        main = importlib.import_module("main")
+    finally:
+        os.chdir(cwd)
+    for name in ("SUB_FILE", "RESPONSES_FILE", "CACHE_FILE", "COMMAND_SYNC_FILE", "GUILD_CONFIG_FILE"):
+        setattr(main, name, os.path.join(workdir, getattr(main, name)))
+    main.command_sync.path = main.COMMAND_SYNC_FILE
+    main.guild_config.path = main.GUILD_CONFIG_FILE
+    return main
+
+def percentiles(samples: Iterable[float], points=(50, 95, 99)) -> Dict[str, float]:
+    """Nearest-rank percentiles, keyed "p50" etc."""
+    ordered = sorted(samples)
+    if not ordered:
+        return {f"p{p}": 0.0 for p in points}
+    return {
+        f"p{p}": ordered[min(len(ordered) - 1, max(0, -(-p * len(ordered) // 100) - 1))]
+        for p in points
+    }
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def environment() -> dict:
+    return {
+        "revision": git_revision(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+def write_results(name: str, results: dict, output: Optional[str] = None) -> str:
+    """Write results JSON (default bench/results/<name>.json) and return the path"""
+    path = output or os.path.join(RESULTS_DIR, f"{name}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    return path
+
+def _flatten(data: dict, prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in data.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+def compare(results: dict, baseline_path: str) -> Dict[str, tuple]:
+    """Print the % change of every numeric metric against an earlier results file"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    old, new = _flatten(baseline.get("metrics", {})), _flatten(results.get("metrics", {}))
+    changes = {}
+    print(f"Compared with {baseline_path} ({baseline.get('environment', {}).get('revision')}):")
+    for key in sorted(old.keys() & new.keys()):
+        change = (new[key] - old[key]) / old[key] * 100 if old[key] else 0.0
+        changes[key] = (old[key], new[key], change)
+        print(f"  {key:<40} {old[key]:>12.4g} -> {new[key]:>12.4g}  ({change:+.1f}%)")
+    return changes
@@ -0,0 +1,317 @@
+"""Offline stand-ins for asyncpraw and Discord objects used by the benchmarks"""
+import asyncio
+import itertools
+import json
+import os
+import random
+from typing import Dict, List, Optional
+
+import discord
+from discord.ext import commands
+
+FIXTURE_FILE = os.path.join(os.path.dirname(__file__), "fixtures", "listing.json")
+IMAGE_KINDS = ("image",)
+
+_ids = itertools.count(10 ** 17)
+
+def next_snowflake() -> int:
+    return next(_ids)
+
+# --- Reddit ---
+class FakePost:
+    __slots__ = ("id", "title", "url", "over_18", "stickied", "score", "subreddit")
+
+    def __init__(self, id, title, url, over_18, stickied, score, subreddit):
+        self.id = id
+        self.title = title
+        self.url = url
+        self.over_18 = over_18
+        self.stickied = stickied
+        self.score = score
+        self.subreddit = subreddit  # str() gives the name, like asyncpraw's Subreddit
+
+class FakeSubreddit:
+    def __init__(self, reddit: "FakeReddit", name: str):
+        self.reddit = reddit
+        self.display_name = name
+
+    def __str__(self):
+        return self.display_name
+
+    async def hot(self, limit: int = 100):
+        """Hot listing that drifts by `churn` posts per call, 100 posts per page"""
+        reddit = self.reddit
+        calls = reddit.listing_calls.get(self.display_name, 0)
+        reddit.listing_calls[self.display_name] = calls + 1
+        start = calls * reddit.churn
+        for i in range(limit):
+            if i % 100 == 0:
+                reddit.requests += 1
+                if reddit.latency:
+                    await asyncio.sleep(reddit.latency)
+            if i < reddit.stickies:
+                post = reddit.sticky(self.display_name, i)
+            else:
+                post = reddit.post(self.display_name, start + i)
+            reddit.examined += 1
+            yield post
+
+class FakeReddit:
+    """Deterministic asyncpraw.Reddit replacement built from recorded listing shapes.
+
+    Each subreddit is an endless, seeded stream of posts; the ratios control
+    how many are direct images, NSFW, or ids already in the posted cache.
+    """
+    def __init__(self, image_ratio: float = 0.6, nsfw_ratio: float = 0.1, dup_ratio: float = 0.05,
+                 stickies: int = 2, churn: int = 25, latency: float = 0.0, seed: int = 0,
+                 fixture_file: str = FIXTURE_FILE):
+        with open(fixture_file, "r", encoding="utf-8") as f:
+            templates = json.load(f)["posts"]
+        self.images = [t for t in templates if t["kind"] in IMAGE_KINDS]
+        self.others = [t for t in templates if t["kind"] not in IMAGE_KINDS]
+        self.image_ratio = image_ratio
+        self.nsfw_ratio = nsfw_ratio
+        self.dup_ratio = dup_ratio
+        self.stickies = stickies
+        self.churn = churn
+        self.latency = latency
+        self.seed = seed
+        # Ids the bot "already posted"; dup posts reuse these
+        self.posted_ids = [f"old{i:05d}" for i in range(500)]
+        self._posts: Dict[tuple, FakePost] = {}
+        self.listing_calls: Dict[str, int] = {}
+        self.requests = 0
+        self.examined = 0
+
+    async def subreddit(self, name: str) -> FakeSubreddit:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return FakeSubreddit(self, name)
+
+    def sticky(self, sub: str, n: int) -> FakePost:
+        key = (sub, "sticky", n)
+        if key not in self._posts:
+            self._posts[key] = FakePost(
+                f"{sub[:4]}s{n}", "Weekly discussion thread", f"https://www.reddit.com/r/{sub}/comments/s{n}/",
+                False, True, 1, sub
+            )
+        return self._posts[key]
+
+    def post(self, sub: str, n: int) -> FakePost:
+        key = (sub, n)
+        if key not in self._posts:
+            rng = random.Random(f"{self.seed}:{sub}:{n}")
+            template = rng.choice(self.images if rng.random() < self.image_ratio else self.others)
+            if rng.random() < self.dup_ratio:
+                post_id = rng.choice(self.posted_ids)
+            else:
+                post_id = f"{sub[:4]}{n:07d}"
+            url = template["url"].format(id=post_id, sub=sub)
+            self._posts[key] = FakePost(
+                post_id, template["title"], url, rng.random() < self.nsfw_ratio, False, template["score"], sub
+            )
+        return self._posts[key]
+
+    def reset_counters(self):
+        self.requests = 0
+        self.examined = 0
+
+# --- Discord ---
+AVATAR_BASE = "https://cdn.example.invalid/avatars"  # Point at a local server to serve real images
+
+class FakeAsset:
+    def __init__(self, key: str):
+        self.key = key
+
+    @property
+    def url(self) -> str:
+        return f"{AVATAR_BASE}/{self.key}.png"
+
+    def replace(self, **kwargs) -> "FakeAsset":
+        return self
+
+    async def read(self) -> bytes:
+        raise discord.NotFound(_FakeHTTPResponse(404), "Unknown asset")
+
+class _FakeHTTPResponse:
+    def __init__(self, status: int):
+        self.status = status
+        self.reason = "Fake"
+
+class FakeUser:
+    def __init__(self, user_id: Optional[int] = None, name: str = "user", bot: bool = False):
+        self.id = user_id or next_snowflake()
+        self.name = name
+        self.display_name = name
+        self.bot = bot
+        self.mention = f"<@{self.id}>"
+        self.display_avatar = FakeAsset(str(self.id % 16))
+
+    def __str__(self):
+        return self.name
+
+class FakeMessage:
+    def __init__(self, channel: "FakeChannel", content: str = "", embed=None, embeds=None, files=None,
+                 author: Optional[FakeUser] = None):
+        self.id = next_snowflake()
+        self.channel = channel
+        self.guild = channel.guild
+        self.content = content
+        self.embeds = embeds or ([embed] if embed else [])
+        self.files = files or []
+        self.author = author
+        self.created_at = discord.utils.utcnow()
+        self.edited_at = None
+        self.attachments = []
+        self.reference = None
+        self.reactions: List[str] = []
+
+    async def add_reaction(self, emoji):
+        await self.channel.api_call("add_reaction")
+        self.reactions.append(str(emoji))
+
+    async def delete(self, delay: Optional[float] = None):
+        await self.channel.api_call("delete")
+
+    async def edit(self, **kwargs):
+        await self.channel.api_call("edit")
+        return self
+
+class FakeGuild:
+    def __init__(self, guild_id: Optional[int] = None, name: str = "guild"):
+        self.id = guild_id or next_snowflake()
+        self.name = name
+
+class FakeChannel:
+    """Text channel that records sends; `latency` stands in for the Discord API"""
+    def __init__(self, nsfw: bool = False, latency: float = 0.0, guild: Optional[FakeGuild] = None,
+                 name: str = "general", bot_user: Optional[FakeUser] = None):
+        self.id = next_snowflake()
+        self.name = name
+        self.bot_user = bot_user or FakeUser(name="bot", bot=True)
+        self.nsfw = nsfw
+        self.latency = latency
+        self.guild = guild
+        self.sent: List[FakeMessage] = []
+        self.api_calls = 0
+        self.keep = 50  # Recent messages kept, so long runs stay flat in memory
+
+    def is_nsfw(self) -> bool:
+        return self.nsfw
+
+    async def api_call(self, route: str):
+        self.api_calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def send(self, content: str = "", **kwargs) -> FakeMessage:
+        await self.api_call("send")
+        return self.record(FakeMessage(self, content, author=self.bot_user, **_message_kwargs(kwargs)))
+
+    def record(self, msg: FakeMessage) -> FakeMessage:
+        self.sent.append(msg)
+        del self.sent[:-self.keep]
+        return msg
+
+    async def history(self, limit: Optional[int] = 100, before=None):
+        """Newest first, like TextChannel.history"""
+        await self.api_call("history")
+        before_id = getattr(before, "id", before)
+        count = 0
+        for msg in reversed(self.sent):
+            if before_id is not None and msg.id >= before_id:
+                continue
+            yield msg
+            count += 1
+            if limit is not None and count >= limit:
+                return
+
+    def typing(self):
+        return _NullContext()
+
+def _message_kwargs(kwargs: dict) -> dict:
+    files = kwargs.get("files") or ([kwargs["file"]] if kwargs.get("file") else None)
+    return {"embed": kwargs.get("embed"), "embeds": kwargs.get("embeds"), "files": files}
+
+class _NullContext:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+class FakeResponse:
+    """interaction.response: one initial response, then is_done() is True"""
+    def __init__(self, interaction: "FakeInteraction"):
+        self.interaction = interaction
+        self._done = False
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def _respond(self):
+        if self._done:
+            raise RuntimeError("Interaction has already been responded to")
+        self._done = True
+        await self.interaction.channel.api_call("interaction_response")
+
+    async def send_message(self, content: str = "", **kwargs):
+        await self._respond()
+        channel = self.interaction.channel
+        self.interaction.original = channel.record(
+            FakeMessage(channel, content, author=channel.bot_user, **_message_kwargs(kwargs))
+        )
+
+    async def defer(self, **kwargs):
+        await self._respond()
+
+class FakeFollowup:
+    def __init__(self, interaction: "FakeInteraction"):
+        self.interaction = interaction
+
+    async def send(self, content: str = "", **kwargs) -> FakeMessage:
+        return await self.interaction.channel.send(content, **kwargs)
+
+class FakeNamespace:
+    """interaction.namespace: missing options read as None"""
+    def __init__(self, **options):
+        self.__dict__.update(options)
+
+    def __getattr__(self, name):
+        return None
+
+class FakeInteraction:
+    def __init__(self, channel: FakeChannel, user: Optional[FakeUser] = None, **options):
+        self.id = next_snowflake()
+        self.channel = channel
+        self.guild = channel.guild
+        self.user = user or FakeUser()
+        self.namespace = FakeNamespace(**options)
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
+        self.original: Optional[FakeMessage] = None
+
+    async def original_response(self) -> FakeMessage:
+        await self.channel.api_call("original_response")
+        return self.original
+
+class FakeContext(commands.Context):
+    """Prefix-command context over a fake message; isinstance(ctx, Context) still holds"""
+    def __init__(self, bot, channel: FakeChannel, author: FakeUser, content: str = "",
+                 invoked_with: Optional[str] = None, command=None):
+        self.bot = bot
+        self.message = channel.record(FakeMessage(channel, content, author=author))
+        self.prefix = "s!"
+        self.command = command
+        self.invoked_with = invoked_with or (command.name if command else None)
+        self.args = []
+        self.kwargs = {}
+
+    async def send(self, content: str = "", delete_after: Optional[float] = None, **kwargs) -> FakeMessage:
+        return await self.channel.send(content, **kwargs)
+
+    async def reply(self, content: str = "", **kwargs) -> FakeMessage:
+        return await self.send(content, **kwargs)
+
+    def typing(self, **kwargs):
+        return _NullContext()
@@ -0,0 +1,354 @@
+"""Concurrent load simulator for the bot's slash and prefix commands.
+
+Run from the repository root:
+
+    python -m bench.load_test --users 50 100 200 400 --stage-seconds 10 --api-latency 0.05
+
+The real cogs are loaded into main.py's bot (without logging in) and their
+command callbacks are driven by simulated users spread over fake guilds.
+nekos.best and avatar downloads hit a local aiohttp server and Reddit is
+bench.fakes.FakeReddit, each with configurable latency. For every stage
+(number of concurrent users) the run records throughput, per-command latency
+percentiles and event-loop lag; the saturation point is the first stage where
+throughput stops growing or loop lag crosses --lag-threshold-ms.
+
+Cooldowns and other command checks are bypassed: callbacks are invoked
+directly so the numbers show handler cost, not rate limiting.
+"""
+import argparse
+import asyncio
+import io
+import logging
+import os
+import random
+import tempfile
+import time
+from collections import Counter, defaultdict
+from typing import Callable, Dict, List
+
+import discord
+from aiohttp import web
+from PIL import Image
+
+from bench import fakes
+from bench.common import compare, environment, import_main, percentiles, write_results
+
+COGS = ("math", "Colors", "capture", "Senpaiuwu", "user_emotes", "self_emotes")
+
+SAMPLE_TEXT = [
+    "hello there, how is everyone doing today?",
+    "I really love this server, the memes are top tier",
+    "```py\nprint('code blocks should survive uwuification')\n```",
+    "Unicode test: 日本語のテキスト and emoji 🎉🔥✨",
+    "Long message " + "lorem ipsum dolor sit amet " * 30,
+]
+EXPRESSIONS = ["2^64 + sqrt(2)", "sin(pi/4) * cos(pi/3)", "factorial(200) / factorial(198)", "log(1000, 10) + exp(2)"]
+COLORS = ["#ff8800", "red", "light blue", "rgb(12, 200, 99)", "xkcd:puke green", "#123"]
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, nargs="+", default=[25, 50, 100, 200, 400],
+                        help="Concurrent simulated users per stage")
+    parser.add_argument("--guilds", type=int, default=50, help="Fake guilds (one channel each)")
+    parser.add_argument("--stage-seconds", type=float, default=8.0)
+    parser.add_argument("--think-ms", type=float, default=200.0, help="Mean pause between a user's commands")
+    parser.add_argument("--api-latency", type=float, default=0.03, help="Seconds per nekos/avatar request")
+    parser.add_argument("--reddit-latency", type=float, default=0.1, help="Seconds per fake Reddit request")
+    parser.add_argument("--discord-latency", type=float, default=0.03, help="Seconds per fake Discord API call")
+    parser.add_argument("--lag-threshold-ms", type=float, default=50.0, help="Loop lag p95 that counts as saturated")
+    parser.add_argument("--only", nargs="+", help="Only run these operations")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Results JSON path (default bench/results/load_test.json)")
+    parser.add_argument("--compare", help="Earlier results JSON to diff against")
+    return parser.parse_args(argv)
+
+# --- Local stand-ins for nekos.best and the avatar CDN ---
+def _avatar_png(seed: int) -> bytes:
+    img = Image.new("RGB", (128, 128), tuple(random.Random(seed).randrange(256) for _ in range(3)))
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+async def start_stand_ins(latency: float):
+    avatars = {str(i): _avatar_png(i) for i in range(16)}
+
+    async def nekos(request):
+        await asyncio.sleep(latency)
+        action = request.match_info["action"]
+        return web.json_response({"results": [{"url": f"https://nekos.example.invalid/{action}/001.gif"}]})
+
+    async def avatar(request):
+        await asyncio.sleep(latency)
+        data = avatars.get(request.match_info["key"])
+        return web.Response(body=data, content_type="image/png") if data else web.Response(status=404)
+
+    app = web.Application()
+    app.router.add_get("/api/v2/{action}", nekos)
+    app.router.add_get("/avatars/{key}.png", avatar)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+# --- Event loop lag ---
+class LagMonitor:
+    """Samples how late a short sleep wakes up; lag spikes are blamed on in-flight commands"""
+    def __init__(self, interval: float = 0.01, blame_threshold_ms: float = 20.0):
+        self.interval = interval
+        self.blame_threshold_ms = blame_threshold_ms
+        self.samples: List[float] = []
+        self.in_flight: Counter = Counter()
+        self.blame: Counter = Counter()
+        self._task = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = (time.perf_counter() - started - self.interval) * 1000
+            self.samples.append(lag)
+            if lag >= self.blame_threshold_ms:
+                running = +self.in_flight
+                total = sum(running.values())
+                for name, count in running.items():
+                    self.blame[name] += lag * count / total
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    def reset(self):
+        self.samples.clear()
+        self.blame.clear()
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+# --- Simulation ---
+class Simulation:
+    def __init__(self, bot, main, args):
+        self.bot = bot
+        self.main = main
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.guilds = []
+        for g in range(args.guilds):
+            guild = fakes.FakeGuild(name=f"guild-{g}")
+            channel = fakes.FakeChannel(latency=args.discord_latency, guild=guild, nsfw=g % 5 == 0)
+            guild.channel = channel
+            guild.members = [fakes.FakeUser(name=f"user{g}-{i}") for i in range(20)]
+            for i, user in enumerate(guild.members[:10]):
+                channel.record(fakes.FakeMessage(channel, SAMPLE_TEXT[i % len(SAMPLE_TEXT)], author=user))
+            self.guilds.append(guild)
+        self.operations: Dict[str, Callable] = {
+            "/calc": self.op_calc,
+            "/factorial": self.op_factorial,
+            "/convert": self.op_convert,
+            "/numstats": self.op_numstats,
+            "/color": self.op_color,
+            "/complementary": self.op_complementary,
+            "/meme": self.op_meme,
+            "/stats": self.op_stats,
+            "s!uwu": self.op_uwu,
+            "s!convo": self.op_convo,
+            "s!capture": self.op_capture,
+            "s!hug": self.op_hug,
+            "s!smile": self.op_smile,
+            "s!roast": self.op_roast,
+        }
+        self.weights = {
+            "/calc": 8, "/factorial": 3, "/convert": 8, "/numstats": 4, "/color": 10, "/complementary": 4,
+            "/meme": 10, "/stats": 2, "s!uwu": 10, "s!convo": 4, "s!capture": 5,
+            "s!hug": 12, "s!smile": 10, "s!roast": 6,
+        }
+        if args.only:
+            self.operations = {name: op for name, op in self.operations.items() if name in args.only}
+
+    # Helpers
+    async def slash(self, name: str, guild, user, **kwargs):
+        cmd = self.bot.tree.get_command(name)
+        interaction = fakes.FakeInteraction(guild.channel, user, **kwargs)
+        if cmd.binding is not None:
+            await cmd.callback(cmd.binding, interaction, **kwargs)
+        else:
+            await cmd.callback(interaction, **kwargs)
+
+    async def prefix(self, name: str, guild, user, *args, invoked_with=None, **kwargs):
+        cmd = self.bot.get_command(name)
+        content = f"s!{invoked_with or name} " + " ".join(map(str, args))
+        ctx = fakes.FakeContext(self.bot, guild.channel, user, content, invoked_with=invoked_with, command=cmd)
+        await cmd.callback(cmd.cog, ctx, *args, **kwargs)
+
+    # Operations
+    async def op_calc(self, guild, user):
+        await self.slash("calc", guild, user, expression=self.rng.choice(EXPRESSIONS))
+
+    async def op_factorial(self, guild, user):
+        await self.slash("factorial", guild, user, number=self.rng.randint(50, 3000))
+
+    async def op_convert(self, guild, user):
+        values = " ".join(str(self.rng.uniform(0, 500)) for _ in range(self.rng.randint(1, 20)))
+        units = self.rng.choice([("km", "mi"), ("c", "f"), ("GiB", "MB"), ("lb", "kg"), ("mph", "km/h")])
+        await self.slash("convert", guild, user, values=values, from_unit=units[0], to_unit=units[1])
+
+    async def op_numstats(self, guild, user):
+        numbers = " ".join(str(self.rng.gauss(50, 10)) for _ in range(self.rng.randint(10, 400)))
+        await self.slash("numstats", guild, user, numbers=numbers)
+
+    async def op_color(self, guild, user):
+        await self.slash("color", guild, user, color=self.rng.choice(COLORS))
+
+    async def op_complementary(self, guild, user):
+        await self.slash("complementary", guild, user, color=self.rng.choice(COLORS))
+
+    async def op_meme(self, guild, user):
+        await self.slash("meme", guild, user)
+
+    async def op_stats(self, guild, user):
+        await self.slash("stats", guild, user)
+
+    async def op_uwu(self, guild, user):
+        await self.prefix("uwu", guild, user, text=self.rng.choice(SAMPLE_TEXT))
+
+    async def op_convo(self, guild, user):
+        await self.prefix("convo", guild, user, self.rng.randint(2, 10))
+
+    async def op_capture(self, guild, user):
+        # Post something fresh so the render cache doesn't answer every capture
+        guild.channel.record(fakes.FakeMessage(
+            guild.channel, f"{self.rng.choice(SAMPLE_TEXT)} #{self.rng.randrange(10 ** 6)}", author=user
+        ))
+        await self.prefix("capture", guild, user)
+
+    async def op_hug(self, guild, user):
+        await self.prefix("useremote", guild, user, self.rng.choice(guild.members), invoked_with="hug")
+
+    async def op_smile(self, guild, user):
+        await self.prefix("emote", guild, user, invoked_with="smile")
+
+    async def op_roast(self, guild, user):
+        await self.prefix("roast", guild, user, self.rng.choice(guild.members))
+
+    async def user_loop(self, deadline: float, monitor: LagMonitor, latencies, errors):
+        guild = self.rng.choice(self.guilds)
+        user = self.rng.choice(guild.members)
+        names = list(self.operations)
+        weights = [self.weights[name] for name in names]
+        while time.perf_counter() < deadline:
+            name = self.rng.choices(names, weights)[0]
+            monitor.in_flight[name] += 1
+            started = time.perf_counter()
+            try:
+                await self.operations[name](guild, user)
+            except Exception as e:
+                errors[f"{name}: {type(e).__name__}"] += 1
+            finally:
+                monitor.in_flight[name] -= 1
+            latencies[name].append((time.perf_counter() - started) * 1000)
+            await asyncio.sleep(self.rng.expovariate(1000 / self.args.think_ms) if self.args.think_ms else 0)
+
+    async def stage(self, users: int, monitor: LagMonitor) -> dict:
+        latencies = defaultdict(list)
+        errors = Counter()
+        monitor.reset()
+        deadline = time.perf_counter() + self.args.stage_seconds
+        started = time.perf_counter()
+        await asyncio.gather(*(self.user_loop(deadline, monitor, latencies, errors) for _ in range(users)))
+        elapsed = time.perf_counter() - started
+        completed = sum(len(v) for v in latencies.values())
+        return {
+            "users": users,
+            "completed": completed,
+            "throughput_per_s": completed / elapsed,
+            "loop_lag_ms": {**percentiles(monitor.samples), "max": max(monitor.samples, default=0.0)},
+            "commands": {
+                name: {"count": len(samples), **percentiles(samples)}
+                for name, samples in sorted(latencies.items())
+            },
+            "lag_blame_ms": dict(monitor.blame.most_common(5)),
+            "errors": dict(errors),
+        }
+
+def find_saturation(stages: List[dict], lag_threshold_ms: float):
+    """First stage whose throughput grew <10% over the previous one, or whose loop lag p95 is too high"""
+    for previous, stage in zip([None] + stages, stages):
+        if stage["loop_lag_ms"]["p95"] > lag_threshold_ms:
+            return stage["users"], f"loop lag p95 {stage['loop_lag_ms']['p95']:.0f}ms"
+        if previous and stage["throughput_per_s"] < previous["throughput_per_s"] * 1.1:
+            return stage["users"], (f"throughput flat ({previous['throughput_per_s']:.0f}/s -> "
+                                    f"{stage['throughput_per_s']:.0f}/s)")
+    return None, "not reached"
+
+async def run(args) -> dict:
+    main = import_main()  # Imported late, from a temp dir: module import creates the bot and data files
+    bot = main.bot
+
+    runner, base = await start_stand_ins(args.api_latency)
+    fakes.AVATAR_BASE = f"{base}/avatars"
+    workdir = tempfile.mkdtemp(prefix="loadtest-")
+    main.CACHE_FILE = os.path.join(workdir, "cache.json")
+    main.reddit = fakes.FakeReddit(latency=args.reddit_latency, seed=args.seed)
+    main.posted_ids.clear()
+    main.posted_queue.clear()
+    bot.start_time = discord.utils.utcnow()
+
+    for name in COGS:
+        await bot.load_extension(f"cogs.{name}")
+    for cog_name in ("SelfEmotes", "UserEmotes"):
+        bot.get_cog(cog_name).api_base = f"{base}/api/v2"
+
+    sim = Simulation(bot, main, args)
+    monitor = LagMonitor(blame_threshold_ms=args.lag_threshold_ms / 2)
+    monitor.start()
+    stages = []
+    try:
+        for users in args.users:
+            stage = await sim.stage(users, monitor)
+            stages.append(stage)
+            lag = stage["loop_lag_ms"]
+            print(f"{users:>5} users: {stage['throughput_per_s']:7.1f} cmd/s, loop lag p95 {lag['p95']:6.1f}ms "
+                  f"max {lag['max']:6.1f}ms, errors {sum(stage['errors'].values())}")
+    finally:
+        await monitor.stop()
+        for name in COGS:
+            await bot.unload_extension(f"cogs.{name}")
+        await runner.cleanup()
+
+    saturation, reason = find_saturation(stages, args.lag_threshold_ms)
+    return {"stages": stages, "saturation_users": saturation, "saturation_reason": reason}
+
+def _print_stage_detail(stage: dict):
+    print(f"\nPer-command latency at {stage['users']} users (ms):")
+    for name, cmd in sorted(stage["commands"].items(), key=lambda item: -item[1]["p95"]):
+        print(f"  {name:<16} n={cmd['count']:<6} p50 {cmd['p50']:8.1f}  p95 {cmd['p95']:8.1f}  p99 {cmd['p99']:8.1f}")
+    if stage["lag_blame_ms"]:
+        print("Loop lag blamed on: " + ", ".join(f"{name} ({ms:.0f}ms)" for name, ms in stage["lag_blame_ms"].items()))
+    for error, count in stage["errors"].items():
+        print(f"  ! {error} x{count}")
+
+def main_cli(argv=None):
+    args = _parse_args(argv)
+    logging.getLogger().setLevel(logging.WARNING)
+    metrics = asyncio.run(run(args))
+    if metrics["stages"]:
+        _print_stage_detail(metrics["stages"][-1])
+    print(f"\nSaturation point: {metrics['saturation_users'] or '-'} users ({metrics['saturation_reason']})")
+
+    results = {
+        "benchmark": "load_test",
+        "environment": environment(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        "metrics": metrics,
+    }
+    path = write_results("load_test", results, args.output)
+    print(f"Results written to {path}")
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main_cli()
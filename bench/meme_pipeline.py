@@ -0,0 +1,134 @@
+"""Offline end-to-end benchmark of fetch_random_meme -> make_embed -> post_meme.
+
+Run from the repository root:
+
+    python -m bench.meme_pipeline --memes 500 --image-ratio 0.4 --compare bench/results/meme_pipeline.json
+
+Reddit is replaced by bench.fakes.FakeReddit (seeded, built from
+bench/fixtures/listing.json) and Discord by fake interactions/channels, so
+numbers only depend on the bot's own code and the configured latencies.
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from bench import fakes
+from bench.common import compare, environment, import_main, percentiles, write_results
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--memes", type=int, default=300, help="Memes to post per run")
+    parser.add_argument("--concurrency", type=int, default=1, help="post_meme calls in flight at once")
+    parser.add_argument("--image-ratio", type=float, default=0.6, help="Share of posts that are direct images")
+    parser.add_argument("--nsfw-ratio", type=float, default=0.1, help="Share of posts marked NSFW")
+    parser.add_argument("--dup-ratio", type=float, default=0.05, help="Share of posts already in the posted cache")
+    parser.add_argument("--nsfw-channel", action="store_true", help="Post into an NSFW channel")
+    parser.add_argument("--reddit-latency", type=float, default=0.0, help="Seconds per fake Reddit request")
+    parser.add_argument("--discord-latency", type=float, default=0.0, help="Seconds per fake Discord API call")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-tracemalloc", action="store_true", help="Skip the allocation-tracking pass")
+    parser.add_argument("--output", help="Results JSON path (default bench/results/meme_pipeline.json)")
+    parser.add_argument("--compare", help="Earlier results JSON to diff against")
+    return parser.parse_args(argv)
+
+def _setup(main, args, workdir: str) -> fakes.FakeReddit:
+    """Point main.py's globals at the fakes and a throwaway cache file"""
+    reddit = fakes.FakeReddit(
+        image_ratio=args.image_ratio, nsfw_ratio=args.nsfw_ratio, dup_ratio=args.dup_ratio,
+        latency=args.reddit_latency, seed=args.seed
+    )
+    main.reddit = reddit
+    main.CACHE_FILE = os.path.join(workdir, "cache.json")
+    main.posted_queue.clear()
+    main.posted_ids.clear()
+    for post_id in reddit.posted_ids:
+        main.posted_queue.append(post_id)
+        main.posted_ids.add(post_id)
+    main.meme_scores.clear()
+    random.seed(args.seed)
+    return reddit
+
+async def _run(main, args, reddit: fakes.FakeReddit) -> dict:
+    channel = fakes.FakeChannel(nsfw=args.nsfw_channel, latency=args.discord_latency)
+    latencies = []
+    failures = 0
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one():
+        nonlocal failures
+        async with semaphore:
+            started = time.perf_counter()
+            ok = await main.post_meme(interaction=fakes.FakeInteraction(channel))
+            latencies.append((time.perf_counter() - started) * 1000)
+            failures += not ok
+
+    reddit.reset_counters()
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(args.memes)))
+    elapsed = time.perf_counter() - started
+    delivered = args.memes - failures
+    return {
+        "elapsed_s": elapsed,
+        "delivered": delivered,
+        "failures": failures,
+        "memes_per_s": delivered / elapsed if elapsed else 0.0,
+        "scan_efficiency": reddit.examined / delivered if delivered else None,
+        "reddit_requests_per_meme": reddit.requests / delivered if delivered else None,
+        "discord_calls_per_meme": channel.api_calls / delivered if delivered else None,
+        "latency_ms": percentiles(latencies),
+    }
+
+async def _allocations(main, args, workdir: str) -> dict:
+    """Second, traced run: allocations per delivered meme"""
+    reddit = _setup(main, args, workdir)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    run = await _run(main, args, reddit)
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    blocks = sum(max(0, s.count_diff) for s in stats)
+    size = sum(max(0, s.size_diff) for s in stats)
+    delivered = max(1, run["delivered"])
+    return {
+        "retained_blocks_per_meme": blocks / delivered,
+        "retained_bytes_per_meme": size / delivered,
+        "peak_traced_kb": peak / 1024,
+    }
+
+def main_cli(argv=None):
+    args = _parse_args(argv)
+    main = import_main()  # Imported late, from a temp dir: module import creates the bot and data files
+
+    with tempfile.TemporaryDirectory() as workdir:
+        reddit = _setup(main, args, workdir)
+        metrics = asyncio.run(_run(main, args, reddit))
+        if not args.no_tracemalloc:
+            metrics["allocations"] = asyncio.run(_allocations(main, args, workdir))
+
+    results = {
+        "benchmark": "meme_pipeline",
+        "environment": environment(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        "metrics": metrics,
+    }
+    path = write_results("meme_pipeline", results, args.output)
+    lat = metrics["latency_ms"]
+    print(f"{metrics['delivered']} memes in {metrics['elapsed_s']:.2f}s: {metrics['memes_per_s']:.1f}/s, "
+          f"{metrics['scan_efficiency'] or 0:.1f} posts examined per meme, "
+          f"p50 {lat['p50']:.2f}ms p95 {lat['p95']:.2f}ms p99 {lat['p99']:.2f}ms")
+    if "allocations" in metrics:
+        alloc = metrics["allocations"]
+        print(f"Allocations: {alloc['retained_blocks_per_meme']:.1f} blocks / "
+              f"{alloc['retained_bytes_per_meme']:.0f} B retained per meme, peak {alloc['peak_traced_kb']:.0f} KB")
+    print(f"Results written to {path}")
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main_cli()
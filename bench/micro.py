@@ -0,0 +1,213 @@
+"""Micro-benchmarks for per-invocation hot paths, checked against stored baselines.
+
+Run from the repository root:
+
+    python -m bench.micro                      # compare with bench/baselines.json, exit 1 on regression
+    python -m bench.micro --update-baseline    # re-record baselines on this machine
+    python -m bench.micro --only owoify.long
+
+Each benchmark reports the best per-call time over several batches and the
+peak traced allocation of a single call. A result fails when it is more than
+--time-threshold slower or --alloc-threshold larger than its baseline.
+Timings are machine-specific, so re-record baselines on the machine that runs
+the check.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from bench import fakes
+from bench.common import environment, import_main, write_results
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "baselines.json")
+
+LONG_TEXT = (
+    "Hello there! This is a really long message that keeps going, with lots of r and l sounds, "
+    "the the the, thoughtful love and more. Are you reading this? Nothing to see here... "
+) * 10
+CODE_TEXT = (
+    "Check this out:\n```py\nfor line in lines:\n    print(line.strip())\n```\nand `inline_code()` too! "
+    "Really clever, no? Then the loop ends.\n"
+) * 8
+UNICODE_TEXT = (
+    "日本語のテキストとemoji 🎉🔥✨ mixed with Ünïcödé, العربية, עברית and 한국어 — "
+    "plus zalgo-ish c̷o̷m̷b̷i̷n̷i̷n̷g marks. "
+) * 8
+
+COLOR_INPUTS = [
+    "#000", "#FFF", "#ffffff", "000000", "#7f7f7f", "red", "Light Blue", "rebeccapurple",
+    "xkcd:puke green", "x11:gray", "rgb(0, 0, 0)", "rgb(255,255,255)", "rgb(300, 0, 0)",
+    "not a color", "#12345", "  #AbCdEf  ",
+]
+# Near-black/near-white/greys and saturated primaries stress the ΔE2000 hue terms
+EDGE_COLORS = [
+    0x000000, 0xFFFFFF, 0x010101, 0xFEFEFE, 0x808080, 0x7F7F80, 0xFF0000, 0x00FF00, 0x0000FF,
+    0xFFFF00, 0x00FFFF, 0xFF00FF, 0x123456, 0xABCDEF, 0x0F0F0F, 0xF0F0F0,
+]
+NUMBERS = [0, 1, -1, 3.0, 2.5, 1 / 3, -123456.789, 1e-9, 1e21, 12345678901234567890, float("inf"), float("nan")]
+
+def _cycle(func: Callable, inputs: List) -> Callable:
+    """One call per input, so per-call time is the average over the set"""
+    def run():
+        for item in inputs:
+            func(item)
+    run.calls = len(inputs)
+    return run
+
+def build_benchmarks(loop: asyncio.AbstractEventLoop) -> Dict[str, Callable]:
+    """Construct the cogs once and return name -> zero-arg callable"""
+    from cogs.Senpaiuwu import SenpaiUwU
+    from cogs.capture import Capture
+    from cogs.Colors import ColorsCog
+    from cogs.math import MathCog
+    from utils.color_names import get_color_index
+    from utils import random_gen
+    main = import_main()
+
+    async def make(cls):
+        return cls(None)
+
+    uwu, capture, colors, math_cog = (loop.run_until_complete(make(cls)) for cls in (SenpaiUwU, Capture, ColorsCog, MathCog))
+    benchmarks = {}
+
+    def seeded(func):
+        # owoify is random; a fixed seed keeps the work identical between runs
+        def run(text):
+            random.seed(1234)
+            return func(text)
+        return run
+
+    benchmarks["owoify.long"] = _cycle(seeded(uwu.owoify), [LONG_TEXT])
+    benchmarks["owoify.code_blocks"] = _cycle(seeded(uwu.owoify), [CODE_TEXT])
+    benchmarks["owoify.unicode"] = _cycle(seeded(uwu.owoify), [UNICODE_TEXT])
+
+    capture._get_fonts()  # Font loading is a one-off, not part of the hot path
+    benchmarks["capture.render_text_image.long"] = _cycle(lambda t: capture.render_text_image("Senpai", t), [LONG_TEXT])
+    benchmarks["capture.render_text_image.unicode"] = _cycle(
+        lambda t: capture.render_text_image("Senpai", t), [UNICODE_TEXT]
+    )
+    benchmarks["capture.create_text_image"] = _cycle(
+        lambda t: loop.run_until_complete(capture.create_text_image("Senpai", t)), [CODE_TEXT]
+    )
+
+    index = get_color_index()
+    benchmarks["colors.parse_color_input"] = _cycle(colors.parse_color_input, COLOR_INPUTS)
+    benchmarks["colors.get_color_embed"] = _cycle(colors.get_color_embed, EDGE_COLORS)
+    benchmarks["colors.nearest_uncached"] = _cycle(index._nearest, EDGE_COLORS)
+
+    benchmarks["math.format_number"] = _cycle(math_cog.format_number, NUMBERS)
+    # Unique draws from a huge range: peak memory must follow the count, not the range
+    benchmarks["random_gen.unique_sample.wide"] = _cycle(
+        lambda span: random_gen.unique_sample(np.random.default_rng(1234), 0, span, 10_000), [200_000_000]
+    )
+
+    posts = [
+        fakes.FakePost("abc1234", "When the code works on the first try " * 10, "https://i.redd.it/abc1234.jpg",
+                       False, False, 100, "memes"),
+        fakes.FakePost("def5678", "Nah bro 💀", "https://i.imgur.com/def5678.gifv", False, False, 5, "dankmemes"),
+    ]
+    benchmarks["main.make_embed"] = _cycle(main.make_embed, posts)
+    return benchmarks
+
+def measure(run: Callable, min_batch_seconds: float = 0.05, repeats: int = 5) -> dict:
+    """Best per-call time (µs) and peak allocation of one call (bytes)"""
+    run()  # Warm caches and lazy imports
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            run()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_batch_seconds or loops >= 1 << 16:
+            break
+        loops *= 2
+
+    best = elapsed
+    for _ in range(repeats - 1):
+        gc.collect()
+        started = time.perf_counter()
+        for _ in range(loops):
+            run()
+        best = min(best, time.perf_counter() - started)
+
+    gc.collect()
+    tracemalloc.start()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "time_us": best / loops / run.calls * 1e6,
+        "peak_bytes": max(0, peak - current) / run.calls,
+    }
+
+def check(results: Dict[str, dict], baselines: Dict[str, dict], time_threshold: float, alloc_threshold: float) -> List[str]:
+    """Descriptions of every benchmark that regressed past its threshold"""
+    failures = []
+    for name, result in results.items():
+        base = baselines.get(name)
+        if not base:
+            continue
+        if result["time_us"] > base["time_us"] * (1 + time_threshold):
+            failures.append(f"{name}: {result['time_us']:.2f}µs vs baseline {base['time_us']:.2f}µs")
+        # Small absolute slack so a few bytes of noise don't fail tiny benchmarks
+        if result["peak_bytes"] > base["peak_bytes"] * (1 + alloc_threshold) + 256:
+            failures.append(f"{name}: {result['peak_bytes']:.0f}B peak vs baseline {base['peak_bytes']:.0f}B")
+    return failures
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", nargs="+", help="Run only these benchmarks (name prefixes)")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--update-baseline", action="store_true", help="Record these results as the new baseline")
+    parser.add_argument("--time-threshold", type=float, default=0.25, help="Allowed slowdown (0.25 = 25%%)")
+    parser.add_argument("--alloc-threshold", type=float, default=0.10, help="Allowed peak allocation growth")
+    parser.add_argument("--output", help="Results JSON path (default bench/results/micro.json)")
+    return parser.parse_args(argv)
+
+def main_cli(argv=None) -> int:
+    args = _parse_args(argv)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    benchmarks = build_benchmarks(loop)
+    if args.only:
+        benchmarks = {name: run for name, run in benchmarks.items() if name.startswith(tuple(args.only))}
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baselines = json.load(f).get("benchmarks", {})
+
+    results = {}
+    for name, run in benchmarks.items():
+        results[name] = measure(run)
+        base = baselines.get(name)
+        change = f"{(results[name]['time_us'] / base['time_us'] - 1) * 100:+6.1f}%" if base else "   new"
+        print(f"{name:<38} {results[name]['time_us']:>10.2f}µs {change}   peak {results[name]['peak_bytes'] / 1024:8.1f} KB")
+    loop.close()
+
+    write_results("micro", {"benchmark": "micro", "environment": environment(), "metrics": results}, args.output)
+    if args.update_baseline:
+        merged = {**baselines, **results}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"environment": environment(), "benchmarks": merged}, f, indent=2, sort_keys=True)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    failures = check(results, baselines, args.time_threshold, args.alloc_threshold)
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -2,25 +2,44 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 import random
+import asyncio
 import re
+import io
 import colorsys
-from typing import Optional
+import logging
+from typing import List, Optional, Sequence, Tuple
+from PIL import Image
+from utils.autocomplete import PrefixIndex
+from utils.color_names import get_color_index
+from utils.lru import LRUCache
+from utils.workers import PoolBusy, get_pool
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_LINK_RE = re.compile(r'discord(?:app)?\.com/channels/(?:\d+|@me)/(\d+)/(\d+)')
+
+SWATCH_SIZE = 200
+SWATCH_FALLBACK_URL = "https://singlecolorimage.com/get/{hex}/200x200"  # Used when the render pool is busy
+GRADIENT_SIZE = (400, 80)
 
 class ColorsCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.color_services = [
-            "https://singlecolorimage.com/get/{hex}/200x200",
-            "https://dummyimage.com/200x200/{hex}/{hex}",
-            "https://via.placeholder.com/200/{hex}?text=+"
-        ]
-        self.named_colors = {
-            "red": 0xFF0000, "green": 0x00FF00, "blue": 0x0000FF,
-            "yellow": 0xFFFF00, "purple": 0x800080, "orange": 0xFFA500,
-            "pink": 0xFFC0CB, "cyan": 0x00FFFF, "brown": 0xA52A2A,
-            "white": 0xFFFFFF, "black": 0x000000, "gray": 0x808080,
-            "silver": 0xC0C0C0, "gold": 0xFFD700, "violet": 0xEE82EE
-        }
+        self.render_pool = get_pool("render", max_workers=2, max_queue=8)
+        # Swatches are deterministic, so PNG bytes are cached by (kind, colors)
+        self.swatch_cache = LRUCache(
+            "color_swatches",
+            max_items=1024,
+            max_bytes=4 * 1024 * 1024
+        )
+        # Extracted palettes keyed by attachment id / avatar hash and color count
+        self.palette_cache = LRUCache("color_palettes", max_items=512)
+        self.max_palette_bytes = 8 * 1024 * 1024
+        self._name_index: Optional[PrefixIndex] = None  # Built during warm-up or on first autocomplete
+
+    async def warm_up(self):
+        """Build the color-name indexes off the event loop"""
+        self._name_index = await asyncio.to_thread(lambda: PrefixIndex(get_color_index().names()))
 
     async def ensure_allowed_channel(self, interaction: discord.Interaction) -> bool:
         """No channel restrictions anymore"""
@@ -30,9 +49,10 @@ class ColorsCog(commands.Cog):
         """Parse various color formats into an integer value"""
         input_str = input_str.strip().lower()
         
-        # Named color
-        if input_str in self.named_colors:
-            return self.named_colors[input_str]
+        # Named color (CSS4, X11 or XKCD; "xkcd:" etc. picks a palette)
+        named = get_color_index().lookup(input_str)
+        if named is not None:
+            return named
             
         # Hex code
         if re.match(r'^#?([a-f0-9]{6}|[a-f0-9]{3})$', input_str):
@@ -56,37 +76,105 @@ class ColorsCog(commands.Cog):
         r, g, b = (color_value >> 16) & 0xFF, (color_value >> 8) & 0xFF, color_value & 0xFF
         h, s, v = colorsys.rgb_to_hsv(r/255, g/255, b/255)
         
-        # Pick first image service
-        image_url = self.color_services[0].format(hex=hex_code)
-        
         embed = discord.Embed(title=f"🎨 {title}", color=color_value)
         embed.add_field(name="HEX", value=f"`#{hex_code}`", inline=True)
         embed.add_field(name="RGB", value=f"`rgb({r}, {g}, {b})`", inline=True)
         embed.add_field(name="HSV", value=f"`hsv({int(h*360)}°, {int(s*100)}%, {int(v*100)}%)`", inline=False)
         
-        # Find closest named color
-        closest_name, closest_diff = None, float('inf')
-        for name, value in self.named_colors.items():
-            diff = sum(abs((value >> i & 0xFF) - (color_value >> i & 0xFF)) for i in (16, 8, 0))
-            if diff < closest_diff:
-                closest_name, closest_diff = name, diff
-        
-        if closest_diff < 100:
-            embed.add_field(name="Closest Named", value=f"**{closest_name.capitalize()}**", inline=True)
+        # Find closest named color (perceptual ΔE2000 distance)
+        closest = get_color_index().nearest(color_value)
+        if closest and closest[2] < 10:
+            closest_name, closest_value, delta_e = closest
+            exact = " (exact)" if closest_value == color_value else f" · ΔE {delta_e:.1f}"
+            embed.add_field(name="Closest Named", value=f"**{closest_name.title()}**{exact}", inline=True)
         
-        embed.set_thumbnail(url=image_url)
+        embed.set_thumbnail(url=f"attachment://{self.swatch_name(color_value)}")
         embed.set_footer(text=f"Color Value: {color_value}")
         return embed
 
+    # --- Swatch rendering ---
+    @staticmethod
+    def _rgb(color_value: int) -> Tuple[int, int, int]:
+        return (color_value >> 16) & 0xFF, (color_value >> 8) & 0xFF, color_value & 0xFF
+
+    def swatch_name(self, color_value: int) -> str:
+        """Attachment name the color embed thumbnail points at"""
+        return f"swatch_{color_value:06X}.png"
+
+    def render_swatch(self, kind: str, colors: Sequence[int]) -> bytes:
+        """Render a solid swatch, palette strip or gradient (blocking)"""
+        if kind == "solid":
+            img = Image.new("RGB", (SWATCH_SIZE, SWATCH_SIZE), self._rgb(colors[0]))
+        elif kind == "palette":
+            width, height = GRADIENT_SIZE
+            img = Image.new("RGB", (width, height))
+            band = width / len(colors)
+            for i, color_value in enumerate(colors):
+                img.paste(self._rgb(color_value), (int(i * band), 0, int((i + 1) * band), height))
+        else:
+            # Build one row by linear interpolation between stops, then stretch it
+            width, height = GRADIENT_SIZE
+            stops = [self._rgb(c) for c in colors]
+            row = Image.new("RGB", (width, 1))
+            segments = len(stops) - 1
+            pixels = []
+            for x in range(width):
+                pos = x / (width - 1) * segments
+                i = min(int(pos), segments - 1)
+                t = pos - i
+                pixels.append(tuple(round(a + (b - a) * t) for a, b in zip(stops[i], stops[i + 1])))
+            row.putdata(pixels)
+            img = row.resize((width, height), Image.NEAREST)
+        buf = io.BytesIO()
+        img.save(buf, format="PNG", optimize=True)
+        return buf.getvalue()
+
+    async def get_swatch_file(self, colors: Sequence[int], kind: str = "solid", filename: Optional[str] = None) -> discord.File:
+        """Return a swatch attachment, rendering it in the worker pool on a cache miss"""
+        key = (kind, tuple(colors))
+        swatch = self.swatch_cache.get(key)
+        if swatch is None:
+            swatch = await self.render_pool.run(self.render_swatch, kind, tuple(colors))
+            self.swatch_cache.put(key, swatch)
+        filename = filename or f"{kind}_{'_'.join(f'{c:06X}' for c in colors)}.png"
+        return discord.File(io.BytesIO(swatch), filename=filename)
+
+    async def send_color_embeds(self, interaction: discord.Interaction, color_values: List[int],
+                                embeds: List[discord.Embed], extra_files: Sequence[discord.File] = ()):
+        """Send color embeds along with the swatch files their thumbnails reference"""
+        files = []
+        try:
+            for color_value in dict.fromkeys(color_values):
+                files.append(await self.get_swatch_file([color_value], filename=self.swatch_name(color_value)))
+        except PoolBusy as e:
+            # Still answer, with hosted thumbnails instead of rendered ones
+            logger.warning(f"Swatches not rendered: {e}")
+            files = []
+            for embed, color_value in zip(embeds, color_values):
+                embed.set_thumbnail(url=SWATCH_FALLBACK_URL.format(hex=f"{color_value:06X}"))
+        await interaction.response.send_message(embeds=embeds, files=[*files, *extra_files])
+
+    # --- Autocomplete ---
+    async def color_autocomplete(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+        """Suggest color names as the user types"""
+        if self._name_index is None:
+            self._name_index = PrefixIndex(get_color_index().names())
+        color_index = get_color_index()
+        return [
+            app_commands.Choice(name=f"{name} · #{color_index.lookup(name):06X}", value=name)
+            for name in self._name_index.complete(current, limit=25)
+        ]
+
     # --- Color Commands ---
     @app_commands.command(name="randomcolor", description="Generate a random color with preview")
     async def random_color(self, interaction: discord.Interaction):
         color_value = random.randint(0, 0xFFFFFF)
         embed = self.get_color_embed(color_value, "Random Color")
-        await interaction.response.send_message(embed=embed)
+        await self.send_color_embeds(interaction, [color_value], [embed])
 
     @app_commands.command(name="color", description="Preview a color from hex, name, or RGB")
     @app_commands.describe(color="Hex code, color name, or RGB value (e.g. #FF5733, red, rgb(255,87,51))")
+    @app_commands.autocomplete(color=color_autocomplete)
     async def color_preview(self, interaction: discord.Interaction, color: str):
         color_value = self.parse_color_input(color)
         if color_value is None:
@@ -100,10 +188,11 @@ class ColorsCog(commands.Cog):
             return
             
         embed = self.get_color_embed(color_value)
-        await interaction.response.send_message(embed=embed)
+        await self.send_color_embeds(interaction, [color_value], [embed])
 
     @app_commands.command(name="complementary", description="Get complementary color for a given color")
     @app_commands.describe(color="Base color in hex, name, or RGB")
+    @app_commands.autocomplete(color=color_autocomplete)
     async def complementary_color(self, interaction: discord.Interaction, color: str):
         color_value = self.parse_color_input(color)
         if color_value is None:
@@ -118,8 +207,136 @@ class ColorsCog(commands.Cog):
         
         base_embed = self.get_color_embed(color_value, "Base Color")
         comp_embed = self.get_color_embed(comp_value, "Complementary Color")
+        try:
+            gradient = await self.get_swatch_file([color_value, comp_value], kind="gradient")
+        except PoolBusy as e:
+            logger.warning(f"Gradient not rendered: {e}")
+            extra_files = []
+        else:
+            comp_embed.set_image(url=f"attachment://{gradient.filename}")
+            extra_files = [gradient]
         
-        await interaction.response.send_message(embeds=[base_embed, comp_embed])
+        await self.send_color_embeds(interaction, [color_value, comp_value], [base_embed, comp_embed], extra_files)
+
+    # --- Palette extraction ---
+    @staticmethod
+    def extract_palette(data: bytes, count: int) -> List[Tuple[int, float]]:
+        """Top `count` dominant colors with their share of the image (blocking)"""
+        img = Image.open(io.BytesIO(data))
+        img.draft("RGB", (256, 256))  # JPEG decodes straight to a reduced size
+        if img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info:
+            # Flatten onto white, or transparent pixels would all count as black
+            rgba = img.convert("RGBA")
+            img = Image.new("RGB", rgba.size, (255, 255, 255))
+            img.paste(rgba, mask=rgba.getchannel("A"))
+        else:
+            img = img.convert("RGB")
+        img.thumbnail((128, 128))
+        # Median cut runs in C over the whole downsampled image in one pass
+        quantized = img.quantize(colors=count, method=Image.Quantize.MEDIANCUT)
+        palette = quantized.getpalette()
+        total = img.width * img.height
+        colors = sorted(quantized.getcolors(maxcolors=256), reverse=True)
+        result = []
+        for pixels, index in colors[:count]:
+            r, g, b = palette[index * 3:index * 3 + 3]
+            result.append(((r << 16) | (g << 8) | b, pixels / total))
+        return result
+
+    async def _palette_source(self, interaction: discord.Interaction, image: Optional[discord.Attachment],
+                              message: Optional[str], user: Optional[discord.User]):
+        """Resolve the command options to (cache key, async reader, label)"""
+        if image is None and message:
+            match = MESSAGE_LINK_RE.search(message)
+            channel = self.bot.get_channel(int(match.group(1))) if match else None
+            if channel is None:
+                return None
+            # Only messages the invoking user could read themselves, and never from another server
+            if interaction.guild is None:
+                if channel.id != interaction.channel_id:
+                    return None
+            elif (getattr(channel, "guild", None) != interaction.guild
+                    or not channel.permissions_for(interaction.user).read_message_history):
+                return None
+            try:
+                target = await channel.fetch_message(int(match.group(2)))
+            except discord.HTTPException:
+                return None
+            image = next(
+                (att for att in target.attachments if (att.content_type or "").startswith("image/")),
+                None
+            )
+            if image is None:
+                return None
+
+        if image is not None:
+            if not (image.content_type or "").startswith("image/") or image.size > self.max_palette_bytes:
+                return None
+            return ("attachment", image.id), image.read, image.filename
+
+        avatar = (user or interaction.user).display_avatar.replace(format="png", size=256)
+        return ("avatar", avatar.key), avatar.read, f"{(user or interaction.user).display_name}'s avatar"
+
+    @app_commands.command(name="palette", description="Extract the dominant colors from an image or avatar")
+    @app_commands.describe(
+        image="Image to analyse",
+        message="Link to a message with an image",
+        user="Use this user's avatar (default: yours)",
+        count="How many colors to extract (default: 5)"
+    )
+    async def palette(
+        self,
+        interaction: discord.Interaction,
+        image: Optional[discord.Attachment] = None,
+        message: Optional[str] = None,
+        user: Optional[discord.User] = None,
+        count: app_commands.Range[int, 2, 10] = 5
+    ):
+        await interaction.response.defer()  # Fetching a linked message can take longer than Discord waits
+        source = await self._palette_source(interaction, image, message, user)
+        if source is None:
+            await interaction.followup.send(
+                f"❌ Couldn't find an image there (max {self.max_palette_bytes // (1024 * 1024)} MB)",
+                ephemeral=True
+            )
+            return
+        key, read, label = source
+
+        colors = self.palette_cache.get((*key, count))
+        if colors is None:
+            try:
+                data = await read()
+                colors = await self.render_pool.run(self.extract_palette, data, count)
+            except PoolBusy:
+                await interaction.followup.send("⏳ Too many images in progress, try again in a moment", ephemeral=True)
+                return
+            except (discord.HTTPException, OSError, Image.DecompressionBombError) as e:
+                logger.error(f"Palette extraction failed: {e}")
+                await interaction.followup.send("❌ Couldn't read that image", ephemeral=True)
+                return
+            self.palette_cache.put((*key, count), colors)
+
+        index = get_color_index()
+        lines = []
+        for color_value, share in colors:
+            closest = index.nearest(color_value)
+            name = f" · {closest[0].title()}" if closest and closest[2] < 10 else ""
+            lines.append(f"`#{color_value:06X}` {share:.0%}{name}")
+
+        embed = discord.Embed(
+            title=f"🎨 Palette of {label}",
+            description="\n".join(lines),
+            color=colors[0][0]
+        )
+        try:
+            strip = await self.get_swatch_file([c for c, _ in colors], kind="palette")
+        except Exception as e:
+            # The colors are already listed, so send them without the strip
+            logger.warning(f"Palette strip not rendered: {e}")
+            await interaction.followup.send(embed=embed)
+            return
+        embed.set_image(url=f"attachment://{strip.filename}")
+        await interaction.followup.send(embed=embed, file=strip)
 
     def adjust_hsv(self, h: float, s: float, v: float,
                    h_delta: float = 0, s_delta: float = 0, v_delta: float = 0) -> int:
@@ -1,14 +1,21 @@
 import discord
 from discord.ext import commands
 import re
+import codecs
 import asyncio
+import aiohttp
 import random
 import logging
-from typing import Optional
+from typing import AsyncIterator, List, Optional, Tuple
+from utils.tracing import trace_config
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+MESSAGE_LINK_RE = re.compile(
+    r'https?://(?:(?:ptb|canary)\.)?discord(?:app)?\.com/channels/(?:\d+|@me)/(\d+)/(\d+)'
+)
+
 class SenpaiUwU(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -23,6 +30,22 @@ class SenpaiUwU(commands.Cog):
         self.stutter_chance = 0.25  # Chance to add stutter
         self.face_chance = 0.4      # Chance to add uwu face
 
+        # Bulk mode limits
+        self.session = None                    # Streams text attachments; created in cog_load
+        self.max_bulk_messages = 200           # Messages per range request
+        self.max_attachment_bytes = 2_000_000  # Largest text attachment accepted
+        self.chunk_size = 1500                 # Input characters per owoify batch
+        self.page_limit = 4000                 # Embed description limit is 4096
+        self.max_pages = 15                    # Output messages per request
+
+    async def cog_load(self):
+        self.session = aiohttp.ClientSession(trace_configs=[trace_config()])
+
+    async def cog_unload(self):
+        """Clean up the aiohttp session when cog unloads"""
+        if self.session:
+            await self.session.close()
+
     def owoify(self, text: str) -> str:
         """Advanced OwOify text transformation with multiple rules"""
         # Preserve code blocks
@@ -136,5 +159,211 @@ class SenpaiUwU(commands.Cog):
                 delete_after=retry_after
             )
 
+    # --- Bulk uwuification ---
+    def _owoify_batch(self, items: List[Tuple[Optional[str], str]]) -> str:
+        """Owoify a batch of (author, text) pairs into one block of output"""
+        parts = []
+        for author, content in items:
+            uwu_text = discord.utils.escape_mentions(self.owoify(content))
+            parts.append(f"**{author}:** {uwu_text}" if author else uwu_text)
+        return "\n".join(parts)
+
+    async def _iter_recent(self, ctx, count: int) -> AsyncIterator[List[Tuple[Optional[str], str]]]:
+        """Yield the last `count` messages before the command, oldest first"""
+        # history() walks newest-first, so the (bounded) window is reversed here
+        recent = [
+            (msg.author.display_name, msg.content)
+            async for msg in ctx.channel.history(limit=count, before=ctx.message)
+            if not msg.author.bot and msg.content.strip()
+        ]
+        recent.reverse()
+        for batch in self._batch_messages(recent):
+            yield batch
+
+    async def _iter_range(self, channel, first_id: int, last_id: int) -> AsyncIterator[List[Tuple[Optional[str], str]]]:
+        """Yield messages between two message ids (inclusive), oldest first"""
+        if first_id > last_id:
+            first_id, last_id = last_id, first_id
+        batch, size = [], 0
+        async for msg in channel.history(
+            limit=self.max_bulk_messages,
+            after=discord.Object(id=first_id - 1),
+            before=discord.Object(id=last_id + 1),
+            oldest_first=True
+        ):
+            if msg.author.bot or not msg.content.strip():
+                continue
+            batch.append((msg.author.display_name, msg.content))
+            size += len(msg.content)
+            if size >= self.chunk_size:
+                yield batch
+                batch, size = [], 0
+        if batch:
+            yield batch
+
+    def _batch_messages(self, messages: List[Tuple[str, str]]) -> List[List[Tuple[Optional[str], str]]]:
+        """Group messages into batches of roughly `chunk_size` characters"""
+        batches, batch, size = [], [], 0
+        for author, content in messages:
+            batch.append((author, content))
+            size += len(content)
+            if size >= self.chunk_size:
+                batches.append(batch)
+                batch, size = [], 0
+        if batch:
+            batches.append(batch)
+        return batches
+
+    async def _iter_attachment(self, attachment: discord.Attachment) -> AsyncIterator[List[Tuple[Optional[str], str]]]:
+        """Stream a text attachment and yield it in line-aligned chunks"""
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        pending = ""
+        async with self.session.get(attachment.url, timeout=aiohttp.ClientTimeout(total=30)) as resp:
+            resp.raise_for_status()
+            async for raw in resp.content.iter_chunked(16384):
+                pending += decoder.decode(raw)
+                while len(pending) >= self.chunk_size:
+                    cut = self._find_cut(pending)
+                    yield [(None, pending[:cut])]
+                    pending = pending[cut:]
+        pending += decoder.decode(b"", final=True)
+        if pending.strip():
+            yield [(None, pending)]
+
+    def _find_cut(self, text: str) -> int:
+        """Pick a split point near `chunk_size` that doesn't break a code block"""
+        cut = text.rfind("\n", 0, self.chunk_size)
+        if cut <= 0:
+            cut = text.rfind(" ", 0, self.chunk_size)
+        if cut <= 0:
+            cut = self.chunk_size
+        # An odd number of fences means we'd be cutting inside a code block
+        if text.count("```", 0, cut) % 2:
+            fence_end = text.find("```", text.rfind("```", 0, cut) + 3)
+            if fence_end != -1 and fence_end + 3 <= self.chunk_size * 2:
+                cut = fence_end + 3
+        return cut
+
+    def _split_page(self, text: str) -> List[str]:
+        """Split an oversized block into pieces that fit one embed"""
+        pieces = []
+        while len(text) > self.page_limit:
+            cut = text.rfind("\n", 0, self.page_limit)
+            if cut <= 0:
+                cut = text.rfind(" ", 0, self.page_limit)
+            if cut <= 0:
+                cut = self.page_limit
+            pieces.append(text[:cut])
+            text = text[cut:].lstrip("\n")
+        if text:
+            pieces.append(text)
+        return pieces
+
+    async def _send_page(self, ctx, text: str, page: int):
+        """Send one page of bulk output"""
+        embed = discord.Embed(description=text, color=random.randint(0, 0xFFFFFF))
+        if page == 1:
+            embed.set_author(
+                name=f"{ctx.author.display_name} wequested a buwk uwuification:",
+                icon_url=ctx.author.display_avatar.url
+            )
+        embed.set_footer(text=f"Page {page} | Powered by SenpaiUwU magic! ✨")
+        await ctx.send(embed=embed)
+
+    async def _stream_uwu(self, ctx, source: AsyncIterator[List[Tuple[Optional[str], str]]]) -> int:
+        """Owoify batches from `source` off the event loop and send them as pages"""
+        buffer, pages = "", 0
+        try:
+            async for batch in source:
+                block = await asyncio.to_thread(self._owoify_batch, batch)
+                for piece in self._split_page(block):
+                    if buffer and len(buffer) + len(piece) + 1 > self.page_limit:
+                        pages += 1
+                        await self._send_page(ctx, buffer, pages)
+                        buffer = ""
+                        if pages >= self.max_pages:
+                            await ctx.send(f"⚠️ Stopped after {pages} pages, that's a wot of text! >w<", delete_after=10)
+                            return pages
+                    buffer = f"{buffer}\n{piece}" if buffer else piece
+        finally:
+            # Closes the attachment download early if we stopped partway
+            await source.aclose()
+        if buffer:
+            pages += 1
+            await self._send_page(ctx, buffer, pages)
+        return pages
+
+    @commands.command(
+        name="uwubulk",
+        aliases=["owobulk", "uwurange"],
+        description="Uwuify the last N messages, a range of messages, or a text file!"
+    )
+    @commands.cooldown(1, 30, commands.BucketType.user)
+    async def uwubulk_command(self, ctx, *args: str):
+        """Uwuify the last N messages, everything between two message links, or an attached text file"""
+        attachments = list(ctx.message.attachments)
+        ref = ctx.message.reference
+        if not attachments and ref and isinstance(ref.resolved, discord.Message):
+            attachments = list(ref.resolved.attachments)
+        text_files = [
+            att for att in attachments
+            if (att.content_type or "").startswith("text/") or att.filename.endswith((".txt", ".md", ".log"))
+        ]
+        links = [MESSAGE_LINK_RE.match(arg) for arg in args]
+
+        if text_files:
+            attachment = text_files[0]
+            if attachment.size > self.max_attachment_bytes:
+                await ctx.send(
+                    f"❌ That fiwe is too big! Max {self.max_attachment_bytes // 1_000_000} MB pwease ;w;",
+                    delete_after=10
+                )
+                return
+            source = self._iter_attachment(attachment)
+        elif len(args) == 2 and all(links):
+            (first_channel, first_id), (last_channel, last_id) = (m.groups() for m in links)
+            if first_channel != last_channel:
+                await ctx.send("❌ Both messages must be in the same channel! >w<", delete_after=10)
+                return
+            channel = self.bot.get_channel(int(first_channel))
+            # Never another server's (or another DM's) history, even if the author shares it with us
+            same_place = channel is not None and (
+                channel.id == ctx.channel.id if ctx.guild is None else getattr(channel, "guild", None) == ctx.guild
+            )
+            if not same_place or not channel.permissions_for(ctx.author).read_message_history:
+                await ctx.send("❌ I can't find that channel or yu can't wead it! ;w;", delete_after=10)
+                return
+            source = self._iter_range(channel, int(first_id), int(last_id))
+        elif len(args) <= 1 and all(arg.isdigit() for arg in args):
+            count = int(args[0]) if args else 10
+            if not 1 <= count <= self.max_bulk_messages:
+                await ctx.send(f"❌ Pick between 1 and {self.max_bulk_messages} messages pwease!", delete_after=10)
+                return
+            source = self._iter_recent(ctx, count)
+        else:
+            await ctx.send(
+                "❌ Usage: `s!uwubulk [count]`, `s!uwubulk <message link> <message link>` "
+                "ow attach a text fiwe OwO",
+                delete_after=15
+            )
+            return
+
+        try:
+            async with ctx.typing():
+                pages = await self._stream_uwu(ctx, source)
+            if not pages:
+                await ctx.send("❌ No text to uwuify! Pwease pwovide some text OwO", delete_after=10)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Failed to download attachment: {type(e).__name__} - {e}")
+            await ctx.send("❌ Couwdn't downwoad that fiwe! ;w;", delete_after=10)
+        except Exception as e:
+            logger.error(f"Bulk uwuification failed: {e}", exc_info=True)
+            await ctx.send("❌ Something went wrong with uwuification! ;w;", delete_after=10)
+
+    @uwubulk_command.error
+    async def uwubulk_error(self, ctx, error):
+        """Handle cooldown errors"""
+        await self.uwuify_error(ctx, error)
+
 async def setup(bot: commands.Bot):
     await bot.add_cog(SenpaiUwU(bot))
@@ -3,71 +3,108 @@ from discord.ext import commands
 from discord import app_commands
 import random
 import io
-from PIL import Image, ImageDraw, ImageFont
+import re
+import asyncio
+import aiohttp
+import threading
+from PIL import Image, ImageDraw
 import logging
+from typing import Dict, List, Optional, Tuple
+from utils.image_output import encode_for_upload
+from utils.lru import LRUCache
+from utils.text_layout import FontStack, load_font_stack
+from utils.workers import PoolBusy, get_pool
+from utils.tracing import trace_config
 
 logger = logging.getLogger(__name__)
 
+# Tried per glyph run, in order: monospace first, then wider Unicode/CJK/emoji coverage
+FONT_STACK = [
+    "DejaVuSansMono.ttf",
+    "consola.ttf",
+    "cour.ttf",
+    "Courier_New.ttf",
+    "DejaVuSans.ttf",
+    "NotoSansCJK-Regular.ttc",
+    "msgothic.ttc",
+    "NotoSansSymbols2-Regular.ttf",
+    "NotoEmoji-Regular.ttf",
+    "Symbola.ttf",
+    "seguiemj.ttf"
+]
+
+MESSAGE_LINK_RE = re.compile(r'discord(?:app)?\.com/channels/(?:\d+|@me)/(\d+)/(\d+)')
+
 class Capture(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.font_cache = {}
+        self._font_lock = threading.Lock()
         self.max_lines = 50
-        self.max_line_length = 80
+        self.max_text_width = 770  # Pixels; the canvas shrinks to fit shorter text
+        self.min_text_width = 200
         self.line_height = 20
         self.padding = 15
+        self.render_pool = get_pool("render", max_workers=2, max_queue=8)
+        # Encoded pages keyed by (message id, edited_at, render options)
+        self.image_cache = LRUCache(
+            "capture_images",
+            max_bytes=32 * 1024 * 1024,
+            sizeof=lambda pages: sum(len(data) for data, _ in pages)
+        )
+        self.max_upload_bytes = 8 * 1024 * 1024  # Safe under every guild's upload limit
+
+        # Conversation captures
+        self.max_convo_messages = 25
+        self.max_lines_per_message = 12
+        self.avatar_size = 40
+        self.session = None  # Fetches avatars; created in cog_load
+        # Decoded, circle-masked avatars keyed by avatar URL (RGBA, 4 bytes/pixel)
+        self.avatar_cache = LRUCache(
+            "capture_avatars",
+            max_bytes=8 * 1024 * 1024,
+            sizeof=lambda img: img.width * img.height * 4
+        )
+
+    async def cog_load(self):
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=8), trace_configs=[trace_config()]
+        )
+
+    async def cog_unload(self):
+        """Clean up the aiohttp session when cog unloads"""
+        if self.session:
+            await self.session.close()
+
+    async def warm_up(self):
+        """Load fonts before the first capture needs them"""
+        await self.render_pool.run(self._get_fonts)
 
     # --- Improved text image creation ---
-    async def create_text_image(self, author_name: str, text: str) -> discord.File:
-        """Create an image with formatted text content"""
-        # Load/create font with better error handling
-        if not self.font_cache:
-            font_names = [
-                "DejaVuSansMono.ttf", 
-                "consola.ttf", 
-                "cour.ttf", 
-                "Courier_New.ttf"
-            ]
-            for name in font_names:
-                try:
-                    self.font_cache['mono'] = ImageFont.truetype(name, 14)
-                    break
-                except IOError:
-                    continue
-            if 'mono' not in self.font_cache:
-                self.font_cache['mono'] = ImageFont.load_default()
-                logger.warning("Using fallback font for text rendering")
+    def _get_fonts(self) -> FontStack:
+        """Load the font stack once and reuse it (glyph metrics are cached on it)"""
+        with self._font_lock:
+            if 'stack' not in self.font_cache:
+                self.font_cache['stack'] = load_font_stack(FONT_STACK, 14)
+        return self.font_cache['stack']
 
-        font = self.font_cache['mono']
-        
-        # Process and wrap text
-        lines = []
-        for line in text.replace('\t', '    ').splitlines():
-            while line:
-                # Preserve leading spaces for code blocks
-                if len(line) > self.max_line_length:
-                    # Find last space within max length
-                    split_index = line.rfind(' ', 0, self.max_line_length)
-                    if split_index <= 0:
-                        split_index = self.max_line_length
-                    lines.append(line[:split_index])
-                    line = line[split_index:].lstrip()
-                else:
-                    lines.append(line)
-                    break
-                if len(lines) >= self.max_lines:
-                    break
-            if len(lines) >= self.max_lines:
-                break
+    def _wrap_lines(self, text: str, max_lines: Optional[int] = None, max_width: Optional[int] = None) -> list:
+        """Wrap text by rendered width and cap the line count"""
+        return self._get_fonts().wrap(text, max_width or self.max_text_width, max_lines or self.max_lines)
+
+    def _canvas_width(self, fonts: FontStack, lines: List[str], indent: int = 0) -> int:
+        """Narrowest canvas that fits the widest line"""
+        widest = max((fonts.measure(line) for line in lines), default=0)
+        return int(min(self.max_text_width, max(self.min_text_width, widest))) + indent + self.padding * 2
 
-        # Truncate if too many lines
-        if len(lines) >= self.max_lines:
-            lines = lines[:self.max_lines]
-            lines[-1] = lines[-1][:77] + "..." if len(lines[-1]) > 77 else lines[-1] + "..."
+    def render_text_image(self, author_name: str, text: str) -> Tuple[Tuple[bytes, str], ...]:
+        """Render the capture as encoded image pages (blocking, runs in the render pool)"""
+        fonts = self._get_fonts()
+        lines = self._wrap_lines(text)
 
         # Calculate image dimensions
         header = f"{author_name} said:"
-        width = 800
+        width = self._canvas_width(fonts, [header, *lines])
         height = (self.padding * 2) + self.line_height + (len(lines) * self.line_height)
 
         # Create image
@@ -76,19 +113,41 @@ class Capture(commands.Cog):
         y = self.padding
         
         # Draw header
-        draw.text((self.padding, y), header, font=font, fill=(0, 0, 0))
+        fonts.draw(draw, (self.padding, y), header, fill=(0, 0, 0))
         y += self.line_height
         
         # Draw content lines
         for line in lines:
-            draw.text((self.padding, y), line, font=font, fill=(0, 0, 0))
+            fonts.draw(draw, (self.padding, y), line, fill=(0, 0, 0))
             y += self.line_height
 
-        # Save to byte stream
-        buf = io.BytesIO()
-        img.save(buf, format='PNG')
-        buf.seek(0)
-        return discord.File(buf, filename="capture.png")
+        return tuple(encode_for_upload(img, self.max_upload_bytes))
+
+    def _to_files(self, pages: Tuple[Tuple[bytes, str], ...], stem: str) -> List[discord.File]:
+        """Wrap encoded pages as upload files; the first one goes in the embed"""
+        if len(pages) == 1:
+            data, ext = pages[0]
+            return [discord.File(io.BytesIO(data), filename=f"{stem}.{ext}")]
+        return [
+            discord.File(io.BytesIO(data), filename=f"{stem}_{i}.{ext}")
+            for i, (data, ext) in enumerate(pages, start=1)
+        ]
+
+    async def create_text_image(self, author_name: str, text: str, cache_key: Optional[tuple] = None) -> List[discord.File]:
+        """Create an image with formatted text content without blocking the event loop
+
+        Pass `cache_key` (e.g. message id and edit time) to reuse an earlier render.
+        """
+        if cache_key is not None:
+            cache_key = (*cache_key, author_name, self.max_lines, self.max_text_width)
+            pages = self.image_cache.get(cache_key)
+            if pages is not None:
+                return self._to_files(pages, "capture")
+
+        pages = await self.render_pool.run(self.render_text_image, author_name, text)
+        if cache_key is not None:
+            self.image_cache.put(cache_key, pages)
+        return self._to_files(pages, "capture")
 
     # --- Unified message reposting ---
     async def repost_message(self, ctx_or_interaction, target_message: discord.Message):
@@ -101,7 +160,7 @@ class Capture(commands.Cog):
         )
         embed.set_footer(text=f"In #{target_message.channel.name}")
 
-        file = None
+        files = []
         should_upload = False
 
         # Handle different content types
@@ -120,29 +179,208 @@ class Capture(commands.Cog):
         # Create text image if needed
         if should_upload:
             try:
-                file = await self.create_text_image(
+                files = await self.create_text_image(
                     target_message.author.display_name,
-                    target_message.content
+                    target_message.content,
+                    cache_key=(target_message.id, target_message.edited_at)
                 )
-                embed.set_image(url="attachment://capture.png")
+                embed.set_image(url=f"attachment://{files[0].filename}")
+            except PoolBusy as e:
+                logger.warning(f"Capture rejected: {e}")
+                await self._respond(ctx_or_interaction, "⏳ Too many captures in progress, try again in a moment", delete_after=10)
+                return
             except Exception as e:
                 logger.error(f"Image creation failed: {e}")
 
         # Handle no content case
-        if not embed.image and not file:
-            error_msg = "❌ Nothing to capture (no text/images)"
+        if not embed.image and not files:
+            await self._respond(ctx_or_interaction, "❌ Nothing to capture (no text/images)", delete_after=10)
+            return
+
+        # Send response
+        try:
             if isinstance(ctx_or_interaction, commands.Context):
-                await ctx_or_interaction.send(error_msg, delete_after=10)
+                await ctx_or_interaction.send(embed=embed, files=files)
+            elif ctx_or_interaction.response.is_done():
+                await ctx_or_interaction.followup.send(embed=embed, files=files)
+            else:
+                await ctx_or_interaction.response.send_message(embed=embed, files=files)
+        except discord.HTTPException as e:
+            logger.error(f"Failed to send message: {e}")
+
+    async def _respond(self, ctx_or_interaction, content: str, delete_after: float = None):
+        """Send a short notice for either command type"""
+        if isinstance(ctx_or_interaction, commands.Context):
+            await ctx_or_interaction.send(content, delete_after=delete_after)
+        elif ctx_or_interaction.response.is_done():
+            await ctx_or_interaction.followup.send(content, ephemeral=True)
+        else:
+            await ctx_or_interaction.response.send_message(content, ephemeral=True)
+
+    # --- Conversation capture ---
+    def _decode_avatar(self, data: bytes) -> Image.Image:
+        """Decode avatar bytes into a small circular RGBA image"""
+        size = self.avatar_size
+        avatar = Image.open(io.BytesIO(data)).convert("RGBA").resize((size, size), Image.LANCZOS)
+        mask = Image.new("L", (size, size), 0)
+        ImageDraw.Draw(mask).ellipse((0, 0, size - 1, size - 1), fill=255)
+        avatar.putalpha(mask)
+        return avatar
+
+    def _decode_avatars(self, downloads: Dict[str, bytes]) -> Dict[str, Image.Image]:
+        decoded = {}
+        for url, data in downloads.items():
+            try:
+                decoded[url] = self._decode_avatar(data)
+            except Exception as e:
+                logger.warning(f"Could not decode avatar {url}: {e}")
+        return decoded
+
+    async def _download(self, url: str) -> Optional[bytes]:
+        try:
+            async with self.session.get(url, timeout=aiohttp.ClientTimeout(total=5)) as resp:
+                if resp.status != 200:
+                    return None
+                return await resp.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning(f"Avatar download failed: {type(e).__name__} - {e}")
+            return None
+
+    async def _get_avatars(self, urls: List[str]) -> Dict[str, Image.Image]:
+        """Return decoded avatars, downloading any cache misses concurrently"""
+        avatars, missing = {}, []
+        for url in set(urls):
+            avatar = self.avatar_cache.get(url)
+            if avatar is None:
+                missing.append(url)
+            else:
+                avatars[url] = avatar
+
+        if missing:
+            results = await asyncio.gather(*(self._download(url) for url in missing))
+            downloads = {url: data for url, data in zip(missing, results) if data}
+            if downloads:
+                decoded = await self.render_pool.run(self._decode_avatars, downloads)
+                for url, avatar in decoded.items():
+                    self.avatar_cache.put(url, avatar)
+                avatars.update(decoded)
+        return avatars
+
+    def render_conversation(self, entries: List[dict]) -> Tuple[Tuple[bytes, str], ...]:
+        """Render several messages with avatars and names as encoded image pages (blocking)"""
+        fonts = self._get_fonts()
+        text_x = self.padding + self.avatar_size + 10
+        text_width = self.max_text_width - (text_x - self.padding)  # Leave room for the avatar column
+        blocks = []
+        for entry in entries:
+            lines = self._wrap_lines(entry["text"], self.max_lines_per_message, text_width) or [""]
+            block_height = max(self.avatar_size, self.line_height * (len(lines) + 1))
+            blocks.append((entry, lines, block_height))
+
+        all_lines = [line for entry, lines, _ in blocks for line in (entry["name"], *lines)]
+        width = min(self._canvas_width(fonts, all_lines, indent=text_x - self.padding), self.max_text_width + self.padding * 2)
+        height = self.padding * 2 + sum(h for _, _, h in blocks) + 10 * (len(blocks) - 1)
+        img = Image.new("RGB", (width, height), (255, 255, 255))
+        draw = ImageDraw.Draw(img)
+
+        y = self.padding
+        for entry, lines, block_height in blocks:
+            avatar = entry.get("avatar")
+            if avatar is not None:
+                img.paste(avatar, (self.padding, y), avatar)
             else:
-                await ctx_or_interaction.response.send_message(error_msg, ephemeral=True)
+                draw.ellipse(
+                    (self.padding, y, self.padding + self.avatar_size - 1, y + self.avatar_size - 1),
+                    fill=(200, 200, 200)
+                )
+            fonts.draw(draw, (text_x, y), entry["name"], fill=entry["color"])
+            line_y = y + self.line_height
+            for line in lines:
+                fonts.draw(draw, (text_x, line_y), line, fill=(0, 0, 0))
+                line_y += self.line_height
+            y += block_height + 10
+
+        return tuple(encode_for_upload(img, self.max_upload_bytes))
+
+    async def create_conversation_image(self, messages: List[discord.Message]) -> List[discord.File]:
+        """Render a list of messages (oldest first) into one image"""
+        cache_key = ("convo", tuple((m.id, m.edited_at, m.author.display_name) for m in messages))
+        pages = self.image_cache.get(cache_key)
+        if pages is None:
+            avatar_urls = [m.author.display_avatar.replace(format="png", size=64).url for m in messages]
+            avatars = await self._get_avatars(avatar_urls)
+            entries = []
+            for message, url in zip(messages, avatar_urls):
+                color = message.author.color if isinstance(message.author, discord.Member) else discord.Color.default()
+                text = message.content or ("[attachment]" if message.attachments else "[no text]")
+                entries.append({
+                    "name": message.author.display_name,
+                    "color": color.to_rgb() if color.value else (0, 0, 0),
+                    "text": text,
+                    "avatar": avatars.get(url)
+                })
+            pages = await self.render_pool.run(self.render_conversation, entries)
+            self.image_cache.put(cache_key, pages)
+        return self._to_files(pages, "conversation")
+
+    async def _reply_chain(self, message: discord.Message, limit: int) -> List[discord.Message]:
+        """Follow replies upwards from `message`, returning the chain oldest first"""
+        chain = [message]
+        while len(chain) < limit and message.reference and message.reference.message_id:
+            parent = message.reference.resolved
+            if not isinstance(parent, discord.Message):
+                try:
+                    parent = await message.channel.fetch_message(message.reference.message_id)
+                except discord.HTTPException:
+                    break
+            chain.append(parent)
+            message = parent
+        chain.reverse()
+        return chain
+
+    async def _recent_messages(self, channel, limit: int, end: Optional[discord.Message] = None,
+                               skip_id: Optional[int] = None) -> List[discord.Message]:
+        """Last `limit` non-bot messages, ending at `end` if given, oldest first"""
+        before = discord.Object(id=end.id + 1) if end else None
+        messages = [
+            msg async for msg in channel.history(limit=limit + 1, before=before)
+            if not msg.author.bot and msg.id != skip_id
+        ][:limit]
+        messages.reverse()
+        return messages
+
+    async def repost_conversation(self, ctx_or_interaction, messages: List[discord.Message]):
+        """Send a conversation capture for both command types"""
+        if not messages:
+            await self._respond(ctx_or_interaction, "❌ No messages found to capture", delete_after=10)
             return
 
-        # Send response
+        try:
+            files = await self.create_conversation_image(messages)
+        except PoolBusy as e:
+            logger.warning(f"Conversation capture rejected: {e}")
+            await self._respond(ctx_or_interaction, "⏳ Too many captures in progress, try again in a moment", delete_after=10)
+            return
+        except Exception as e:
+            logger.error(f"Conversation image creation failed: {e}", exc_info=True)
+            await self._respond(ctx_or_interaction, "❌ Failed to capture that conversation", delete_after=10)
+            return
+
+        embed = discord.Embed(
+            description=f"📸 Captured {len(messages)} messages",
+            color=random.randint(0, 0xFFFFFF),
+            timestamp=messages[-1].created_at
+        )
+        embed.set_image(url=f"attachment://{files[0].filename}")
+        embed.set_footer(text=f"In #{messages[-1].channel.name}")
+
         try:
             if isinstance(ctx_or_interaction, commands.Context):
-                await ctx_or_interaction.send(embed=embed, file=file)
+                await ctx_or_interaction.send(embed=embed, files=files)
+            elif ctx_or_interaction.response.is_done():
+                await ctx_or_interaction.followup.send(embed=embed, files=files)
             else:
-                await ctx_or_interaction.response.send_message(embed=embed, file=file)
+                await ctx_or_interaction.response.send_message(embed=embed, files=files)
         except discord.HTTPException as e:
             logger.error(f"Failed to send message: {e}")
 
@@ -178,29 +416,107 @@ class Capture(commands.Cog):
         except discord.Forbidden:
             pass
 
+    @commands.command(name="convo", aliases=["conversation", "capconvo"])
+    async def convo_prefix(self, ctx: commands.Context, count: int = 5):
+        """Capture the last few messages, or the reply chain of the replied message"""
+        count = max(2, min(count, self.max_convo_messages))
+        ref = ctx.message.reference
+        async with ctx.typing():
+            if ref and isinstance(ref.resolved, discord.Message):
+                messages = await self._reply_chain(ref.resolved, count)
+            else:
+                messages = await self._recent_messages(ctx.channel, count, skip_id=ctx.message.id)
+            await self.repost_conversation(ctx, messages)
+        try:
+            await ctx.message.delete(delay=3)
+        except discord.Forbidden:
+            pass
+
     # --- Slash Command ---
+    async def _resolve_message(self, interaction: discord.Interaction, reference: str) -> Optional[discord.Message]:
+        """Resolve a message link or ID to a message the invoking user can read"""
+        match = MESSAGE_LINK_RE.search(reference)
+        if match:
+            channel = self.bot.get_channel(int(match.group(1)))
+            message_id = int(match.group(2))
+        elif reference.strip().isdigit():
+            channel = interaction.channel
+            message_id = int(reference.strip())
+        else:
+            return None
+        if channel is None:
+            return None
+        # Only messages the invoking user could read themselves, and never from another server
+        if interaction.guild is None:
+            if channel.id != interaction.channel_id:
+                return None
+        elif (getattr(channel, "guild", None) != interaction.guild
+                or not channel.permissions_for(interaction.user).read_message_history):
+            return None
+        try:
+            return await channel.fetch_message(message_id)
+        except (discord.NotFound, discord.Forbidden):
+            return None
+
     @app_commands.command(name="capture", description="Capture a message/media and repost as the bot")
-    @app_commands.describe(message="Message to capture (leave blank for most recent)")
+    @app_commands.describe(message="Message link or ID to capture (leave blank for most recent)")
     async def capture_slash(
         self, 
         interaction: discord.Interaction,
-        message: discord.Message = None
+        message: Optional[str] = None
     ):
         """Slash command version with message option"""
         await interaction.response.defer()
         
-        if not message:
+        target_message = None
+        if message:
+            target_message = await self._resolve_message(interaction, message)
+        else:
             # Find recent non-bot message
             async for msg in interaction.channel.history(limit=10):
                 if not msg.author.bot:
-                    message = msg
+                    target_message = msg
                     break
 
-        if not message:
+        if not target_message:
             await interaction.followup.send("❌ No message found to capture", ephemeral=True)
             return
 
-        await self.repost_message(interaction, message)
+        await self.repost_message(interaction, target_message)
+
+    @app_commands.command(name="captureconvo", description="Capture several messages or a reply chain as one image")
+    @app_commands.describe(
+        count="How many messages to include (default: 5)",
+        message="Message link or ID to end at (leave blank for most recent)",
+        chain="Follow the reply chain of the message instead of recent history"
+    )
+    async def captureconvo_slash(
+        self,
+        interaction: discord.Interaction,
+        count: app_commands.Range[int, 2, 25] = 5,
+        message: Optional[str] = None,
+        chain: bool = False
+    ):
+        """Slash command version of conversation capture"""
+        if chain and not message:
+            await interaction.response.send_message(
+                "❌ `chain` needs a `message` link or ID to follow replies from", ephemeral=True
+            )
+            return
+        await interaction.response.defer()
+
+        end = None
+        if message:
+            end = await self._resolve_message(interaction, message)
+            if end is None:
+                await interaction.followup.send("❌ No message found to capture", ephemeral=True)
+                return
+
+        if chain:
+            messages = await self._reply_chain(end, count)
+        else:
+            messages = await self._recent_messages(end.channel if end else interaction.channel, count, end=end)
+        await self.repost_conversation(interaction, messages)
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(Capture(bot))
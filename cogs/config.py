@@ -0,0 +1,116 @@
+import discord
+from discord import app_commands
+from discord.ext import commands
+import logging
+from typing import Literal, Optional
+from utils.guild_config import MAX_SUBREDDITS, GuildSettings
+
+logger = logging.getLogger(__name__)
+
+class GuildConfigCog(commands.Cog):
+    """Per-server settings for scheduled memes (needs Manage Server)"""
+    config = app_commands.Group(
+        name="config",
+        description="Server settings for the meme bot",
+        guild_only=True,
+        default_permissions=discord.Permissions(manage_guild=True)
+    )
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    @property
+    def store(self):
+        return self.bot.guild_config
+
+    def settings_embed(self, guild: discord.Guild, settings: GuildSettings) -> discord.Embed:
+        embed = discord.Embed(title=f"⚙️ Settings for {guild.name}", color=0x00FFAA)
+        embed.add_field(
+            name="Meme Channel",
+            value=f"<#{settings.meme_channel_id}>" if settings.meme_channel_id else "Off",
+            inline=True
+        )
+        embed.add_field(name="Interval", value=f"{settings.interval_min:g}–{settings.interval_max:g} min", inline=True)
+        embed.add_field(name="NSFW", value="Never" if settings.nsfw == "never" else "NSFW channels only", inline=True)
+        embed.add_field(name="Votes", value=f"{settings.upvote} {settings.downvote}", inline=True)
+        embed.add_field(
+            name="Subreddits",
+            value=", ".join(f"r/{sub}" for sub in settings.subreddits)[:1024] if settings.subreddits else "Bot default list",
+            inline=False
+        )
+        return embed
+
+    def usable_emoji(self, text: str) -> bool:
+        """Custom emojis must be ones the bot can see; anything else must at least not be plain text"""
+        emoji = discord.PartialEmoji.from_str(text)
+        if emoji.id:
+            return self.bot.get_emoji(emoji.id) is not None
+        return 0 < len(text) <= 10 and not any(ch.isascii() and ch.isalpha() for ch in text)
+
+    async def apply(self, interaction: discord.Interaction, **changes):
+        """Write changes through to the store and show the result"""
+        try:
+            settings = await self.store.update(interaction.guild_id, **changes)
+        except ValueError as e:
+            await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+            return
+        logger.info(f"Guild {interaction.guild_id} settings changed by {interaction.user}: {changes}")
+        self.bot.dispatch("guild_settings_update", interaction.guild_id, settings)
+        await interaction.response.send_message(
+            "✅ Settings updated", embed=self.settings_embed(interaction.guild, settings), ephemeral=True
+        )
+
+    # --- Config Commands ---
+    @config.command(name="show", description="Show this server's settings")
+    async def config_show(self, interaction: discord.Interaction):
+        settings = self.store.get(interaction.guild_id)
+        await interaction.response.send_message(embed=self.settings_embed(interaction.guild, settings), ephemeral=True)
+
+    @config.command(name="channel", description="Set the channel for scheduled memes")
+    @app_commands.describe(channel="Channel to post in (leave empty to turn scheduled memes off)")
+    async def config_channel(self, interaction: discord.Interaction, channel: Optional[discord.TextChannel] = None):
+        if channel and not channel.permissions_for(interaction.guild.me).send_messages:
+            await interaction.response.send_message(f"❌ I can't send messages in {channel.mention}", ephemeral=True)
+            return
+        await self.apply(interaction, meme_channel_id=channel.id if channel else 0)
+
+    @config.command(name="interval", description="Set how often scheduled memes are posted")
+    @app_commands.describe(minimum="Shortest gap in minutes", maximum="Longest gap in minutes")
+    async def config_interval(self, interaction: discord.Interaction,
+                              minimum: app_commands.Range[float, 1, 1440], maximum: app_commands.Range[float, 1, 1440]):
+        await self.apply(interaction, interval_min=minimum, interval_max=maximum)
+
+    @config.command(name="subreddits", description="Pick the subreddits memes come from")
+    @app_commands.describe(subreddits=f"Up to {MAX_SUBREDDITS} names separated by spaces or commas (empty = bot default)")
+    async def config_subreddits(self, interaction: discord.Interaction, subreddits: Optional[str] = None):
+        names = [name.strip().removeprefix("r/") for name in (subreddits or "").replace(",", " ").split()]
+        await self.apply(interaction, subreddits=list(dict.fromkeys(name for name in names if name)))
+
+    @config.command(name="nsfw", description="Choose whether NSFW memes can be posted")
+    @app_commands.describe(policy="channel: only in age-restricted channels · never: not at all")
+    async def config_nsfw(self, interaction: discord.Interaction, policy: Literal["channel", "never"]):
+        await self.apply(interaction, nsfw=policy)
+
+    @config.command(name="emojis", description="Set the vote reactions added to memes")
+    @app_commands.describe(upvote="Upvote emoji", downvote="Downvote emoji")
+    async def config_emojis(self, interaction: discord.Interaction, upvote: str, downvote: str):
+        upvote, downvote = upvote.strip(), downvote.strip()
+        unusable = [emoji for emoji in (upvote, downvote) if not self.usable_emoji(emoji)]
+        if unusable:
+            await interaction.response.send_message(
+                f"❌ I can't react with {', '.join(unusable)}. Use a standard emoji or one from a server I'm in.",
+                ephemeral=True
+            )
+            return
+        await self.apply(interaction, upvote=upvote, downvote=downvote)
+
+    @config.command(name="reset", description="Reset this server's settings to the defaults")
+    async def config_reset(self, interaction: discord.Interaction):
+        settings = await self.store.reset(interaction.guild_id)
+        self.bot.dispatch("guild_settings_update", interaction.guild_id, settings)
+        await interaction.response.send_message(
+            "♻️ Settings reset", embed=self.settings_embed(interaction.guild, settings), ephemeral=True
+        )
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(GuildConfigCog(bot))
@@ -3,13 +3,60 @@ from discord import app_commands
 from discord.ext import commands
 import random
 import math
+import io
 import typing
+import logging
+import codecs
+import asyncio
+import aiohttp
+import importlib
+from utils.lru import LRUCache
+from utils.workers import PoolBusy, get_pool
+from utils.units import UnitRegistry
+from utils.sandbox import SOLVE_VARIABLES, Sandbox, SandboxError, SandboxTimeout, normalize, parse_expression
+from utils.tracing import span, trace_config
+
+if typing.TYPE_CHECKING:
+    from utils.stats import StreamingStats
+
+# numpy-backed helpers take ~90ms to import, so they load during warm-up (or on first use)
+NUMERIC_MODULES = ("utils.stats", "utils.random_gen")
+
+logger = logging.getLogger(__name__)
 
 class MathCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.max_factorial = 1000  # Prevent excessive computation
+        self.max_factorial = 20000     # Prevent excessive computation (~77k digits)
+        self.inline_digits = 1400      # Longer results (with separators) go to a .txt attachment
         self.max_decimals = 6      # Max decimal places to display
+        self.sandbox = Sandbox(workers=2, cpu_seconds=2.0, memory_mb=512)
+        # Keyed by normalised expression / operation; big results can be ~100 KB each
+        self.results = LRUCache("math_results", max_items=2048, max_bytes=16 * 1024 * 1024)
+        # Statistics over long lists / CSV attachments
+        self.stats_pool = get_pool("stats", max_workers=2, max_queue=4)
+        self.max_csv_bytes = 100 * 1024 * 1024
+        self.csv_block_bytes = 1024 * 1024   # Parsed per worker job
+        self.histogram_min_values = 20
+        self.random_inline_count = 200    # Larger runs are always attached
+        self.max_upload_bytes = 8 * 1024 * 1024
+        self.units = UnitRegistry()   # Every pair's conversion, built once
+        self.session = None
+
+    async def cog_load(self):
+        self.session = aiohttp.ClientSession(trace_configs=[trace_config()])
+
+    async def warm_up(self):
+        """Fork the sandbox workers and import numpy off the event loop"""
+        await asyncio.gather(
+            self.sandbox.start(),
+            *(asyncio.to_thread(importlib.import_module, name) for name in NUMERIC_MODULES)
+        )
+
+    async def cog_unload(self):
+        self.sandbox.shutdown()
+        if self.session:
+            await self.session.close()
 
     async def ensure_allowed_channel(self, interaction: discord.Interaction) -> bool:
         """No channel restrictions anymore"""
@@ -67,6 +114,11 @@ class MathCog(commands.Cog):
     @app_commands.command(name="power", description="Raise a number to a power")
     @app_commands.describe(base="Base number", exponent="Exponent")
     async def power(self, interaction: discord.Interaction, base: float, exponent: float):
+        # Whole-number powers are exact big integers, computed in the sandbox
+        if base.is_integer() and exponent.is_integer() and exponent >= 0 and abs(base) > 1:
+            b, e = int(base), int(exponent)
+            await self.send_big_result(interaction, f"{b}^{e}", "int_power", b, e)
+            return
         try:
             result = base ** exponent
             await interaction.response.send_message(
@@ -98,7 +150,7 @@ class MathCog(commands.Cog):
         number="Number to calculate logarithm of",
         base="Logarithm base (default: 10)"
     )
-    async def log(self, interaction: discord.Interaction, number: float, base: float = 10):
+    async def log(self, interaction: discord.Interaction, number: float, base: float = 10.0):
         if number <= 0:
             await interaction.response.send_message(
                 "❌ Logarithm is only defined for positive numbers",
@@ -133,11 +185,244 @@ class MathCog(commands.Cog):
             )
             return
             
-        result = math.factorial(number)
-        await interaction.response.send_message(
-            f"**{number}! = {result:,}**"  # Format with commas for large numbers
+        await self.send_big_result(interaction, f"{number}!", "factorial", number)
+
+    @app_commands.command(name="fibonacci", description="Calculate the nth Fibonacci number")
+    @app_commands.describe(n="Index in the sequence (F(0) = 0, F(1) = 1)")
+    async def fibonacci(self, interaction: discord.Interaction, n: app_commands.Range[int, 0, 450000]):
+        await self.send_big_result(interaction, f"F({n})", "fibonacci", n)
+
+    @app_commands.command(name="binomial", description="Number of ways to choose k items from n (nCk)")
+    @app_commands.describe(n="Total items", k="Items chosen")
+    async def binomial(
+        self,
+        interaction: discord.Interaction,
+        n: app_commands.Range[int, 0, 200000],
+        k: app_commands.Range[int, 0, 200000]
+    ):
+        if k > n:
+            await interaction.response.send_message("❌ k can't be larger than n", ephemeral=True)
+            return
+        await self.send_big_result(interaction, f"C({n}, {k})", "binomial", n, k)
+
+    # --- Expressions ---
+    async def run_sandboxed(self, kind: str, key: tuple, *args) -> str:
+        """Run a sandbox job, memoised by its normalised form"""
+        result = self.results.get(key)
+        if result is None:
+            with span("sandbox", kind):
+                result = await self.sandbox.run(kind, *args)
+            self.results.put(key, result)
+        return result
+
+    def _clip(self, text: str, limit: int = 1900) -> str:
+        return text if len(text) <= limit else text[:limit] + "…"
+
+    @app_commands.command(name="calc", description="Evaluate a math expression")
+    @app_commands.describe(expression="e.g. 2^10 + sqrt(3) * sin(pi/4)")
+    async def calc(self, interaction: discord.Interaction, expression: str):
+        try:
+            normalized = normalize(parse_expression(expression))
+            await interaction.response.defer()
+            result = await self.run_sandboxed("calc", ("calc", normalized), normalized)
+        except SandboxTimeout:
+            await self._send_error(interaction, "⏱️ That took too long to calculate!")
+            return
+        except SandboxError as e:
+            await self._send_error(interaction, f"❌ {e}")
+            return
+        await interaction.followup.send(self._clip(f"**{normalized} = {result}**"))
+
+    @app_commands.command(name="solve", description="Solve an equation for a variable")
+    @app_commands.describe(
+        equation="e.g. x^2 - 4 = 0 (\"= 0\" is assumed if omitted)",
+        variable="Variable to solve for (default: x)"
+    )
+    @app_commands.choices(variable=[app_commands.Choice(name=v, value=v) for v in SOLVE_VARIABLES])
+    async def solve(self, interaction: discord.Interaction, equation: str, variable: str = "x"):
+        sides = equation.split("=")
+        if len(sides) > 2:
+            await interaction.response.send_message("❌ Use a single `=` in the equation", ephemeral=True)
+            return
+        lhs, rhs = (sides + ["0"])[:2]
+        try:
+            lhs = normalize(parse_expression(lhs, SOLVE_VARIABLES))
+            rhs = normalize(parse_expression(rhs, SOLVE_VARIABLES))
+            await interaction.response.defer()
+            result = await self.run_sandboxed("solve", ("solve", lhs, rhs, variable), lhs, rhs, variable)
+        except SandboxTimeout:
+            await self._send_error(interaction, "⏱️ That equation took too long to solve!")
+            return
+        except SandboxError as e:
+            await self._send_error(interaction, f"❌ {e}")
+            return
+        await interaction.followup.send(self._clip(f"**{lhs} = {rhs}**\n{result}"))
+
+    async def _send_error(self, interaction: discord.Interaction, message: str):
+        if interaction.response.is_done():
+            await interaction.followup.send(message, ephemeral=True)
+        else:
+            await interaction.response.send_message(message, ephemeral=True)
+
+    # --- Big numbers ---
+    def scientific(self, digits: str) -> str:
+        """Scientific notation for a decimal digit string"""
+        sign = "-" if digits.startswith("-") else ""
+        digits = digits.lstrip("-")
+        if len(digits) <= 15:
+            return f"{sign}{int(digits):,}"
+        return f"{sign}{digits[0]}.{digits[1:13]} × 10^{len(digits) - 1}"
+
+    async def send_big_result(self, interaction: discord.Interaction, label: str, kind: str, *args: int):
+        """Compute an exact integer off the event loop and send it inline or as a .txt file"""
+        await interaction.response.defer()
+        try:
+            digits = await self.run_sandboxed(kind, (kind, *args), *args)
+        except SandboxTimeout:
+            await self._send_error(interaction, "⏱️ That took too long to calculate!")
+            return
+        except SandboxError as e:
+            await self._send_error(interaction, f"❌ {e}")
+            return
+
+        length = len(digits.lstrip("-"))
+        if length <= self.inline_digits:
+            await interaction.followup.send(f"**{label} = {int(digits):,}**")
+            return
+        file = discord.File(io.BytesIO(digits.encode()), filename=f"{kind}.txt")
+        await interaction.followup.send(
+            f"**{label} ≈ {self.scientific(digits)}**\n({length:,} digits, full value attached)",
+            file=file
         )
 
+    # --- Statistics ---
+    def _ingest_block(self, stats: "StreamingStats", text: str, delimiter, columns: tuple):
+        """Parse one block of CSV lines and fold it into `stats` (blocking)"""
+        from utils.stats import parse_block
+        rows = parse_block(text, delimiter, columns)
+        if len(columns) == 2:
+            stats.update(rows[:, 1], x=rows[:, 0])
+        else:
+            stats.update(rows[:, 0])
+
+    async def _ingest_attachment(self, stats: "StreamingStats", file: discord.Attachment, columns: tuple):
+        """Stream a CSV attachment in blocks split on line boundaries"""
+        from utils.stats import detect_delimiter
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        delimiter = False  # Detected from the first line
+        pending = ""
+        async with self.session.get(file.url, timeout=aiohttp.ClientTimeout(total=120)) as resp:
+            resp.raise_for_status()
+            buffered = []
+            size = 0
+            async for chunk in resp.content.iter_chunked(64 * 1024):
+                buffered.append(decoder.decode(chunk))
+                size += len(chunk)
+                if size < self.csv_block_bytes:
+                    continue
+                text = pending + "".join(buffered)
+                buffered, size = [], 0
+                cut = text.rfind("\n")
+                if cut < 0:
+                    pending = text
+                    continue
+                block, pending = text[:cut], text[cut + 1:]
+                if delimiter is False:
+                    delimiter = detect_delimiter(block.split("\n", 1)[0])
+                await self.stats_pool.run(self._ingest_block, stats, block, delimiter, columns)
+            block = pending + "".join(buffered) + decoder.decode(b"", final=True)
+            if block.strip():
+                if delimiter is False:
+                    delimiter = detect_delimiter(block.split("\n", 1)[0])
+                await self.stats_pool.run(self._ingest_block, stats, block, delimiter, columns)
+
+    def stats_embed(self, stats: "StreamingStats", source: str) -> discord.Embed:
+        fmt = lambda v: f"{v:,.6g}"
+        embed = discord.Embed(title="📊 Statistics", description=source, color=discord.Color.blurple())
+        percentiles = stats.percentiles()
+        embed.add_field(name="Count", value=f"{stats.n:,}")
+        embed.add_field(name="Mean", value=fmt(stats.mean))
+        embed.add_field(name="Median", value=fmt(percentiles[50]))
+        embed.add_field(name="Std Dev", value=fmt(stats.stdev))
+        embed.add_field(name="Min", value=fmt(stats.min))
+        embed.add_field(name="Max", value=fmt(stats.max))
+        embed.add_field(
+            name="Percentiles",
+            value="\n".join(f"p{p}: {fmt(v)}" for p, v in percentiles.items()),
+            inline=False
+        )
+        regression = stats.regression()
+        if regression:
+            embed.add_field(
+                name="Regression",
+                value=(f"y = {fmt(regression['slope'])}x + {fmt(regression['intercept'])}\n"
+                       f"r² = {regression['r2']:.4f}"),
+                inline=False
+            )
+        if not stats.exact:
+            embed.set_footer(text=f"Median/percentiles from a {stats.sample_size:,}-value random sample")
+        return embed
+
+    @app_commands.command(name="numstats", description="Mean, median, stdev, percentiles and histogram of numbers")
+    @app_commands.describe(
+        numbers="Numbers separated by spaces or commas",
+        file="CSV / text file of numbers (up to 100 MB)",
+        column="CSV column to analyse (1 = first)",
+        x_column="Optional CSV column to regress the values against"
+    )
+    async def numstats(
+        self,
+        interaction: discord.Interaction,
+        numbers: typing.Optional[str] = None,
+        file: typing.Optional[discord.Attachment] = None,
+        column: app_commands.Range[int, 1, 1000] = 1,
+        x_column: typing.Optional[app_commands.Range[int, 1, 1000]] = None
+    ):
+        if not numbers and not file:
+            await interaction.response.send_message("❌ Give me some numbers or attach a CSV file", ephemeral=True)
+            return
+        if file and file.size > self.max_csv_bytes:
+            await interaction.response.send_message(
+                f"❌ That file is too big (max {self.max_csv_bytes // (1024 * 1024)} MB)", ephemeral=True
+            )
+            return
+
+        await interaction.response.defer()
+        import numpy as np
+        from utils.stats import StreamingStats, render_histogram
+        stats = StreamingStats()
+        try:
+            if numbers:
+                values = np.array(numbers.replace(",", " ").split(), dtype=float)
+                await self.stats_pool.run(stats.update, values)
+                source = "From the numbers you gave"
+            if file:
+                columns = (column - 1,) if x_column is None else (x_column - 1, column - 1)
+                await self._ingest_attachment(stats, file, columns)
+                source = f"From `{file.filename}`, column {column}" + (f" vs column {x_column}" if x_column else "")
+        except ValueError:
+            await self._send_error(interaction, "❌ Invalid input. Please provide numbers separated by spaces or commas.")
+            return
+        except PoolBusy:
+            await self._send_error(interaction, "⏳ Too many statistics jobs running, try again in a moment")
+            return
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Error downloading {file.url}: {e}")
+            await self._send_error(interaction, "❌ Couldn't download that file")
+            return
+        if not stats.n:
+            await self._send_error(interaction, "❌ No numbers found in that input")
+            return
+
+        embed = self.stats_embed(stats, source)
+        if stats.n < self.histogram_min_values or stats.min == stats.max:
+            await interaction.followup.send(embed=embed)
+            return
+        counts, edges = stats.histogram()
+        png = await self.stats_pool.run(render_histogram, counts, edges, f"{stats.n:,} values")
+        embed.set_image(url="attachment://histogram.png")
+        await interaction.followup.send(embed=embed, file=discord.File(io.BytesIO(png), filename="histogram.png"))
+
     # --- Algebra ---
     @app_commands.command(name="quadratic", description="Solve quadratic equation: ax² + bx + c = 0")
     @app_commands.describe(a="Coefficient of x²", b="Coefficient of x", c="Constant term")
@@ -178,12 +463,44 @@ class MathCog(commands.Cog):
         await interaction.response.send_message(response)
 
     # --- Random Numbers ---
-    @app_commands.command(name="random", description="Generate a random number in a range")
+    async def send_random(self, interaction: discord.Interaction, header: str, kind: str, count: int,
+                          seed: typing.Optional[int], **params):
+        """Generate off the event loop; inline when short, else a gzipped attachment"""
+        from utils import random_gen
+        seed = seed if seed is not None else random.getrandbits(32)
+        await interaction.response.defer()
+        try:
+            if count <= self.random_inline_count:
+                text = await self.stats_pool.run(random_gen.generate_text, kind, count, seed, **params)
+                if len(text) <= 1800:
+                    await interaction.followup.send(f"{header} (seed `{seed}`):\n**{text}**")
+                    return
+            spool, size = await self.stats_pool.run(
+                random_gen.generate_gzip, kind, count, seed, self.max_upload_bytes, **params
+            )
+        except PoolBusy:
+            await self._send_error(interaction, "⏳ Too many generators running, try again in a moment")
+            return
+        except (ValueError, OverflowError) as e:
+            await self._send_error(interaction, f"❌ Can't generate those numbers: {e}")
+            return
+        with spool:
+            if size > self.max_upload_bytes:
+                await self._send_error(interaction, "⚠️ That's too many values to upload, try a smaller count")
+                return
+            await interaction.followup.send(
+                f"{header} (seed `{seed}`):\n{count:,} values attached, one per line",
+                file=discord.File(spool, filename=f"random_{kind}.txt.gz")
+            )
+
+    @app_commands.command(name="random", description="Generate random numbers in a range")
     @app_commands.describe(
         low="Lower bound",
         high="Upper bound",
         integer="Generate integer? (default: False)",
-        count="How many numbers to generate (default: 1)"
+        count="How many numbers to generate (default: 1)",
+        unique="No repeats (integers only)",
+        seed="Seed for repeatable results"
     )
     async def random_num(
         self,
@@ -191,7 +508,9 @@ class MathCog(commands.Cog):
         low: float,
         high: float,
         integer: bool = False,
-        count: app_commands.Range[int, 1, 25] = 1
+        count: app_commands.Range[int, 1, 5_000_000] = 1,
+        unique: bool = False,
+        seed: typing.Optional[app_commands.Range[int, 0, 2 ** 53]] = None
     ):
         if low >= high:
             await interaction.response.send_message(
@@ -199,79 +518,167 @@ class MathCog(commands.Cog):
                 ephemeral=True
             )
             return
-            
-        results = []
-        for _ in range(count):
+        if unique:
+            low, high = math.ceil(low), math.floor(high)
+            if count > high - low + 1:
+                await interaction.response.send_message(
+                    f"❌ Only {max(0, high - low + 1):,} unique integers between {low} and {high}",
+                    ephemeral=True
+                )
+                return
+            kind = "sample"
+        else:
+            kind = "integer" if integer else "uniform"
             if integer:
-                results.append(str(random.randint(int(low), int(high))))
-            else:
-                results.append(self.format_number(random.uniform(low, high)))
-                
-        result_str = ", ".join(results)
-        range_type = "integer" if integer else "decimal"
-        await interaction.response.send_message(
-            f"🔢 Random {range_type} number(s) between {self.format_number(low)} and {self.format_number(high)}:\n"
-            f"**{result_str}**"
+                low, high = int(low), int(high)
+        if kind != "uniform" and (not -2 ** 63 <= low <= high < 2 ** 63 or high - low >= 2 ** 63):
+            await interaction.response.send_message(
+                "❌ Integer bounds must stay within ±9.2 quintillion (64-bit)",
+                ephemeral=True
+            )
+            return
+
+        range_type = "unique integer" if unique else "integer" if integer else "decimal"
+        await self.send_random(
+            interaction,
+            f"🔢 Random {range_type} number(s) between {self.format_number(low)} and {self.format_number(high)}",
+            kind, count, seed, low=low, high=high
+        )
+
+    @app_commands.command(name="randomdist", description="Generate numbers from a normal or exponential distribution")
+    @app_commands.describe(
+        distribution="Distribution to sample",
+        mean="Mean of the distribution",
+        stdev="Standard deviation (normal only)",
+        count="How many numbers to generate (default: 1)",
+        seed="Seed for repeatable results"
+    )
+    @app_commands.choices(distribution=[
+        app_commands.Choice(name="Normal", value="normal"),
+        app_commands.Choice(name="Exponential", value="exponential")
+    ])
+    async def random_dist(
+        self,
+        interaction: discord.Interaction,
+        distribution: app_commands.Choice[str],
+        mean: float = 0.0,
+        stdev: float = 1.0,
+        count: app_commands.Range[int, 1, 5_000_000] = 1,
+        seed: typing.Optional[app_commands.Range[int, 0, 2 ** 53]] = None
+    ):
+        if distribution.value == "normal":
+            if stdev <= 0:
+                await interaction.response.send_message("❌ Standard deviation must be positive", ephemeral=True)
+                return
+            label = f"μ={self.format_number(mean)}, σ={self.format_number(stdev)}"
+        else:
+            if mean <= 0:
+                await interaction.response.send_message("❌ Exponential mean must be positive", ephemeral=True)
+                return
+            label = f"mean={self.format_number(mean)}"
+        await self.send_random(
+            interaction, f"📈 {distribution.name} ({label})",
+            distribution.value, count, seed, mean=mean, stdev=stdev
+        )
+
+    @app_commands.command(name="roll", description="Roll dice, e.g. 4d6 or 2d20+3")
+    @app_commands.describe(
+        dice="Dice notation, e.g. 4d6, d20, 3d8-1",
+        count="How many times to roll (default: 1)",
+        seed="Seed for repeatable results"
+    )
+    async def roll(
+        self,
+        interaction: discord.Interaction,
+        dice: str,
+        count: app_commands.Range[int, 1, 5_000_000] = 1,
+        seed: typing.Optional[app_commands.Range[int, 0, 2 ** 53]] = None
+    ):
+        from utils import random_gen
+        try:
+            number, sides, modifier = random_gen.parse_dice(dice)
+        except ValueError as e:
+            await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+            return
+        if count * number > random_gen.MAX_TOTAL_DICE:
+            await interaction.response.send_message(
+                f"❌ That's {count * number:,} dice, the limit is {random_gen.MAX_TOTAL_DICE:,} per roll",
+                ephemeral=True
+            )
+            return
+        notation = f"{number}d{sides}" + (f"{modifier:+d}" if modifier else "")
+        if count == 1 and number <= 20:
+            # Single small roll: show each die
+            seed = seed if seed is not None else random.getrandbits(32)
+            faces = random_gen.dice_faces(seed, number, sides)
+            detail = " + ".join(map(str, faces)) + (f" ({modifier:+d})" if modifier else "")
+            await interaction.response.send_message(
+                f"🎲 {notation}: {detail} = **{sum(faces) + modifier}**"
+            )
+            return
+        await self.send_random(
+            interaction, f"🎲 {count:,} rolls of {notation}",
+            "dice", count, seed, dice=number, sides=sides, modifier=modifier
         )
 
     # --- Unit Conversion ---
-    @app_commands.command(name="convert", description="Convert between common units")
+    async def from_unit_autocomplete(self, interaction: discord.Interaction, current: str) -> typing.List[app_commands.Choice[str]]:
+        return [app_commands.Choice(name=label, value=label) for label in self.units.complete(current)]
+
+    async def to_unit_autocomplete(self, interaction: discord.Interaction, current: str) -> typing.List[app_commands.Choice[str]]:
+        # Once a source unit is picked, only offer units it converts to
+        source = self.units.resolve(interaction.namespace.from_unit or "")
+        return [app_commands.Choice(name=label, value=label) for label in self.units.complete(current, source)]
+
+    @app_commands.command(name="convert", description="Convert between units")
     @app_commands.describe(
-        value="Value to convert",
+        values="Value(s) to convert, separated by spaces or commas",
         from_unit="Unit to convert from",
         to_unit="Unit to convert to"
     )
-    @app_commands.choices(
-        from_unit=[
-            app_commands.Choice(name="Celsius", value="c"),
-            app_commands.Choice(name="Fahrenheit", value="f"),
-            app_commands.Choice(name="Miles", value="mi"),
-            app_commands.Choice(name="Kilometers", value="km"),
-            app_commands.Choice(name="Pounds", value="lb"),
-            app_commands.Choice(name="Kilograms", value="kg")
-        ],
-        to_unit=[
-            app_commands.Choice(name="Fahrenheit", value="f"),
-            app_commands.Choice(name="Celsius", value="c"),
-            app_commands.Choice(name="Kilometers", value="km"),
-            app_commands.Choice(name="Miles", value="mi"),
-            app_commands.Choice(name="Kilograms", value="kg"),
-            app_commands.Choice(name="Pounds", value="lb")
-        ]
-    )
+    @app_commands.autocomplete(from_unit=from_unit_autocomplete, to_unit=to_unit_autocomplete)
     async def convert(
         self,
         interaction: discord.Interaction,
-        value: float,
-        from_unit: app_commands.Choice[str],
-        to_unit: app_commands.Choice[str]
+        values: str,
+        from_unit: str,
+        to_unit: str
     ):
-        unit_map = {
-            # Temperature
-            ("c", "f"): lambda c: c * 9/5 + 32,
-            ("f", "c"): lambda f: (f - 32) * 5/9,
-            
-            # Distance
-            ("mi", "km"): lambda mi: mi * 1.60934,
-            ("km", "mi"): lambda km: km / 1.60934,
-            
-            # Weight
-            ("lb", "kg"): lambda lb: lb * 0.453592,
-            ("kg", "lb"): lambda kg: kg / 0.453592,
-        }
-        
-        conversion_key = (from_unit.value, to_unit.value)
-        if conversion_key in unit_map:
-            result = unit_map[conversion_key](value)
+        source, target = self.units.resolve(from_unit), self.units.resolve(to_unit)
+        if not source or not target:
+            unknown = from_unit if not source else to_unit
+            await interaction.response.send_message(f"❌ Unknown unit: `{unknown}`", ephemeral=True)
+            return
+        converter = self.units.converter(source, target)
+        if converter is None:
             await interaction.response.send_message(
-                f"**{self.format_number(value)} {from_unit.name} = "
-                f"{self.format_number(result)} {to_unit.name}**"
+                f"❌ Can't convert {source.category} ({source.name}) to {target.category} ({target.name})",
+                ephemeral=True
             )
-        else:
+            return
+        try:
+            nums = [float(n) for n in values.replace(",", " ").split()]
+            if not nums:
+                raise ValueError("No numbers provided")
+        except ValueError:
             await interaction.response.send_message(
-                "❌ Unsupported conversion pair",
+                "❌ Invalid input. Please provide numbers separated by spaces or commas.",
                 ephemeral=True
             )
+            return
+
+        lines = [
+            f"{self.format_number(n)} {source.symbol} = **{self.format_number(converter(n))} {target.symbol}**"
+            for n in nums
+        ]
+        text = "\n".join(lines)
+        if len(text) <= 1900:
+            await interaction.response.send_message(text)
+            return
+        await interaction.response.send_message(
+            f"🔁 {len(nums):,} values converted from {source.name} to {target.name}",
+            file=discord.File(io.BytesIO(text.replace("**", "").encode()), filename="converted.txt")
+        )
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(MathCog(bot))
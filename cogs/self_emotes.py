@@ -5,33 +5,38 @@ import random
 import asyncio
 import logging
 from typing import Literal, Optional
+from utils.gif_pool import GifPool
+from utils.tracing import trace_config
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Unified emote list with better API mapping (module level so the command can alias every key)
+EMOTE_MAPPING = {
+    "smile": "smile",
+    "dance": "dance",
+    "wink": "wink",
+    "blush": "blush",
+    "cry": "cry",
+    "happy": "happy",
+    "thinking": "thinking",
+    "wave": "wave",
+    "laugh": "laugh",
+    "shrug": "shrug",
+    "pout": "pout",
+    "sleep": "sleep"
+}
+
 class SelfEmotes(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.session = aiohttp.ClientSession()  # Persistent session for efficiency
-        
-        # Unified emote list with better API mapping
-        self.emote_mapping = {
-            "smile": "smile",
-            "dance": "dance",
-            "wink": "wink",
-            "blush": "blush",
-            "cry": "cry",
-            "happy": "happy",
-            "thinking": "thinking",
-            "wave": "wave",
-            "laugh": "laugh",
-            "shrug": "shrug",
-            "pout": "pout",
-            "sleep": "sleep"
-        }
+        self.session = None  # Persistent session for efficiency, created in cog_load
         
+        self.emote_mapping = EMOTE_MAPPING
+
         # API base for nekos.best
         self.api_base = "https://nekos.best/api/v2"
+        self.gif_pool = GifPool("self_emotes.gifs", self._fetch_batch)
         
         # Improved fallback GIFs with more variety
         self.fallback_gifs = {
@@ -49,9 +54,27 @@ class SelfEmotes(commands.Cog):
             "sleep": "https://media.tenor.com/6JhxqRzwYjIAAAAC/anime-sleeping.gif"
         }
 
+    async def cog_load(self):
+        self.session = aiohttp.ClientSession(trace_configs=[trace_config()])
+
     async def cog_unload(self):
         """Clean up the aiohttp session when cog unloads"""
-        await self.session.close()
+        self.gif_pool.close()
+        if self.session:
+            await self.session.close()
+
+    async def warm_up(self):
+        """Prefetch a batch of GIFs for every emote"""
+        await self.gif_pool.fill(self.emote_mapping.values())
+
+    async def _fetch_batch(self, action: str, amount: int) -> list:
+        async with self.session.get(f"{self.api_base}/{action}?amount={amount}",
+                                    timeout=aiohttp.ClientTimeout(total=10)) as resp:
+            if resp.status != 200:
+                logger.warning(f"API returned {resp.status} prefetching {action}")
+                return []
+            data = await resp.json()
+            return [result["url"] for result in data.get("results", [])]
 
     async def fetch_emote_gif(self, action: str) -> Optional[str]:
         """Fetch GIF from nekos.best API with proper error handling"""
@@ -60,6 +83,10 @@ class SelfEmotes(commands.Cog):
             logger.warning(f"Invalid emote action requested: {action}")
             return None
 
+        pooled = self.gif_pool.take(self.emote_mapping[action])
+        if pooled:
+            return pooled
+
         url = f"{self.api_base}/{self.emote_mapping[action]}?amount=1"
         
         try:
@@ -85,7 +112,7 @@ class SelfEmotes(commands.Cog):
     @commands.command(
         name="emote",
         description="Express yourself with anime emotes!",
-        aliases=list(emote_mapping.keys())
+        aliases=list(EMOTE_MAPPING.keys())
     )
     @commands.cooldown(1, 3, commands.BucketType.user)
     async def self_emote(self, ctx: commands.Context):
@@ -6,35 +6,43 @@ import asyncio
 import logging
 from discord.ext import commands
 from typing import Optional, Literal
+from utils.gif_pool import GifPool
+from utils.tracing import trace_config
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Multi-user actions that need a target (module level so the command can alias every key)
+EMOTE_ACTIONS = {
+    "hug": "hug",
+    "kiss": "kiss",
+    "cuddle": "cuddle",
+    "slap": "slap",
+    "pat": "pat",
+    "poke": "poke",
+    "highfive": "highfive",
+    "bite": "bite",
+    "nom": "nom",
+    "kick": "kick",
+    "punch": "punch",
+    "glomp": "glomp",
+    "holdhands": "holdhands",
+    "yeet": "yeet",
+    "bonk": "bonk",
+    "tickle": "tickle"
+}
+
 class UserEmotes(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.session = aiohttp.ClientSession()  # Persistent session
-        
-        # Multi-user actions that need a target
-        self.emote_actions = {
-            "hug": "hug",
-            "kiss": "kiss",
-            "cuddle": "cuddle",
-            "slap": "slap",
-            "pat": "pat",
-            "poke": "poke",
-            "highfive": "highfive",
-            "bite": "bite",
-            "nom": "nom",
-            "kick": "kick",
-            "punch": "punch",
-            "glomp": "glomp",
-            "holdhands": "holdhands",
-            "yeet": "yeet",
-            "bonk": "bonk",
-            "tickle": "tickle"
-        }
+        self.session = None  # Persistent session, created in cog_load
         
+        self.emote_actions = EMOTE_ACTIONS
+
+        # API base for nekos.best
+        self.api_base = "https://nekos.best/api/v2"
+        self.gif_pool = GifPool("user_emotes.gifs", self._fetch_batch)
+
         # Action-specific fallback GIFs
         self.fallback_gifs = {
             "hug": [
@@ -89,13 +97,35 @@ class UserEmotes(commands.Cog):
         except (json.JSONDecodeError, KeyError, TypeError) as e:
             logger.error(f"Error loading responses: {e}")
     
+    async def cog_load(self):
+        self.session = aiohttp.ClientSession(trace_configs=[trace_config()])
+
     async def cog_unload(self):
         """Clean up session when cog unloads"""
-        await self.session.close()
+        self.gif_pool.close()
+        if self.session:
+            await self.session.close()
+
+    async def warm_up(self):
+        """Prefetch a batch of GIFs for every action"""
+        await self.gif_pool.fill(self.emote_actions.values())
+
+    async def _fetch_batch(self, action: str, amount: int) -> list:
+        async with self.session.get(f"{self.api_base}/{action}?amount={amount}",
+                                    timeout=aiohttp.ClientTimeout(total=10)) as resp:
+            if resp.status != 200:
+                logger.warning(f"API returned {resp.status} prefetching {action}")
+                return []
+            data = await resp.json()
+            return [result["url"] for result in data.get("results", [])]
     
     async def fetch_emote_gif(self, action: str) -> str:
         """Fetch GIF from nekos.best API with proper error handling"""
-        url = f"https://nekos.best/api/v2/{action}?amount=1"
+        pooled = self.gif_pool.take(action)
+        if pooled:
+            return pooled
+
+        url = f"{self.api_base}/{action}?amount=1"
         
         try:
             async with self.session.get(url, timeout=aiohttp.ClientTimeout(total=5)) as resp:
@@ -132,9 +162,9 @@ class UserEmotes(commands.Cog):
 
     # --- Unified Emote Command Handler ---
     @commands.command(
-        name="emote",
+        name="useremote",
         description="Interact with others using anime emotes!",
-        aliases=list(emote_actions.keys())
+        aliases=list(EMOTE_ACTIONS.keys())
     )
     @commands.cooldown(1, 3, commands.BucketType.user)
     async def user_emote(self, ctx, member: Optional[discord.Member] = None):
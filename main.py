@@ -1,18 +1,30 @@
 import discord
 import asyncpraw
 import asyncio
+import aiohttp
 import os
 import json
+import math
+import re
 import random
+import functools
 import logging
 import sys
+import time
 import traceback
 from datetime import datetime, timedelta, timezone
-from collections import deque
+from collections import Counter, deque
 from discord.ext import commands, tasks
 from dotenv import load_dotenv
 from webserver import keep_alive
 from discord import app_commands
+from utils import metrics
+from utils.autocomplete import PrefixIndex
+from utils.command_sync import CommandSync
+from utils.guild_config import GuildConfig, GuildSettings
+from utils.loop_monitor import LoopMonitor, label_current_task
+from utils.lru import all_caches
+from utils import tracing
 
 # ==== Python 3.13 Fix ====
 if sys.version_info >= (3, 13):
@@ -30,6 +42,7 @@ logging.basicConfig(
     datefmt='%Y-%m-%d %H:%M:%S'
 )
 logger = logging.getLogger('MemeBot')
+STARTED_AT = time.perf_counter()  # Process start, for startup timings
 
 # ==== CONFIG ====
 os.makedirs("data", exist_ok=True)
@@ -48,20 +61,49 @@ DEFAULT_SUBS = [
     "nsfwmemes", "dankmemes_nsfw", "EdgyMemes", "darkmemers"
 ]
 
-if os.path.exists(SUB_FILE):
+def read_subreddits() -> list:
     with open(SUB_FILE, "r") as f:
-        ALL_MEMES = json.load(f)
+        subs = json.load(f)
+    if not isinstance(subs, list) or not subs or not all(isinstance(sub, str) and sub.strip() for sub in subs):
+        raise ValueError(f"{SUB_FILE} must be a non-empty list of subreddit names")
+    return [sub.strip() for sub in subs]
+
+if os.path.exists(SUB_FILE):
+    ALL_MEMES = read_subreddits()
 else:
     ALL_MEMES = DEFAULT_SUBS
     with open(SUB_FILE, "w") as f:
         json.dump(ALL_MEMES, f, indent=2)
 
+SUBREDDIT_INDEX = PrefixIndex(ALL_MEMES)
+
 RESPONSES_FILE = "data/responses.json"
 if not os.path.exists(RESPONSES_FILE):
     with open(RESPONSES_FILE, "w") as f:
         json.dump({}, f)
 
 MEME_CHANNEL_ID = int(os.environ.get('MEMES_CHANNEL_ID', 0))
+# Comma-separated guild ids; when set, commands sync to these guilds only (instant updates while developing)
+DEV_GUILD_IDS = [int(g) for g in os.environ.get('DEV_GUILD_IDS', '').replace(',', ' ').split()]
+COMMAND_SYNC_FILE = "data/command_sync.json"
+GUILD_CONFIG_FILE = "data/guild_config.db"
+
+def _parse_shard_ids(text: str):
+    """"0-3,8" -> [0, 1, 2, 3, 8]; empty -> None (run every shard)"""
+    ids = []
+    for part in text.replace(",", " ").split():
+        start, _, end = part.partition("-")
+        ids.extend(range(int(start), int(end or start) + 1))
+    return sorted(set(ids)) or None
+
+# Sharding: unset = one process running Discord's recommended shard count.
+# To split across processes give each the same SHARD_COUNT and its own SHARD_IDS range.
+SHARD_COUNT = int(os.environ['SHARD_COUNT']) if os.environ.get('SHARD_COUNT') else None
+SHARD_IDS = _parse_shard_ids(os.environ.get('SHARD_IDS', ''))
+if SHARD_IDS and SHARD_COUNT is None:
+    raise SystemExit("SHARD_IDS needs SHARD_COUNT (the total across all processes)")
+# Poll cogs/ and subreddits.json and reload whatever changes (s!reload works either way)
+HOT_RELOAD = os.environ.get('HOT_RELOAD', '').lower() in ("1", "true", "yes")
 POST_INTERVAL_MIN = 5
 POST_INTERVAL_MAX = 10
 CACHE_SIZE = 1000
@@ -80,7 +122,8 @@ async def init_reddit():
         client_id=os.environ['REDDIT_CLIENT_ID'],
         client_secret=os.environ['REDDIT_CLIENT_SECRET'],
         user_agent=os.environ['REDDIT_USER_AGENT'],
-        timeout=15
+        timeout=15,
+        requestor_kwargs={"session": aiohttp.ClientSession(trace_configs=[tracing.trace_config()])}
     )
     reddit.read_only = True
     logger.info("✅ Reddit client initialized")
@@ -89,14 +132,60 @@ async def init_reddit():
 intents = discord.Intents.default()
 intents.message_content = True
 intents.reactions = True
-intents.members = True
-intents.guilds = True
-
-bot = commands.Bot(
+intents.guilds = True  # No members intent: converters and message payloads carry the members we use
+
+def _queued_ms(created_at: datetime) -> float:
+    """Time between Discord creating the message/interaction and us handling it"""
+    return max(0.0, (discord.utils.utcnow() - created_at).total_seconds() * 1000)
+
+class MemeTree(app_commands.CommandTree):
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        # Runs in the task that invokes the command, so stalls can be attributed to it
+        if interaction.command and interaction.type == discord.InteractionType.application_command:
+            name = f"/{interaction.command.qualified_name}"
+            label_current_task(name)
+            interaction.extras["trace"] = tracing.start_trace(
+                name, str(interaction.user), _queued_ms(interaction.created_at)
+            )
+        return True
+
+    async def on_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
+        tracing.finish_trace(interaction.extras.get("trace"), f"{type(error).__name__}: {error}")
+        await super().on_error(interaction, error)
+
+bot = commands.AutoShardedBot(
     command_prefix=["s!", "senpai "],
     intents=intents,
-    help_command=None
+    help_command=None,
+    tree_cls=MemeTree,
+    shard_count=SHARD_COUNT,
+    shard_ids=SHARD_IDS,
+    chunk_guilds_at_startup=False  # Nothing reads the member cache; don't chunk every guild on connect
 )
+tracing.instrument_discord()
+command_sync = CommandSync(bot.tree, COMMAND_SYNC_FILE)
+# Per-guild overrides of the constants above, edited with /config
+guild_config = GuildConfig(GUILD_CONFIG_FILE, GuildSettings(
+    interval_min=POST_INTERVAL_MIN, interval_max=POST_INTERVAL_MAX, upvote=UPVOTE, downvote=DOWNVOTE
+))
+bot.guild_config = guild_config
+
+@bot.before_invoke
+async def trace_prefix_command(ctx: commands.Context):
+    name = f"s!{ctx.command.qualified_name}"
+    label_current_task(name)
+    tracing.start_trace(name, str(ctx.author), _queued_ms(ctx.message.created_at))
+
+@bot.after_invoke
+async def finish_prefix_trace(ctx: commands.Context):
+    tracing.finish_trace(tracing.current_trace(), "command failed" if ctx.command_failed else None)
+
+@bot.event
+async def on_app_command_completion(interaction: discord.Interaction, command):
+    tracing.finish_trace(interaction.extras.get("trace"))
+
+# Measures event-loop lag and logs the stack of anything blocking it
+loop_monitor = LoopMonitor(interval=0.1, threshold=0.25)
 
 # ==== Cache ====
 CACHE_FILE = "cache.json"
@@ -124,17 +213,22 @@ def save_cache():
         logger.error(f"Cache save error: {e}")
 
 # ==== Meme Functions ====
-async def fetch_random_meme(target):
+def guild_settings(channel) -> GuildSettings:
+    guild = getattr(channel, "guild", None)
+    return guild_config.get(guild.id if guild else None)
+
+async def fetch_random_meme(target, subreddit_name=None, settings: GuildSettings = None):
+    settings = settings or guild_settings(target)
+    allow_nsfw = settings.nsfw != "never" and (not hasattr(target, 'is_nsfw') or target.is_nsfw())
     try:
         for _ in range(5):
-            subreddit_name = random.choice(ALL_MEMES)
-            subreddit = await reddit.subreddit(subreddit_name)
+            subreddit = await reddit.subreddit(subreddit_name or random.choice(settings.subreddits or ALL_MEMES))
             posts = []
 
             async for post in subreddit.hot(limit=100):
                 if post.stickied or not post.url or post.id in posted_ids:
                     continue
-                if hasattr(target, 'is_nsfw') and not target.is_nsfw() and post.over_18:
+                if post.over_18 and not allow_nsfw:
                     continue
 
                 clean_url = post.url.split('?')[0]
@@ -169,17 +263,18 @@ def make_embed(post):
     embed.set_footer(text=f"From r/{post.subreddit} | React to vote ⬆⬇")
     return embed
 
-async def post_meme(interaction=None, ctx=None):
+async def post_meme(interaction=None, ctx=None, subreddit=None, channel=None):
     target_channel = (
         interaction.channel if interaction else
         ctx.channel if ctx else
-        bot.get_channel(MEME_CHANNEL_ID)
+        channel or bot.get_channel(MEME_CHANNEL_ID)
     )
     if not target_channel:
         logger.error("No target channel for meme post.")
         return False
 
-    post = await fetch_random_meme(target_channel)
+    settings = guild_settings(target_channel)
+    post = await fetch_random_meme(target_channel, subreddit, settings)
     if not post:
         return False
 
@@ -197,24 +292,75 @@ async def post_meme(interaction=None, ctx=None):
     else:
         msg = await target_channel.send(embed=embed)
 
-    await msg.add_reaction(UPVOTE)
-    await msg.add_reaction(DOWNVOTE)
+    try:
+        await msg.add_reaction(settings.upvote)
+        await msg.add_reaction(settings.downvote)
+    except discord.HTTPException as e:
+        logger.warning(f"Couldn't add vote reactions in {target_channel}: {e}")
 
     meme_scores[msg.id] = {"score": 0, "embed": embed, "url": post.url}
     return True
 
 # ==== Scheduler Tasks ====
+schedule = {}  # Channel id -> (last post time, minutes until the next post)
+
+def scheduled_channels() -> dict:
+    """Shard id -> {channel id: settings} for the meme channels in this process's guilds"""
+    targets = {}
+    for guild_id, settings in guild_config.scheduled():
+        guild = bot.get_guild(guild_id)
+        if guild is not None:  # Guilds on other processes' shards are theirs to post in
+            targets.setdefault(guild.shard_id, {})[settings.meme_channel_id] = settings
+    channel = bot.get_channel(MEME_CHANNEL_ID) if MEME_CHANNEL_ID else None
+    if channel is not None:
+        guild = getattr(channel, "guild", None)
+        settings = guild_config.get(guild.id if guild else None)
+        if not settings.meme_channel_id:  # MEMES_CHANNEL_ID applies until its guild picks a channel
+            targets.setdefault(guild.shard_id if guild else 0, {})[MEME_CHANNEL_ID] = settings
+    return targets
+
+def prune_schedule(targets: dict):
+    """Forget channels that are no longer scheduled (switched off or moved through /config)"""
+    active = {channel_id for channels in targets.values() for channel_id in channels}
+    for channel_id in schedule.keys() - active:
+        del schedule[channel_id]
+
+async def post_scheduled(channel_id: int, settings: GuildSettings):
+    channel = bot.get_channel(channel_id)
+    success = False
+    try:
+        success = channel is not None and await post_meme(channel=channel)
+    except discord.HTTPException as e:
+        # e.g. the guild took away our permissions; don't let it stop every other guild's memes
+        logger.warning(f"Scheduled meme to channel {channel_id} failed: {e}")
+    except Exception as e:
+        logger.error(f"Scheduled meme to channel {channel_id} failed: {e}", exc_info=True)
+    finally:
+        schedule[channel_id] = (
+            datetime.now(timezone.utc),
+            random.uniform(settings.interval_min, settings.interval_max if success else 3)
+        )
+
 @tasks.loop(minutes=1.0)
 async def meme_scheduler():
-    if not hasattr(bot, "next_post_minutes"):
-        bot.next_post_minutes = random.uniform(POST_INTERVAL_MIN, POST_INTERVAL_MAX)
-        bot.last_post_time = datetime.now(timezone.utc)
-
-    elapsed = (datetime.now(timezone.utc) - bot.last_post_time).total_seconds() / 60
-    if elapsed >= bot.next_post_minutes and not getattr(bot, "paused", False):
-        success = await post_meme()
-        bot.last_post_time = datetime.now(timezone.utc)
-        bot.next_post_minutes = random.uniform(POST_INTERVAL_MIN, POST_INTERVAL_MAX if success else 3)
+    label_current_task("meme_scheduler")
+    if getattr(bot, "paused", False):
+        return
+    now = datetime.now(timezone.utc)
+    due = []
+    targets = scheduled_channels()
+    prune_schedule(targets)
+    for shard_id, channels in targets.items():
+        shard = bot.get_shard(shard_id)
+        if shard is None or shard.is_closed():
+            continue  # Picks up again once the shard reconnects
+        for channel_id, settings in channels.items():
+            last_post, wait = schedule.setdefault(
+                channel_id, (now, random.uniform(settings.interval_min, settings.interval_max))
+            )
+            if (now - last_post).total_seconds() / 60 >= wait:
+                due.append(post_scheduled(channel_id, settings))
+    await asyncio.gather(*due)
 
 @tasks.loop(hours=24)
 async def reset_meme_of_the_day():
@@ -223,9 +369,23 @@ async def reset_meme_of_the_day():
     meme_scores.clear()
 
 # ==== Slash Commands ====
+@functools.lru_cache(maxsize=256)
+def _guild_subreddit_index(subreddits: tuple) -> PrefixIndex:
+    return PrefixIndex(subreddits)
+
+async def subreddit_autocomplete(interaction: discord.Interaction, current: str):
+    subreddits = guild_settings(interaction.channel).subreddits
+    index = _guild_subreddit_index(subreddits) if subreddits else SUBREDDIT_INDEX
+    return [app_commands.Choice(name=f"r/{name}", value=name) for name in index.complete(current)]
+
 @bot.tree.command(name="meme", description="Get a random meme")
-async def slash_meme(interaction: discord.Interaction):
-    await post_meme(interaction=interaction)
+@app_commands.describe(subreddit="Pick a subreddit (default: random)")
+@app_commands.autocomplete(subreddit=subreddit_autocomplete)
+async def slash_meme(interaction: discord.Interaction, subreddit: str = None):
+    if subreddit and subreddit not in (guild_settings(interaction.channel).subreddits or ALL_MEMES):
+        await interaction.response.send_message("❌ That subreddit isn't on the meme list.", ephemeral=True)
+        return
+    await post_meme(interaction=interaction, subreddit=subreddit)
 
 @bot.tree.command(name="bestmeme", description="Show today's highest-rated meme")
 async def slash_bestmeme(interaction: discord.Interaction):
@@ -245,39 +405,293 @@ async def slash_stats(interaction: discord.Interaction):
     embed.add_field(name="Uptime", value=str(uptime).split(".")[0], inline=False)
     embed.add_field(name="Status", value="Paused ⏸️" if getattr(bot, "paused", False) else "Running ▶️", inline=False)
     embed.add_field(name="Loaded Cogs", value=f"{len(bot.cogs)}: {', '.join(bot.cogs)}", inline=False)
+
+    guild_counts = Counter(guild.shard_id for guild in bot.guilds)
+    shards = [
+        f"`#{shard_id}` "
+        + (f"{shard.latency * 1000:.0f}ms" if math.isfinite(shard.latency) else "–")
+        + f" · {guild_counts[shard_id]} guilds" + (" · disconnected" if shard.is_closed() else "")
+        for shard_id, shard in sorted(bot.shards.items())
+    ]
+    embed.add_field(
+        name=f"Shards ({len(shards)} of {bot.shard_count} · {len(bot.guilds)} guilds)",
+        value="\n".join(shards)[:1024] or "None",
+        inline=False
+    )
+    if hasattr(bot, "setup_seconds"):
+        warm = f"warm after {bot.warm_up_seconds:.1f}s" if bot.warmed_up else "warming up 🔥"
+        slowest = sorted(bot.cog_load_times.items(), key=lambda item: item[1], reverse=True)[:3]
+        embed.add_field(
+            name="Startup",
+            value=f"Setup {bot.setup_seconds:.1f}s · {warm}\n"
+                  + " · ".join(f"`{name}` {ms:.0f}ms" for name, ms in slowest),
+            inline=False
+        )
+
+    timings = [
+        f"`{name}` p50 {h['p50']:.0f}ms · p95 {h['p95']:.0f}ms (n={h['count']})"
+        for name, h in metrics.snapshot()["histograms"].items()
+        if h["count"] and not name.startswith("command.")  # Per-command timings live in s!slowlog
+    ]
+    if timings:
+        embed.add_field(name="Timings", value="\n".join(timings)[:1024], inline=False)
+
+    caches = [
+        f"`{name}` {st['hits']} hits / {st['misses']} misses ({st['hit_rate']:.0%}) · {st['bytes'] // 1024} KB"
+        for name, st in ((name, cache.stats()) for name, cache in all_caches().items())
+    ]
+    if caches:
+        embed.add_field(name="Caches", value="\n".join(caches)[:1024], inline=False)
+
+    stalls = loop_monitor.recent(5)
+    if stalls:
+        embed.add_field(
+            name=f"Loop Stalls ({metrics.counter('loop.stalls').value} total)",
+            value="\n".join(
+                f"<t:{int(stall['time'])}:R> `{stall['label']}` {stall['duration_ms']:.0f}ms" for stall in stalls
+            )[:1024],
+            inline=False
+        )
     await interaction.followup.send(embed=embed)
 
+# ==== Owner Commands ====
+@bot.command(name="slowlog")
+@commands.is_owner()
+async def slowlog(ctx: commands.Context, entry: int = 0):
+    """Slowest recent commands, or the span breakdown of one of them"""
+    slowest = tracing.slow_log.slowest(10)
+    if not slowest:
+        await ctx.send(f"🐢 No commands slower than {tracing.slow_log.threshold_ms:.0f}ms yet.")
+        return
+
+    if entry:
+        if not 1 <= entry <= len(slowest):
+            await ctx.send(f"❌ Pick an entry between 1 and {len(slowest)}")
+            return
+        trace = slowest[entry - 1]
+        lines = [
+            f"{offset:>7.0f}ms +{duration:>6.0f}ms  {kind:<8} {label}"
+            for kind, label, offset, duration in sorted(trace.spans, key=lambda s: s[2])
+        ]
+        embed = discord.Embed(title=f"🐢 {trace.name} by {trace.user}", description=trace.summary(), color=0xFFAA00)
+        embed.add_field(name="Spans", value=("```\n" + "\n".join(lines)[:990] + "\n```") if lines else "None", inline=False)
+        if trace.error:
+            embed.add_field(name="Error", value=trace.error[:1024], inline=False)
+        embed.set_footer(text=datetime.fromtimestamp(trace.wall_time, timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC"))
+        await ctx.send(embed=embed)
+        return
+
+    embed = discord.Embed(title="🐢 Slowest Recent Commands", color=0xFFAA00)
+    embed.description = "\n".join(
+        f"`{i}.` <t:{int(trace.wall_time)}:R> {trace.summary()}" for i, trace in enumerate(slowest, start=1)
+    )[:4096]
+    per_command = [
+        f"`{name[len('command.'):-len('.ms')]}` p50 {h['p50']:.0f}ms · p95 {h['p95']:.0f}ms (n={h['count']})"
+        for name, h in sorted(metrics.snapshot()["histograms"].items())
+        if name.startswith("command.") and h["count"]
+    ]
+    if per_command:
+        embed.add_field(name="Per Command", value="\n".join(per_command)[:1024], inline=False)
+    embed.set_footer(text="s!slowlog <n> shows the spans of entry n")
+    await ctx.send(embed=embed)
+
+@bot.command(name="sync")
+@commands.is_owner()
+async def sync_prefix(ctx: commands.Context, mode: str = ""):
+    """Sync slash commands now; `s!sync force` ignores the stored fingerprints"""
+    async with ctx.typing():
+        synced = await sync_commands(force=mode.lower() == "force")
+    scope = f"{len(DEV_GUILD_IDS)} dev guild(s)" if DEV_GUILD_IDS else "global"
+    if synced:
+        await ctx.send(f"✅ Synced slash commands ({scope})")
+    else:
+        await ctx.send(f"👌 Slash commands unchanged ({scope}); use `s!sync force` to push anyway")
+
 # ==== Cog Loader ====
+async def load_cog(cog_name: str):
+    """Load one extension and record how long its import and setup took"""
+    started = time.perf_counter()
+    try:
+        await bot.load_extension(f"{COGS_DIR}.{cog_name}")
+    except Exception as e:
+        logger.error(f"❌ Failed to load cog {cog_name}: {e}", exc_info=True)
+        return
+    bot.cog_load_times[cog_name] = (time.perf_counter() - started) * 1000
+    logger.info(f"✅ Loaded cog: {cog_name} ({bot.cog_load_times[cog_name]:.0f}ms)")
+
 async def load_all_cogs():
-    for filename in os.listdir(COGS_DIR):
-        if filename.endswith(".py") and not filename.startswith("_"):
-            cog_name = filename[:-3]
-            full_path = f"{COGS_DIR}.{cog_name}"
-            try:
-                await bot.load_extension(full_path)
-                logger.info(f"✅ Loaded cog: {cog_name}")
-            except Exception as e:
-                logger.error(f"❌ Failed to load cog {cog_name}: {e}", exc_info=True)
+    # Imports still run one at a time, but each cog's async setup overlaps the others
+    bot.cog_load_times = {}
+    started = time.perf_counter()
+    names = sorted(filename[:-3] for filename in os.listdir(COGS_DIR)
+                   if filename.endswith(".py") and not filename.startswith("_"))
+    await asyncio.gather(*(load_cog(name) for name in names))
+    slowest = sorted(bot.cog_load_times.items(), key=lambda item: item[1], reverse=True)
+    logger.info(
+        f"Loaded {len(bot.cog_load_times)}/{len(names)} cogs in {(time.perf_counter() - started) * 1000:.0f}ms "
+        f"(slowest: {', '.join(f'{name} {ms:.0f}ms' for name, ms in slowest[:3])})"
+    )
+
+async def warm_up_cog(cog: commands.Cog):
+    started = time.perf_counter()
+    try:
+        await cog.warm_up()
+    except Exception as e:
+        logger.warning(f"Warm-up failed for {cog.qualified_name}: {type(e).__name__} - {e}")
+        return
+    logger.info(f"🔥 Warmed up {cog.qualified_name} in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+async def warm_up():
+    """Background stage: fonts, indexes, GIF pools and numpy, while commands are already served"""
+    label_current_task("warm_up")
+    await asyncio.gather(*(warm_up_cog(cog) for cog in list(bot.cogs.values()) if hasattr(cog, "warm_up")))
+    bot.warmed_up = True
+    bot.warm_up_seconds = time.perf_counter() - STARTED_AT
+    logger.info(f"🔥 Warm-up complete {bot.warm_up_seconds:.1f}s after start")
+
+async def sync_commands(force: bool = False) -> int:
+    """Sync slash commands where the tree changed since the last sync; returns scopes synced"""
+    started = time.perf_counter()
+    synced = 0
+    try:
+        if DEV_GUILD_IDS:
+            for guild_id in DEV_GUILD_IDS:
+                guild = discord.Object(id=guild_id)
+                bot.tree.copy_global_to(guild=guild)
+                synced += await command_sync.sync(guild=guild, force=force) is not None
+        else:
+            synced += await command_sync.sync(force=force) is not None
+        bot.synced_commands = True
+    except Exception as e:
+        logger.error(f"❌ Command sync error: {e}")
+    logger.info(f"Command sync finished in {(time.perf_counter() - started) * 1000:.0f}ms ({synced} scopes pushed)")
+    return synced
+
+# ==== Hot Reload ====
+watched_mtimes = {}  # Path -> mtime_ns as of the last reload check
+COG_NAME_RE = re.compile(r"^[A-Za-z_][\w.]*$")  # Module names only, never paths
+
+def _file_mtimes() -> dict:
+    paths = [SUB_FILE] + [
+        os.path.join(COGS_DIR, filename) for filename in os.listdir(COGS_DIR)
+        if filename.endswith(".py") and not filename.startswith("_")
+    ]
+    mtimes = {}
+    for path in paths:
+        try:
+            mtimes[path] = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            pass
+    return mtimes
+
+def reload_subreddits():
+    """Re-read subreddits.json and swap the list and its index together"""
+    global ALL_MEMES, SUBREDDIT_INDEX
+    subs = read_subreddits()
+    index = PrefixIndex(subs)
+    added = [sub for sub in subs if sub not in ALL_MEMES]
+    removed = [sub for sub in ALL_MEMES if sub not in subs]
+    # No await between building and swapping, so no command ever sees a list without its index
+    ALL_MEMES, SUBREDDIT_INDEX = subs, index
+    return added, removed
+
+async def reload_cog(cog_name: str, present: bool = True) -> str:
+    extension = f"{COGS_DIR}.{cog_name}"
+    if not present:
+        await bot.unload_extension(extension)
+        return "unloaded"
+    if extension in bot.extensions:
+        await bot.reload_extension(extension)  # Rolls back to the old module if the new one fails
+        action = "reloaded"
+    else:
+        await bot.load_extension(extension)
+        action = "loaded"
+    for cog in list(bot.cogs.values()):
+        if cog.__module__ == extension and hasattr(cog, "warm_up"):
+            asyncio.create_task(warm_up_cog(cog))
+    return action
+
+async def reload_changed(force=()) -> list:
+    """Reload cogs and subreddits.json whose files changed (or are in `force`); one line per file"""
+    current = _file_mtimes()
+    changed = {path for path in current.keys() | watched_mtimes.keys() if current.get(path) != watched_mtimes.get(path)}
+    # Failed reloads aren't retried until the file changes again
+    watched_mtimes.clear()
+    watched_mtimes.update(current)
+
+    results = []
+    cogs_changed = False
+    for path in sorted(changed | set(force)):
+        name = os.path.basename(path)
+        started = time.perf_counter()
+        try:
+            if path == SUB_FILE:
+                added, removed = reload_subreddits()
+                summary = f"{len(ALL_MEMES)} subreddits (+{len(added)} / -{len(removed)})"
+            else:
+                summary = await reload_cog(name[:-3], present=path in current)
+                cogs_changed = True
+        except Exception as e:
+            logger.error(f"❌ Reload of {name} failed: {e}", exc_info=True)
+            results.append(f"❌ `{name}`: {type(e).__name__}: {e}")
+            continue
+        elapsed = (time.perf_counter() - started) * 1000
+        logger.info(f"♻️ {name}: {summary} in {elapsed:.0f}ms")
+        results.append(f"♻️ `{name}`: {summary} in {elapsed:.0f}ms")
+
+    if cogs_changed and bot.is_ready():
+        asyncio.create_task(sync_commands())  # No-op unless the command tree actually changed
+    return results
+
+@tasks.loop(seconds=2.0)
+async def watch_files():
+    label_current_task("watch_files")
+    await reload_changed()
+
+@bot.command(name="reload")
+@commands.is_owner()
+async def reload_prefix(ctx: commands.Context, *targets: str):
+    """Reload changed cogs and subreddits.json; name cogs (or `subs`) to force them"""
+    force = []
+    for target in targets:
+        if target.lower() in ("subs", "subreddits"):
+            force.append(SUB_FILE)
+            continue
+        cog_name = target.removeprefix(f"{COGS_DIR}.")
+        if f"{COGS_DIR}.{cog_name}" not in bot.extensions and not COG_NAME_RE.fullmatch(cog_name):
+            await ctx.send(f"❌ `{target}` isn't a cog name")
+            return
+        path = os.path.join(COGS_DIR, f"{cog_name}.py")
+        if not os.path.exists(path):
+            await ctx.send(f"❌ No cog or file called `{target}`")
+            return
+        force.append(path)
+    results = await reload_changed(force)
+    await ctx.send("\n".join(results)[:2000] if results else "👌 Nothing changed on disk")
 
 # ==== Events ====
+@bot.event
+async def setup_hook():
+    """Staged startup, before the gateway connects: cogs, Reddit client and cache together"""
+    bot.warmed_up = False
+    await asyncio.gather(load_all_cogs(), init_reddit(), asyncio.to_thread(load_cache), guild_config.open())
+    watched_mtimes.update(_file_mtimes())
+    if HOT_RELOAD:
+        watch_files.start()
+    bot.setup_seconds = time.perf_counter() - STARTED_AT
+    logger.info(f"Setup finished {bot.setup_seconds:.1f}s after start")
+    bot.warm_up_task = asyncio.create_task(warm_up())
+
 @bot.event
 async def on_ready():
     bot.start_time = datetime.now(timezone.utc)
     bot.paused = False
-    logger.info(f"Logged in as {bot.user} (ID: {bot.user.id})")
+    logger.info(f"Logged in as {bot.user} (ID: {bot.user.id}) {time.perf_counter() - STARTED_AT:.1f}s after start")
 
-    if reddit is None:
-        await init_reddit()
-    load_cache()
-
-    # Sync commands only once
+    # Sync commands only once, without holding up the scheduler
     if not hasattr(bot, "synced_commands"):
-        try:
-            synced = await bot.tree.sync()
-            logger.info(f"✅ Synced {len(synced)} slash commands")
-            bot.synced_commands = True
-        except Exception as e:
-            logger.error(f"❌ Command sync error: {e}")
+        bot.synced_commands = False
+        bot.sync_task = asyncio.create_task(sync_commands())
 
     # Start tasks only once
     if not meme_scheduler.is_running():
@@ -292,6 +706,19 @@ async def on_ready():
         )
     )
 
+@bot.event
+async def on_shard_ready(shard_id: int):
+    logger.info(f"Shard {shard_id} ready ({sum(1 for g in bot.guilds if g.shard_id == shard_id)} guilds)")
+
+@bot.event
+async def on_shard_disconnect(shard_id: int):
+    logger.warning(f"Shard {shard_id} disconnected")
+
+@bot.event
+async def on_guild_settings_update(guild_id: int, settings: GuildSettings):
+    """Dispatched by the config cog; stop scheduling channels a guild just switched off"""
+    prune_schedule(scheduled_channels())
+
 @bot.event
 async def on_message(message):
     if message.author.bot:
@@ -300,10 +727,13 @@ async def on_message(message):
 
 # ==== Main ====
 async def main():
-    # Load cogs before starting bot
-    await load_all_cogs()
-    async with bot:
-        await bot.start(os.environ['DISCORD_TOKEN'])
+    loop_monitor.start()
+    # Cogs load in setup_hook; warm-up continues in the background after login
+    try:
+        async with bot:
+            await bot.start(os.environ['DISCORD_TOKEN'])
+    finally:
+        await guild_config.close()  # aiosqlite's worker thread would otherwise keep the process alive
 
 if __name__ == "__main__":
     keep_alive()
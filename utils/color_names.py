@@ -0,0 +1,184 @@
+import json
+import math
+import re
+import threading
+import logging
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+COLORS_FILE = "data/colors.json"
+# Earlier sources win when two palettes normalise to the same name
+SOURCES = ("css4", "x11", "xkcd")
+
+Lab = Tuple[float, float, float]
+
+def normalize_name(name: str) -> str:
+    """Case/spacing-insensitive key, so "Light Blue" and "lightblue" match"""
+    return re.sub(r"[\s_\-']", "", name.strip().lower())
+
+# --- Color math ---
+def _srgb_to_linear(c: float) -> float:
+    return c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4
+
+def rgb_to_lab(color_value: int) -> Lab:
+    """sRGB integer to CIELAB (D65 white point)"""
+    r, g, b = (_srgb_to_linear(((color_value >> shift) & 0xFF) / 255) for shift in (16, 8, 0))
+    x = (0.4124564 * r + 0.3575761 * g + 0.1804375 * b) / 0.95047
+    y = 0.2126729 * r + 0.7151522 * g + 0.0721750 * b
+    z = (0.0193339 * r + 0.1191920 * g + 0.9503041 * b) / 1.08883
+
+    def f(t):
+        return t ** (1 / 3) if t > 216 / 24389 else (24389 / 27 * t + 16) / 116
+
+    fx, fy, fz = f(x), f(y), f(z)
+    return 116 * fy - 16, 500 * (fx - fy), 200 * (fy - fz)
+
+def delta_e_2000(lab1: Lab, lab2: Lab) -> float:
+    """CIEDE2000 colour difference"""
+    L1, a1, b1 = lab1
+    L2, a2, b2 = lab2
+    c_bar = (math.hypot(a1, b1) + math.hypot(a2, b2)) / 2
+    g = 0.5 * (1 - math.sqrt(c_bar ** 7 / (c_bar ** 7 + 25 ** 7)))
+    a1p, a2p = a1 * (1 + g), a2 * (1 + g)
+    c1p, c2p = math.hypot(a1p, b1), math.hypot(a2p, b2)
+    h1p = math.degrees(math.atan2(b1, a1p)) % 360
+    h2p = math.degrees(math.atan2(b2, a2p)) % 360
+
+    dLp = L2 - L1
+    dCp = c2p - c1p
+    dhp = 0.0
+    if c1p * c2p:
+        dhp = h2p - h1p
+        if dhp > 180:
+            dhp -= 360
+        elif dhp < -180:
+            dhp += 360
+    dHp = 2 * math.sqrt(c1p * c2p) * math.sin(math.radians(dhp / 2))
+
+    Lp_bar = (L1 + L2) / 2
+    cp_bar = (c1p + c2p) / 2
+    hp_bar = h1p + h2p
+    if c1p * c2p:
+        if abs(h1p - h2p) > 180:
+            hp_bar += 360 if hp_bar < 360 else -360
+        hp_bar /= 2
+
+    t = (1 - 0.17 * math.cos(math.radians(hp_bar - 30)) + 0.24 * math.cos(math.radians(2 * hp_bar))
+         + 0.32 * math.cos(math.radians(3 * hp_bar + 6)) - 0.20 * math.cos(math.radians(4 * hp_bar - 63)))
+    d_theta = 30 * math.exp(-(((hp_bar - 275) / 25) ** 2))
+    r_c = 2 * math.sqrt(cp_bar ** 7 / (cp_bar ** 7 + 25 ** 7))
+    s_l = 1 + 0.015 * (Lp_bar - 50) ** 2 / math.sqrt(20 + (Lp_bar - 50) ** 2)
+    s_c = 1 + 0.045 * cp_bar
+    s_h = 1 + 0.015 * cp_bar * t
+    r_t = -math.sin(math.radians(2 * d_theta)) * r_c
+    return math.sqrt(
+        (dLp / s_l) ** 2 + (dCp / s_c) ** 2 + (dHp / s_h) ** 2 + r_t * (dCp / s_c) * (dHp / s_h)
+    )
+
+# --- k-d tree over Lab points ---
+class _KDTree:
+    """Static 3-d tree; nodes are (point index, axis, left, right) tuples"""
+    def __init__(self, points: List[Lab]):
+        self.points = points
+        self.root = self._build(list(range(len(points))), 0)
+
+    def _build(self, indices: List[int], depth: int):
+        if not indices:
+            return None
+        axis = depth % 3
+        indices.sort(key=lambda i: self.points[i][axis])
+        mid = len(indices) // 2
+        return (indices[mid], axis,
+                self._build(indices[:mid], depth + 1),
+                self._build(indices[mid + 1:], depth + 1))
+
+    def nearest(self, target: Lab, k: int) -> List[int]:
+        """Indices of the k points closest to `target` (Euclidean, i.e. ΔE76)"""
+        best: List[Tuple[float, int]] = []  # Sorted (squared distance, index)
+
+        def visit(node):
+            if node is None:
+                return
+            index, axis, left, right = node
+            point = self.points[index]
+            dist = sum((p - t) ** 2 for p, t in zip(point, target))
+            if len(best) < k or dist < best[-1][0]:
+                best.append((dist, index))
+                best.sort()
+                del best[k:]
+            diff = target[axis] - point[axis]
+            near, far = (left, right) if diff < 0 else (right, left)
+            visit(near)
+            if len(best) < k or diff * diff < best[-1][0]:
+                visit(far)
+
+        visit(self.root)
+        return [index for _, index in best]
+
+class ColorIndex:
+    """Named-color database with name lookup and perceptual nearest match"""
+    def __init__(self, palettes: Dict[str, Dict[str, str]]):
+        self.by_key: Dict[str, Tuple[str, int]] = {}
+        for source in reversed(SOURCES):
+            for name, hex_code in palettes.get(source, {}).items():
+                value = int(hex_code.lstrip("#"), 16)
+                self.by_key[normalize_name(name)] = (name, value)
+                # "xkcd:light blue" always reaches the XKCD variant
+                self.by_key[f"{source}:{normalize_name(name)}"] = (name, value)
+
+        # One entry per distinct value for matching; CSS names win ties
+        by_value: Dict[int, str] = {}
+        for source in reversed(SOURCES):
+            for name, hex_code in palettes.get(source, {}).items():
+                by_value[int(hex_code.lstrip("#"), 16)] = name
+        self.values = list(by_value)
+        self.value_names = [by_value[v] for v in self.values]
+        self.labs = [rgb_to_lab(v) for v in self.values]
+        self.tree = _KDTree(self.labs)
+        self.nearest = lru_cache(maxsize=4096)(self._nearest)
+
+    def __len__(self):
+        return len({key for key in self.by_key if ":" not in key})
+
+    def lookup(self, name: str) -> Optional[int]:
+        """Color value for a name from any palette, or None"""
+        source, sep, rest = name.partition(":")
+        key = f"{source.strip().lower()}:{normalize_name(rest)}" if sep else normalize_name(name)
+        entry = self.by_key.get(key)
+        return entry[1] if entry else None
+
+    def names(self) -> List[str]:
+        """Display names of every color, without the palette prefixes"""
+        return sorted({name for key, (name, _) in self.by_key.items() if ":" not in key})
+
+    def _nearest(self, color_value: int) -> Optional[Tuple[str, int, float]]:
+        """(name, value, ΔE2000) of the perceptually closest named color"""
+        if not self.values:
+            return None
+        target = rgb_to_lab(color_value)
+        # The ΔE2000 winner is almost always among the closest ΔE76 points,
+        # so only a small neighbourhood is reranked with the expensive metric
+        candidates = self.tree.nearest(target, k=32)
+        best = min(candidates, key=lambda i: delta_e_2000(target, self.labs[i]))
+        return self.value_names[best], self.values[best], delta_e_2000(target, self.labs[best])
+
+_index: Optional[ColorIndex] = None
+_index_lock = threading.Lock()
+
+def get_color_index() -> ColorIndex:
+    """Load and index the color database on first use"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                try:
+                    with open(COLORS_FILE, "r", encoding="utf-8") as f:
+                        palettes = json.load(f)
+                except (FileNotFoundError, json.JSONDecodeError) as e:
+                    logger.error(f"Error loading color names: {e}")
+                    palettes = {}
+                _index = ColorIndex(palettes)
+                logger.info(f"Indexed {len(_index)} color names")
+    return _index
@@ -0,0 +1,76 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Dict, Optional
+
+import discord
+from discord import app_commands
+
+logger = logging.getLogger(__name__)
+
+def tree_fingerprint(tree: app_commands.CommandTree, guild: Optional[discord.abc.Snowflake] = None) -> str:
+    """Stable hash of the payload Discord would receive for one scope.
+
+    Built from each command's to_dict(), which covers names, descriptions,
+    options, choices, localizations and permissions, so any change that
+    needs a sync changes the hash.
+    """
+    payload = sorted(
+        (command.to_dict(tree) for command in tree.get_commands(guild=guild)),
+        key=lambda data: (data.get("type", 1), data["name"])
+    )
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+class CommandSync:
+    """Sync the command tree only when it differs from what was last synced.
+
+    Fingerprints are kept in `path` per application and scope ("global" or a
+    guild id), so a restart with an unchanged tree costs no API call.
+    """
+    def __init__(self, tree: app_commands.CommandTree, path: str = "data/command_sync.json"):
+        self.tree = tree
+        self.path = path
+        self.synced: Dict[str, str] = self._load()
+
+    def _load(self) -> Dict[str, str]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Ignoring unreadable command sync state: {e}")
+            return {}
+
+    def _save(self):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.synced, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.path)
+
+    def _key(self, guild: Optional[discord.abc.Snowflake]) -> str:
+        return f"{self.tree.client.application_id}:{guild.id if guild else 'global'}"
+
+    def is_current(self, guild: Optional[discord.abc.Snowflake] = None) -> bool:
+        return self.synced.get(self._key(guild)) == tree_fingerprint(self.tree, guild)
+
+    async def sync(self, guild: Optional[discord.abc.Snowflake] = None, force: bool = False) -> Optional[int]:
+        """Sync one scope if its tree changed; returns the command count, or None if skipped"""
+        scope = f"guild {guild.id}" if guild else "global"
+        fingerprint = tree_fingerprint(self.tree, guild)
+        if not force and self.synced.get(self._key(guild)) == fingerprint:
+            logger.info(f"Slash commands unchanged ({scope}, {fingerprint[:12]}), skipping sync")
+            return None
+
+        started = time.perf_counter()
+        synced = await self.tree.sync(guild=guild)
+        self.synced[self._key(guild)] = fingerprint
+        self._save()
+        logger.info(
+            f"✅ Synced {len(synced)} slash commands ({scope}) in {(time.perf_counter() - started) * 1000:.0f}ms"
+        )
+        return len(synced)
@@ -0,0 +1,61 @@
+import asyncio
+import contextvars
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Iterable, List, Optional
+
+from utils import metrics
+
+logger = logging.getLogger(__name__)
+
+class GifPool:
+    """Prefetched GIF URLs per action so emote commands skip the API round trip.
+
+    `fetch(action, amount)` returns a batch of URLs. Taking from a pool that
+    is running low schedules a background refill; an empty pool returns None
+    and the caller falls back to fetching a single GIF itself.
+    """
+    def __init__(self, name: str, fetch: Callable[[str, int], Awaitable[List[str]]], batch: int = 10,
+                 low_water: int = 3):
+        self.fetch = fetch
+        self.batch = batch
+        self.low_water = low_water
+        self._urls: Dict[str, Deque[str]] = {}
+        self._refills: Dict[str, asyncio.Task] = {}
+        self.hits = metrics.counter(f"{name}.hits")
+        self.misses = metrics.counter(f"{name}.misses")
+
+    def take(self, action: str) -> Optional[str]:
+        urls = self._urls.get(action)
+        url = urls.popleft() if urls else None
+        (self.hits if url else self.misses).inc()
+        if not urls or len(urls) < self.low_water:
+            self.refill(action)
+        return url
+
+    def refill(self, action: str) -> asyncio.Task:
+        """Start (or join) a background refill of one action"""
+        task = self._refills.get(action)
+        if task is None or task.done():
+            # Fresh context: the refill is not part of whichever command triggered it
+            task = asyncio.create_task(self._refill(action), context=contextvars.Context())
+            self._refills[action] = task
+        return task
+
+    async def _refill(self, action: str):
+        try:
+            urls = await self.fetch(action, self.batch)
+        except Exception as e:
+            logger.warning(f"GIF pool refill failed for {action}: {type(e).__name__} - {e}")
+            return
+        self._urls.setdefault(action, deque()).extend(urls)
+
+    async def fill(self, actions: Iterable[str]):
+        """Warm every action one at a time (a burst of parallel requests gets rate limited)"""
+        for action in actions:
+            await self.refill(action)
+
+    def close(self):
+        for task in self._refills.values():
+            task.cancel()
+        self._refills.clear()
@@ -0,0 +1,134 @@
+import asyncio
+import json
+import logging
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import aiosqlite
+
+from utils import metrics
+
+logger = logging.getLogger(__name__)
+
+NSFW_POLICIES = ("channel", "never")  # Follow the channel's NSFW flag, or never post NSFW
+SUBREDDIT_RE = re.compile(r"^[A-Za-z0-9_]{2,21}$")
+MAX_SUBREDDITS = 50
+MAX_INTERVAL_MINUTES = 24 * 60
+
+class GuildSettings(NamedTuple):
+    meme_channel_id: int = 0                # 0 = no scheduled posts
+    interval_min: float = 5.0               # Minutes between scheduled posts
+    interval_max: float = 10.0
+    subreddits: Tuple[str, ...] = ()        # Empty = the bot-wide subreddits.json list
+    nsfw: str = "channel"
+    upvote: str = "⬆️"
+    downvote: str = "⬇️"
+
+def validate(settings: GuildSettings):
+    """Raise ValueError with a user-facing message if `settings` can't be used"""
+    if not 1 <= settings.interval_min <= settings.interval_max <= MAX_INTERVAL_MINUTES:
+        raise ValueError(f"Intervals must satisfy 1 ≤ min ≤ max ≤ {MAX_INTERVAL_MINUTES} minutes")
+    if settings.nsfw not in NSFW_POLICIES:
+        raise ValueError(f"NSFW policy must be one of: {', '.join(NSFW_POLICIES)}")
+    if len(settings.subreddits) > MAX_SUBREDDITS:
+        raise ValueError(f"At most {MAX_SUBREDDITS} subreddits per server")
+    bad = [sub for sub in settings.subreddits if not SUBREDDIT_RE.match(sub)]
+    if bad:
+        raise ValueError(f"Not a subreddit name: {', '.join(bad[:5])}")
+    if not settings.upvote or not settings.downvote:
+        raise ValueError("Vote emojis can't be empty")
+
+class GuildConfig:
+    """Per-guild settings in SQLite, served from memory.
+
+    Each guild's row holds only the fields it overrides (as JSON), so changing
+    a bot-wide default still reaches guilds that never touched it. All rows
+    are read once in open(); after that get() never does I/O, and updates
+    write to SQLite first and only then replace the cached settings.
+    """
+    def __init__(self, path: str, defaults: GuildSettings = GuildSettings()):
+        self.path = path
+        self.defaults = defaults
+        self._db: Optional[aiosqlite.Connection] = None
+        self._overrides: Dict[int, dict] = {}
+        self._settings: Dict[int, GuildSettings] = {}
+        self._lock = asyncio.Lock()  # Read-modify-write of one guild's overrides must not interleave
+        self.writes = metrics.counter("guild_config.writes")
+
+    async def open(self):
+        self._db = await aiosqlite.connect(self.path)
+        await self._db.execute(
+            "CREATE TABLE IF NOT EXISTS guild_settings (guild_id INTEGER PRIMARY KEY, overrides TEXT NOT NULL)"
+        )
+        await self._db.commit()
+        async with self._db.execute("SELECT guild_id, overrides FROM guild_settings") as cursor:
+            async for guild_id, data in cursor:
+                try:
+                    self._cache(guild_id, json.loads(data))
+                except (json.JSONDecodeError, TypeError, ValueError) as e:
+                    logger.error(f"Ignoring bad settings for guild {guild_id}: {e}")
+        logger.info(f"Loaded settings for {len(self._settings)} guilds")
+
+    async def close(self):
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+
+    def _merge(self, overrides: dict) -> GuildSettings:
+        fields = {key: value for key, value in overrides.items() if key in GuildSettings._fields}
+        if "subreddits" in fields:
+            fields["subreddits"] = tuple(fields["subreddits"])
+        return self.defaults._replace(**fields)
+
+    def _cache(self, guild_id: int, overrides: dict):
+        settings = self._merge(overrides)
+        validate(settings)
+        self._overrides[guild_id] = overrides
+        self._settings[guild_id] = settings
+
+    def get(self, guild_id: Optional[int]) -> GuildSettings:
+        """Settings for a guild (defaults for DMs and unconfigured guilds); memory only"""
+        return self._settings.get(guild_id, self.defaults)
+
+    def scheduled(self) -> List[Tuple[int, GuildSettings]]:
+        """(guild id, settings) for every guild with a meme channel"""
+        return [(guild_id, settings) for guild_id, settings in self._settings.items() if settings.meme_channel_id]
+
+    async def _write(self, guild_id: int, overrides: dict):
+        if self._db is None:
+            raise RuntimeError("Guild settings store is not open")
+        if overrides:
+            await self._db.execute(
+                "INSERT INTO guild_settings (guild_id, overrides) VALUES (?, ?) "
+                "ON CONFLICT(guild_id) DO UPDATE SET overrides = excluded.overrides",
+                (guild_id, json.dumps(overrides, ensure_ascii=False))
+            )
+        else:
+            await self._db.execute("DELETE FROM guild_settings WHERE guild_id = ?", (guild_id,))
+        await self._db.commit()
+        self.writes.inc()
+        if overrides:
+            self._cache(guild_id, overrides)
+        else:
+            self._overrides.pop(guild_id, None)
+            self._settings.pop(guild_id, None)
+
+    async def update(self, guild_id: int, **changes) -> GuildSettings:
+        """Validate, persist, then cache; raises ValueError for bad values"""
+        async with self._lock:
+            overrides = {**self._overrides.get(guild_id, {}), **changes}
+            if "subreddits" in overrides:
+                overrides["subreddits"] = list(overrides["subreddits"])
+            validate(self._merge(overrides))
+            await self._write(guild_id, overrides)
+        return self.get(guild_id)
+
+    async def reset(self, guild_id: int, *fields: str) -> GuildSettings:
+        """Drop a guild's overrides (all of them, or just `fields`) back to the defaults"""
+        async with self._lock:
+            overrides = {
+                key: value for key, value in self._overrides.get(guild_id, {}).items() if fields and key not in fields
+            }
+            validate(self._merge(overrides))
+            await self._write(guild_id, overrides)
+        return self.get(guild_id)
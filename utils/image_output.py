@@ -0,0 +1,62 @@
+import io
+import logging
+from typing import List, Tuple
+
+from PIL import Image, features
+
+logger = logging.getLogger(__name__)
+
+HAS_WEBP = features.check("webp")
+
+def _save(img: Image.Image, fmt: str, **params) -> bytes:
+    buf = io.BytesIO()
+    img.save(buf, format=fmt, **params)
+    return buf.getvalue()
+
+def encode_image(img: Image.Image) -> Tuple[bytes, str]:
+    """Losslessly encode `img` with whichever format comes out smallest.
+
+    Text renders are mostly white with a few hundred anti-aliasing shades, so
+    an exact palette PNG is usually far smaller than full RGB. Images with
+    more colours (avatars) are tried as optimized RGB PNG and lossless WebP.
+    Returns (data, file extension).
+    """
+    candidates = []
+    colors = img.getcolors(maxcolors=256)
+    if colors is not None:
+        # Few enough colours for an exact palette; PNG picks the bit depth
+        paletted = img.convert("P", palette=Image.Palette.ADAPTIVE, colors=len(colors))
+        candidates.append((_save(paletted, "PNG", optimize=True), "png"))
+    else:
+        candidates.append((_save(img, "PNG", optimize=True), "png"))
+    if HAS_WEBP:
+        candidates.append((_save(img, "WEBP", lossless=True, quality=100, method=4), "webp"))
+    return min(candidates, key=lambda c: len(c[0]))
+
+def encode_for_upload(img: Image.Image, max_bytes: int) -> List[Tuple[bytes, str]]:
+    """Encode `img` into one or more files that each fit in `max_bytes`.
+
+    Tall images are split into horizontal strips; anything else that is still
+    too big is downscaled until it fits.
+    """
+    data, ext = encode_image(img)
+    if len(data) <= max_bytes:
+        return [(data, ext)]
+
+    if img.height >= img.width * 2:
+        strips = min(10, -(-len(data) // max_bytes) + 1)
+        strip_height = -(-img.height // strips)
+        pages = []
+        for top in range(0, img.height, strip_height):
+            strip = img.crop((0, top, img.width, min(img.height, top + strip_height)))
+            pages.extend(encode_for_upload(strip, max_bytes))
+        return pages
+
+    scale = (max_bytes / len(data)) ** 0.5 * 0.9
+    while len(data) > max_bytes and min(img.size) > 16:
+        img = img.resize((max(1, int(img.width * scale)), max(1, int(img.height * scale))), Image.LANCZOS)
+        data, ext = encode_image(img)
+        scale = 0.8
+    if len(data) > max_bytes:
+        logger.warning(f"Image still {len(data)} bytes after downscaling")
+    return [(data, ext)]
@@ -0,0 +1,121 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+import weakref
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from utils import metrics
+
+logger = logging.getLogger(__name__)
+
+# Task -> what it is running ("/meme", "s!uwu", "meme_scheduler"), for stall reports
+_task_labels: "weakref.WeakKeyDictionary[asyncio.Task, str]" = weakref.WeakKeyDictionary()
+
+def label_current_task(label: str):
+    """Name the running task so a stall inside it can be attributed"""
+    task = asyncio.current_task()
+    if task is not None:
+        _task_labels[task] = label
+
+def task_label(task: Optional[asyncio.Task]) -> str:
+    if task is None:
+        return "<loop callback>"
+    label = _task_labels.get(task)
+    if label:
+        return label
+    coro = task.get_coro()
+    return getattr(coro, "__qualname__", None) or task.get_name()
+
+class LoopMonitor:
+    """Event-loop watchdog.
+
+    A heartbeat coroutine wakes every `interval` seconds and records how late
+    it was into the `loop.lag_ms` histogram. A sampler thread watches the
+    heartbeat; once the loop has been stuck for `threshold` seconds it grabs
+    the loop thread's stack with sys._current_frames(), so the report shows
+    the blocking line itself rather than whatever runs after it.
+    """
+    def __init__(self, interval: float = 0.1, threshold: float = 0.25, sample_interval: float = 0.02,
+                 keep: int = 50):
+        self.interval = interval
+        self.threshold = threshold
+        self.sample_interval = sample_interval
+        self.stalls: Deque[Dict] = deque(maxlen=keep)
+        self.lag = metrics.histogram("loop.lag_ms")
+        self.stall_count = metrics.counter("loop.stalls")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._last_tick = 0.0
+        self._current_stall: Optional[Dict] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self):
+        """Start monitoring the running loop (call from a coroutine)"""
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_tick = time.perf_counter()
+        self._stop.clear()
+        self._task = self._loop.create_task(self._heartbeat(), name="loop-monitor")
+        self._thread = threading.Thread(target=self._sample, name="loop-monitor", daemon=True)
+        self._thread.start()
+        logger.info(f"Loop monitor started (stall threshold {self.threshold * 1000:.0f}ms)")
+
+    async def stop(self):
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _heartbeat(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            lag = max(0.0, now - started - self.interval)
+            self.lag.observe(lag * 1000)
+            self._last_tick = now
+            stall = self._current_stall
+            if stall is not None:
+                # The loop is back; record how long it was actually stuck
+                self._current_stall = None
+                stall["duration_ms"] = lag * 1000
+                logger.warning(
+                    f"Event loop blocked for {stall['duration_ms']:.0f}ms in {stall['label']}:\n{stall['stack']}"
+                )
+
+    def _sample(self):
+        while not self._stop.wait(self.sample_interval):
+            stuck = time.perf_counter() - self._last_tick - self.interval
+            if stuck < self.threshold or self._current_stall is not None:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = "".join(traceback.format_stack(frame, limit=15))
+            del frame
+            stall = {
+                "time": time.time(),
+                "label": task_label(asyncio.current_task(self._loop)),
+                "duration_ms": stuck * 1000,  # Grows until the heartbeat sees the loop again
+                "stack": stack,
+            }
+            self._current_stall = stall
+            self.stalls.append(stall)
+            self.stall_count.inc()
+            metrics.counter(f"loop.stalls.{stall['label']}").inc()
+
+    def recent(self, limit: int = 10):
+        """Most recent stalls, newest first"""
+        return list(self.stalls)[-limit:][::-1]
@@ -0,0 +1,78 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from utils import metrics
+
+class LRUCache:
+    """Least-recently-used cache bounded by entry count and/or total size.
+
+    `sizeof` weighs each value (defaults to ``len``, so bytes values are
+    budgeted by their length). Hits and misses are exported as counters.
+    """
+    def __init__(self, name: str, max_items: Optional[int] = None, max_bytes: Optional[int] = None,
+                 sizeof: Callable[[Any], int] = len):
+        self.name = name
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.total_bytes = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = metrics.counter(f"cache.{name}.hits")
+        self.misses = metrics.counter(f"cache.{name}.misses")
+        _caches[name] = self
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key: Hashable, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses.inc()
+                return default
+            self._data.move_to_end(key)
+        self.hits.inc()
+        return entry[0]
+
+    def put(self, key: Hashable, value: Any):
+        size = self.sizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return  # Would evict everything else and still not fit
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.total_bytes -= old[1]
+            self._data[key] = (value, size)
+            self.total_bytes += size
+            while self._data and (
+                (self.max_items is not None and len(self._data) > self.max_items) or
+                (self.max_bytes is not None and self.total_bytes > self.max_bytes)
+            ):
+                _, (_, evicted_size) = self._data.popitem(last=False)
+                self.total_bytes -= evicted_size
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.total_bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits.value + self.misses.value
+        return {
+            "items": len(self._data),
+            "bytes": self.total_bytes,
+            "hits": self.hits.value,
+            "misses": self.misses.value,
+            "hit_rate": self.hits.value / lookups if lookups else 0.0
+        }
+
+_caches: Dict[str, LRUCache] = {}
+
+def all_caches() -> Dict[str, LRUCache]:
+    """Every cache created in this process, keyed by name"""
+    return dict(_caches)
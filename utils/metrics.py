@@ -0,0 +1,81 @@
+import threading
+from collections import deque
+from typing import Dict
+
+class Counter:
+    """Monotonic counter"""
+    def __init__(self, name: str):
+        self.name = name
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1):
+        with self._lock:
+            self.value += amount
+
+class Histogram:
+    """Keeps totals plus a bounded window of recent samples for percentiles"""
+    def __init__(self, name: str, window: int = 1024):
+        self.name = name
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._recent = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self.count += 1
+            self.total += value
+            self.max = max(self.max, value)
+            self._recent.append(value)
+
+    def percentile(self, pct: float) -> float:
+        """Percentile (0-100) over the recent window"""
+        with self._lock:
+            samples = sorted(self._recent)
+        if not samples:
+            return 0.0
+        index = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+_counters: Dict[str, Counter] = {}
+_histograms: Dict[str, Histogram] = {}
+_registry_lock = threading.Lock()
+
+def counter(name: str) -> Counter:
+    """Get or create a named counter"""
+    with _registry_lock:
+        if name not in _counters:
+            _counters[name] = Counter(name)
+        return _counters[name]
+
+def histogram(name: str) -> Histogram:
+    """Get or create a named histogram"""
+    with _registry_lock:
+        if name not in _histograms:
+            _histograms[name] = Histogram(name)
+        return _histograms[name]
+
+def snapshot() -> dict:
+    """Plain-dict view of every metric, for /stats and exports"""
+    with _registry_lock:
+        counters = list(_counters.values())
+        histograms = list(_histograms.values())
+    return {
+        "counters": {c.name: c.value for c in counters},
+        "histograms": {
+            h.name: {
+                "count": h.count,
+                "mean": h.mean,
+                "p50": h.percentile(50),
+                "p95": h.percentile(95),
+                "max": h.max
+            }
+            for h in histograms
+        }
+    }
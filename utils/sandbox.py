@@ -0,0 +1,292 @@
+import ast
+import math
+import asyncio
+import logging
+import multiprocessing
+import operator
+import resource
+import signal
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+MAX_EXPRESSION_LENGTH = 300
+MAX_NODES = 150
+MAX_RESULT_DIGITS = 100_000
+SOLVE_VARIABLES = ("x", "y", "z", "n", "t")
+
+class SandboxError(Exception):
+    """Expression was rejected or failed to evaluate; message is user-facing"""
+
+class SandboxTimeout(SandboxError):
+    """Job ran past its CPU or wall-clock budget"""
+
+# --- Parsing (runs in the bot process, cheap) ---
+BIN_OPS: Dict[type, Callable] = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+    ast.Div: operator.truediv, ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod, ast.Pow: operator.pow
+}
+UNARY_OPS: Dict[type, Callable] = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+CONSTANTS = {"pi": math.pi, "e": math.e, "tau": math.tau, "inf": math.inf}
+FUNCTIONS: Dict[str, Callable] = {
+    "sqrt": math.sqrt, "cbrt": lambda v: math.copysign(abs(v) ** (1 / 3), v),
+    "sin": math.sin, "cos": math.cos, "tan": math.tan,
+    "asin": math.asin, "acos": math.acos, "atan": math.atan,
+    "sinh": math.sinh, "cosh": math.cosh, "tanh": math.tanh,
+    "exp": math.exp, "ln": math.log, "log": math.log, "log10": math.log10, "log2": math.log2,
+    "abs": abs, "floor": math.floor, "ceil": math.ceil, "round": round,
+    "factorial": math.factorial, "gcd": math.gcd, "lcm": math.lcm,
+    "min": min, "max": max, "degrees": math.degrees, "radians": math.radians
+}
+
+def parse_expression(expression: str, variables=()) -> ast.Expression:
+    """Parse `expression` and reject anything outside the arithmetic allow-list"""
+    expression = expression.strip().replace("^", "**").replace("×", "*").replace("÷", "/")
+    if not expression:
+        raise SandboxError("Empty expression")
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise SandboxError(f"Expression is longer than {MAX_EXPRESSION_LENGTH} characters")
+    try:
+        tree = ast.parse(expression, mode="eval")
+    except SyntaxError:
+        raise SandboxError("Couldn't parse that expression")
+
+    nodes = list(ast.walk(tree))
+    if len(nodes) > MAX_NODES:
+        raise SandboxError("Expression is too complex")
+    callees = {id(node.func) for node in nodes if isinstance(node, ast.Call)}
+    for node in nodes:
+        if isinstance(node, (ast.Expression, ast.Load)) or type(node) in BIN_OPS or type(node) in UNARY_OPS:
+            continue
+        if isinstance(node, ast.BinOp) and type(node.op) in BIN_OPS:
+            continue
+        if isinstance(node, ast.UnaryOp) and type(node.op) in UNARY_OPS:
+            continue
+        if isinstance(node, ast.Constant) and type(node.value) in (int, float, complex):
+            continue
+        if isinstance(node, ast.Name) and (
+                node.id in CONSTANTS or node.id in variables or (id(node) in callees and node.id in FUNCTIONS)):
+            continue
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+                and node.func.id in FUNCTIONS and not node.keywords):
+            continue
+        raise SandboxError(f"`{ast.unparse(node) if hasattr(node, 'lineno') else type(node).__name__}` is not allowed")
+    return tree
+
+def normalize(tree: ast.Expression) -> str:
+    """Canonical text for a parsed expression, used as the memo key"""
+    return ast.unparse(tree)
+
+# --- Evaluation (runs in a worker process) ---
+def _check_pow(base, exponent):
+    if isinstance(base, int) and isinstance(exponent, int) and exponent > 0 and abs(base) > 1:
+        digits = exponent * math.log10(abs(base))
+        if digits > MAX_RESULT_DIGITS:
+            raise SandboxError(f"Result would have about {digits:,.0f} digits")
+
+def _eval(node):
+    if isinstance(node, ast.Expression):
+        return _eval(node.body)
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.Name):
+        return CONSTANTS[node.id]
+    if isinstance(node, ast.UnaryOp):
+        return UNARY_OPS[type(node.op)](_eval(node.operand))
+    if isinstance(node, ast.BinOp):
+        left, right = _eval(node.left), _eval(node.right)
+        if isinstance(node.op, ast.Pow):
+            _check_pow(left, right)
+        if isinstance(node.op, ast.Mult) and isinstance(left, int) and isinstance(right, int):
+            if (left.bit_length() + right.bit_length()) * 0.302 > MAX_RESULT_DIGITS:
+                raise SandboxError("Result is too large")
+        return BIN_OPS[type(node.op)](left, right)
+    if isinstance(node, ast.Call):
+        args = [_eval(arg) for arg in node.args]
+        if node.func.id == "factorial" and args and isinstance(args[0], int) and args[0] > 20_000:
+            raise SandboxError("factorial() is limited to 20000")
+        return FUNCTIONS[node.func.id](*args)
+    raise SandboxError("Unsupported expression")
+
+def _to_sympy(node, symbols):
+    import sympy
+    if isinstance(node, ast.Expression):
+        return _to_sympy(node.body, symbols)
+    if isinstance(node, ast.Constant):
+        return sympy.nsimplify(node.value) if isinstance(node.value, float) else sympy.sympify(node.value)
+    if isinstance(node, ast.Name):
+        if node.id in symbols:
+            return symbols[node.id]
+        return {"pi": sympy.pi, "e": sympy.E, "tau": 2 * sympy.pi, "inf": sympy.oo}[node.id]
+    if isinstance(node, ast.UnaryOp):
+        return UNARY_OPS[type(node.op)](_to_sympy(node.operand, symbols))
+    if isinstance(node, ast.BinOp):
+        return BIN_OPS[type(node.op)](_to_sympy(node.left, symbols), _to_sympy(node.right, symbols))
+    if isinstance(node, ast.Call):
+        if node.func.id == "round":
+            # sympy has no symbolic round-half-even, and floor/nint would change the answer
+            raise SandboxError("round() isn't supported in equations")
+        name = {"ln": "log", "abs": "Abs"}.get(node.func.id, node.func.id)
+        func = getattr(sympy, name, None)
+        if func is None:
+            raise SandboxError(f"{node.func.id}() isn't supported in equations")
+        return func(*(_to_sympy(arg, symbols) for arg in node.args))
+    raise SandboxError("Unsupported expression")
+
+def format_result(value: Any) -> str:
+    if isinstance(value, float):
+        return repr(value) if not value.is_integer() or abs(value) >= 1e16 else str(int(value))
+    if isinstance(value, complex):
+        return f"{value.real:g}{value.imag:+g}i"
+    return str(value)
+
+def job_calc(source: str) -> str:
+    return format_result(_eval(parse_expression(source)))
+
+def job_solve(lhs: str, rhs: str, variable: str) -> str:
+    import sympy
+    symbols = {name: sympy.Symbol(name) for name in SOLVE_VARIABLES}
+    equation = sympy.Eq(
+        _to_sympy(parse_expression(lhs, SOLVE_VARIABLES), symbols),
+        _to_sympy(parse_expression(rhs, SOLVE_VARIABLES), symbols)
+    )
+    solutions = sympy.solve(equation, symbols[variable])
+    if not solutions:
+        return "No solutions"
+    return ", ".join(f"{variable} = {sympy.sstr(s)}" for s in solutions)
+
+# --- Big integers: return plain decimal digits ---
+def _fib_pair(n: int):
+    """(F(n), F(n+1)) by fast doubling"""
+    if n == 0:
+        return 0, 1
+    a, b = _fib_pair(n >> 1)
+    c = a * (2 * b - a)
+    d = a * a + b * b
+    return (d, c + d) if n & 1 else (c, d)
+
+def job_factorial(n: int) -> str:
+    return str(math.factorial(n))
+
+def job_int_power(base: int, exponent: int) -> str:
+    _check_pow(base, exponent)
+    return str(base ** exponent)
+
+def job_fibonacci(n: int) -> str:
+    return str(_fib_pair(n)[0])
+
+def job_binomial(n: int, k: int) -> str:
+    return str(math.comb(n, k))
+
+JOBS: Dict[str, Callable[..., str]] = {
+    "calc": job_calc, "solve": job_solve, "noop": lambda: "",
+    "factorial": job_factorial, "int_power": job_int_power,
+    "fibonacci": job_fibonacci, "binomial": job_binomial
+}
+
+def _on_cpu_timer(signum, frame):
+    raise SandboxTimeout("Calculation took too long")
+
+def _init_worker(memory_mb: int):
+    """Runs once per worker process: apply limits and import heavy modules"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGPROF, _on_cpu_timer)
+    resource.setrlimit(resource.RLIMIT_AS, (memory_mb * 1024 * 1024, memory_mb * 1024 * 1024))
+    if hasattr(sys, "set_int_max_str_digits"):
+        sys.set_int_max_str_digits(MAX_RESULT_DIGITS + 10)
+    import sympy  # noqa: F401  Imported here so no request pays for it
+
+def _run_job(kind: str, args: tuple, cpu_seconds: float) -> str:
+    # Soft limit: a profiling timer raises inside Python code. Hard limit: if a
+    # single C call (e.g. a huge bignum op) ignores it, RLIMIT_CPU kills us.
+    used = resource.getrusage(resource.RUSAGE_SELF)
+    used_seconds = used.ru_utime + used.ru_stime
+    hard = int(used_seconds + cpu_seconds) + 2
+    resource.setrlimit(resource.RLIMIT_CPU, (hard, resource.RLIM_INFINITY))
+    signal.setitimer(signal.ITIMER_PROF, cpu_seconds)
+    try:
+        return JOBS[kind](*args)
+    except SandboxError:
+        raise
+    except MemoryError:
+        raise SandboxError("Calculation used too much memory")
+    except NotImplementedError:
+        raise SandboxError("Can't solve that equation")
+    except (ArithmeticError, ValueError, TypeError) as e:
+        raise SandboxError(f"{type(e).__name__}: {e}")
+    finally:
+        signal.setitimer(signal.ITIMER_PROF, 0)
+
+class Sandbox:
+    """Pre-forked process pool that runs untrusted math with CPU/memory limits"""
+    def __init__(self, workers: int = 2, cpu_seconds: float = 2.0, memory_mb: int = 512,
+                 timeout: float = 10.0, max_pending: int = 16):
+        self.workers = workers
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.timeout = timeout
+        self._pending = asyncio.Semaphore(max_pending)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._starting = asyncio.Lock()  # warm-up and the first run() may both call start()
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # forkserver: workers never inherit the bot's threads, sockets or event loop
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(["utils.sandbox"])
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self.memory_mb,)
+        )
+
+    async def start(self):
+        """Fork the workers now so the first request doesn't pay for it (no-op if already started)"""
+        async with self._starting:
+            if self._executor is not None:
+                return
+            executor = self._new_executor()
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*(
+                loop.run_in_executor(executor, _run_job, "noop", (), self.cpu_seconds)
+                for _ in range(self.workers)
+            ))
+            self._executor = executor
+            logger.info(f"Math sandbox ready with {self.workers} workers")
+
+    def _restart(self, old: ProcessPoolExecutor):
+        if self._executor is not old:
+            return  # Another job already replaced this pool
+        # ProcessPoolExecutor can't cancel a running job, so stuck workers are killed
+        for process in list(getattr(old, "_processes", {}).values()):
+            process.kill()
+        old.shutdown(wait=False, cancel_futures=True)
+        self._executor = self._new_executor()
+
+    async def run(self, kind: str, *args) -> str:
+        if self._executor is None:
+            await self.start()
+        async with self._pending:
+            loop = asyncio.get_running_loop()
+            executor = self._executor
+            future = loop.run_in_executor(executor, _run_job, kind, args, self.cpu_seconds)
+            try:
+                return await asyncio.wait_for(future, timeout=self.timeout)
+            except (asyncio.TimeoutError, BrokenProcessPool):
+                if self._executor is not executor:
+                    # Killed along with the pool when a different job was restarted
+                    raise SandboxError("Another calculation crashed the workers, please retry")
+                logger.warning(f"Sandbox job {kind} exceeded its limits; restarting workers")
+                self._restart(executor)
+                raise SandboxTimeout("Calculation took too long")
+
+    def shutdown(self):
+        if self._executor is not None:
+            for process in list(getattr(self._executor, "_processes", {}).values()):
+                process.kill()
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,153 @@
+import io
+import math
+from typing import Optional
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+RESERVOIR_SIZE = 1_000_000  # Values kept for percentiles; exact below this count
+
+class StreamingStats:
+    """Single-pass statistics over numeric chunks with bounded memory.
+
+    Moments (and x/y co-moments for regression) are merged per chunk with
+    Chan's parallel update, so they stay exact however many rows arrive.
+    Percentiles and the histogram come from a uniform reservoir sample that
+    is exact until RESERVOIR_SIZE values have been seen.
+    """
+    def __init__(self, reservoir_size: int = RESERVOIR_SIZE, seed: Optional[int] = None):
+        self.reservoir_size = reservoir_size
+        self.rng = np.random.default_rng(seed)
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        # Regression over (x, y) pairs
+        self.pairs = 0
+        self.mean_x = self.mean_y = 0.0
+        self.m2_x = self.m2_y = self.c_xy = 0.0  # m2_y covers paired rows only, unlike m2
+        self._sample = np.empty(0)
+        self._keys = np.empty(0)
+
+    def update(self, values: np.ndarray, x: Optional[np.ndarray] = None):
+        """Add a chunk of y values (and optionally matching x values)"""
+        if x is None:
+            values = values[np.isfinite(values)]
+        else:
+            keep = np.isfinite(values) & np.isfinite(x)
+            values, x = values[keep], x[keep]
+        if not values.size:
+            return
+        count = values.size
+        chunk_mean = float(values.mean())
+        chunk_m2 = float(((values - chunk_mean) ** 2).sum())
+        delta = chunk_mean - self.mean
+        total = self.n + count
+        self.mean += delta * count / total
+        self.m2 += chunk_m2 + delta * delta * self.n * count / total
+        self.n = total
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+        if x is not None:
+            cx, cy = float(x.mean()), chunk_mean
+            c_m2x = float(((x - cx) ** 2).sum())
+            c_cxy = float(((x - cx) * (values - cy)).sum())
+            pairs = self.pairs + count
+            dx, dy = cx - self.mean_x, cy - self.mean_y
+            self.m2_x += c_m2x + dx * dx * self.pairs * count / pairs
+            self.m2_y += chunk_m2 + dy * dy * self.pairs * count / pairs
+            self.c_xy += c_cxy + dx * dy * self.pairs * count / pairs
+            self.mean_x += dx * count / pairs
+            self.mean_y += dy * count / pairs
+            self.pairs = pairs
+
+        # Reservoir: keep the values with the smallest random keys
+        keys = self.rng.random(count)
+        sample = np.concatenate((self._sample, values))
+        keys = np.concatenate((self._keys, keys))
+        if sample.size > self.reservoir_size:
+            keep = np.argpartition(keys, self.reservoir_size)[:self.reservoir_size]
+            sample, keys = sample[keep], keys[keep]
+        self._sample, self._keys = sample, keys
+
+    @property
+    def exact(self) -> bool:
+        return self.n <= self.reservoir_size
+
+    @property
+    def sample_size(self) -> int:
+        """Values kept in the reservoir that percentiles and histograms use"""
+        return self._sample.size
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
+
+    def percentiles(self, points=(5, 25, 50, 75, 95)) -> dict:
+        if not self._sample.size:
+            return {}
+        return dict(zip(points, np.percentile(self._sample, points).tolist()))
+
+    def regression(self) -> Optional[dict]:
+        """Least-squares y = slope * x + intercept, with r²"""
+        if self.pairs < 2 or self.m2_x == 0:
+            return None
+        slope = self.c_xy / self.m2_x
+        intercept = self.mean_y - slope * self.mean_x
+        r2 = (self.c_xy ** 2) / (self.m2_x * self.m2_y) if self.m2_y else 1.0
+        return {"slope": slope, "intercept": intercept, "r2": r2}
+
+    def histogram(self, bins: int = 30):
+        counts, edges = np.histogram(self._sample, bins=bins, range=(self.min, self.max))
+        if not self.exact:
+            counts = counts * (self.n / self._sample.size)
+        return counts, edges
+
+def detect_delimiter(line: str) -> Optional[str]:
+    for delimiter in (",", ";", "\t"):
+        if delimiter in line:
+            return delimiter
+    return None  # Whitespace-separated
+
+def parse_block(text: str, delimiter: Optional[str], columns: tuple) -> np.ndarray:
+    """Parse CSV lines into a (rows, len(columns)) float array, dropping bad rows"""
+    try:
+        return np.loadtxt(io.StringIO(text), delimiter=delimiter, usecols=columns, ndmin=2, comments="#")
+    except ValueError:
+        pass
+    # Slow path only for blocks with a header or malformed rows
+    rows = []
+    for line in text.splitlines():
+        fields = line.split(delimiter)
+        try:
+            rows.append([float(fields[c]) for c in columns])
+        except (ValueError, IndexError):
+            continue
+    return np.array(rows, dtype=float).reshape(-1, len(columns))
+
+def render_histogram(counts: np.ndarray, edges: np.ndarray, title: str) -> bytes:
+    """Bar chart PNG for a histogram (blocking)"""
+    width, height, margin = 640, 320, 40
+    img = Image.new("RGB", (width, height), (255, 255, 255))
+    draw = ImageDraw.Draw(img)
+    font = ImageFont.load_default()
+    plot_w, plot_h = width - 2 * margin, height - 2 * margin
+    peak = counts.max() or 1
+    bar_w = plot_w / len(counts)
+    for i, count in enumerate(counts):
+        bar_h = count / peak * plot_h
+        x0 = margin + i * bar_w
+        draw.rectangle(
+            (x0 + 1, height - margin - bar_h, x0 + bar_w - 1, height - margin),
+            fill=(88, 101, 242)
+        )
+    draw.line((margin, height - margin, width - margin, height - margin), fill=(0, 0, 0))
+    draw.text((margin, 10), title, font=font, fill=(0, 0, 0))
+    draw.text((margin, height - margin + 8), f"{edges[0]:.4g}", font=font, fill=(0, 0, 0))
+    draw.text((width - margin, height - margin + 8), f"{edges[-1]:.4g}", font=font, fill=(0, 0, 0), anchor="ra")
+    draw.text((margin - 4, margin), f"{peak:.0f}", font=font, fill=(0, 0, 0), anchor="ra")
+    buf = io.BytesIO()
+    img.save(buf, format="PNG", optimize=True)
+    return buf.getvalue()
@@ -0,0 +1,132 @@
+import re
+import logging
+from typing import Dict, List, Sequence, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+logger = logging.getLogger(__name__)
+
+WORD_RE = re.compile(r'\S+|\s+')
+# Never assigned by Unicode, so every font renders it as its .notdef box
+MISSING_GLYPH = '\U0010FFFD'
+
+def load_font_stack(names: Sequence[str], size: int) -> "FontStack":
+    """Load every font in `names` that exists on this system, in order"""
+    fonts = []
+    for name in names:
+        try:
+            fonts.append(ImageFont.truetype(name, size))
+        except IOError:
+            continue
+    if not fonts:
+        fonts.append(ImageFont.load_default(size=size))
+        logger.warning("Using fallback font for text rendering")
+    return FontStack(fonts)
+
+class FontStack:
+    """Ordered list of fonts with cached per-glyph coverage and advances.
+
+    Each character is drawn with the first font that has a glyph for it;
+    advances are measured once per (font, codepoint) so laying out a long
+    message is a series of dict lookups rather than FreeType calls.
+    """
+    def __init__(self, fonts: List[ImageFont.FreeTypeFont]):
+        self.fonts = fonts
+        self.primary = fonts[0]
+        self.ascent, self.descent = self.primary.getmetrics()
+        self._notdef = [self._glyph_bitmap(font, MISSING_GLYPH) for font in fonts]
+        self._font_for: Dict[str, int] = {}
+        self._advances: Dict[Tuple[int, str], float] = {}
+
+    @staticmethod
+    def _glyph_bitmap(font, ch: str) -> bytes:
+        left, top, right, bottom = font.getbbox(ch)
+        img = Image.new("L", (max(1, right - left), max(1, bottom - top)))
+        ImageDraw.Draw(img).text((-left, -top), ch, font=font, fill=255)
+        return img.tobytes()
+
+    def font_index(self, ch: str) -> int:
+        """Index of the first font that can draw `ch` (cached)"""
+        index = self._font_for.get(ch)
+        if index is None:
+            index = 0
+            if not ch.isspace() and ch.isprintable():
+                for i, font in enumerate(self.fonts):
+                    if self._glyph_bitmap(font, ch) != self._notdef[i]:
+                        index = i
+                        break
+            self._font_for[ch] = index
+        return index
+
+    def advance(self, ch: str) -> float:
+        """Horizontal advance of `ch` in its fallback font (cached)"""
+        index = self.font_index(ch)
+        key = (index, ch)
+        width = self._advances.get(key)
+        if width is None:
+            width = self._advances[key] = self.fonts[index].getlength(ch)
+        return width
+
+    def measure(self, text: str) -> float:
+        return sum(self.advance(ch) for ch in text)
+
+    def runs(self, text: str) -> List[Tuple[int, str]]:
+        """Split `text` into (font index, substring) runs"""
+        runs: List[Tuple[int, str]] = []
+        for ch in text:
+            index = self.font_index(ch)
+            if runs and runs[-1][0] == index:
+                runs[-1] = (index, runs[-1][1] + ch)
+            else:
+                runs.append((index, ch))
+        return runs
+
+    def wrap(self, text: str, max_width: float, max_lines: int) -> List[str]:
+        """Wrap by pixel width at word boundaries, keeping leading indentation"""
+        lines: List[str] = []
+        truncated = False
+        paragraphs = text.replace('\t', '    ').splitlines()
+        for i, paragraph in enumerate(paragraphs):
+            line, width = "", 0.0
+            for token in WORD_RE.findall(paragraph):
+                token_width = self.measure(token)
+                if width + token_width <= max_width:
+                    line += token
+                    width += token_width
+                    continue
+                if token.isspace():
+                    continue  # Break here instead of carrying the space over
+                if line.strip():
+                    lines.append(line.rstrip())
+                    line, width = "", 0.0
+                # Hard-break words wider than the whole line
+                for ch in token:
+                    ch_width = self.advance(ch)
+                    if width + ch_width > max_width and line:
+                        lines.append(line)
+                        line, width = "", 0.0
+                    line += ch
+                    width += ch_width
+                if len(lines) >= max_lines:
+                    truncated = True  # The rest of this paragraph doesn't fit
+                    break
+            lines.append(line.rstrip())
+            if len(lines) >= max_lines:
+                truncated = truncated or any(rest.strip() for rest in paragraphs[i + 1:])
+                break
+
+        if truncated:
+            lines = lines[:max_lines]
+            last = lines[-1]
+            while last and self.measure(last + "...") > max_width:
+                last = last[:-1]
+            lines[-1] = last + "..."
+        return lines
+
+    def draw(self, draw: ImageDraw.ImageDraw, xy: Tuple[float, float], text: str, fill):
+        """Draw `text` with per-run font fallback, top-left anchored at `xy`"""
+        x, y = xy
+        baseline = y + self.ascent
+        for index, run in self.runs(text):
+            draw.text((x, baseline), run, font=self.fonts[index], fill=fill, anchor="ls")
+            x += self.measure(run)
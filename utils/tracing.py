@@ -0,0 +1,157 @@
+import contextvars
+import functools
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, List, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from utils import metrics
+
+logger = logging.getLogger(__name__)
+
+# Span kinds that count as waiting on someone else vs. our own CPU work
+EXTERNAL_KINDS = ("reddit", "nekos", "http", "discord")
+CPU_KINDS = ("cpu", "sandbox")
+
+_current: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar("trace", default=None)
+
+class Trace:
+    """Timing of one command invocation, built up from spans"""
+    def __init__(self, name: str, user: str = "", queued_ms: float = 0.0):
+        self.name = name
+        self.user = user
+        self.queued_ms = queued_ms      # Discord creation time -> handler start
+        self.started = time.perf_counter()
+        self.wall_time = time.time()
+        self.spans: List[tuple] = []    # (kind, label, start offset ms, duration ms)
+        self.first_response_ms: Optional[float] = None
+        self.total_ms: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def add_span(self, kind: str, label: str, started: float, finished: float):
+        self.spans.append((kind, label, (started - self.started) * 1000, (finished - started) * 1000))
+
+    def time_in(self, kinds) -> float:
+        return sum(duration for kind, _, _, duration in self.spans if kind in kinds)
+
+    @property
+    def external_ms(self) -> float:
+        return self.time_in(EXTERNAL_KINDS)
+
+    @property
+    def cpu_ms(self) -> float:
+        return self.time_in(CPU_KINDS)
+
+    def summary(self) -> str:
+        response = f"first response {self.first_response_ms:.0f}ms · " if self.first_response_ms is not None else ""
+        return (f"{self.name} {self.total_ms:.0f}ms ({response}queued {self.queued_ms:.0f}ms · "
+                f"external {self.external_ms:.0f}ms · cpu {self.cpu_ms:.0f}ms)")
+
+class SlowLog:
+    """Ring buffer of recent invocations slower than `threshold_ms`"""
+    def __init__(self, capacity: int = 100, threshold_ms: float = 1000.0):
+        self.threshold_ms = threshold_ms
+        self.entries: Deque[Trace] = deque(maxlen=capacity)
+
+    def record(self, trace: Trace):
+        if trace.total_ms >= self.threshold_ms:
+            self.entries.append(trace)
+
+    def slowest(self, limit: int = 10) -> List[Trace]:
+        return sorted(self.entries, key=lambda t: t.total_ms, reverse=True)[:limit]
+
+slow_log = SlowLog()
+
+# --- Trace lifecycle ---
+def start_trace(name: str, user: str = "", queued_ms: float = 0.0) -> Trace:
+    """Start a trace and make it current for this task (and tasks/threads it spawns)"""
+    trace = Trace(name, user, queued_ms)
+    _current.set(trace)
+    return trace
+
+def current_trace() -> Optional[Trace]:
+    return _current.get()
+
+def finish_trace(trace: Optional[Trace], error: Optional[str] = None):
+    """Close a trace, export it to metrics and keep it if it was slow"""
+    if trace is None or trace.total_ms is not None:
+        return
+    trace.total_ms = (time.perf_counter() - trace.started) * 1000
+    trace.error = error
+    metrics.histogram("commands.total_ms").observe(trace.total_ms)
+    metrics.histogram("commands.queued_ms").observe(trace.queued_ms)
+    metrics.histogram("commands.external_ms").observe(trace.external_ms)
+    metrics.histogram("commands.cpu_ms").observe(trace.cpu_ms)
+    metrics.histogram(f"command.{trace.name}.ms").observe(trace.total_ms)
+    if trace.error:
+        metrics.counter(f"command.{trace.name}.errors").inc()
+    slow_log.record(trace)
+    if trace.total_ms >= slow_log.threshold_ms:
+        logger.info(f"Slow command: {trace.summary()}")
+
+@contextmanager
+def span(kind: str, label: str):
+    """Time a block into the current trace (no-op outside a command)"""
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add_span(kind, label, started, time.perf_counter())
+
+# --- Instrumentation ---
+def _host_kind(host: str) -> str:
+    if host.endswith("reddit.com") or host.endswith("redd.it"):
+        return "reddit"
+    if host.endswith("nekos.best"):
+        return "nekos"
+    return "http"
+
+async def _on_request_start(session, ctx, params):
+    ctx.started = time.perf_counter()
+
+async def _on_request_end(session, ctx, params):
+    trace = _current.get()
+    if trace is not None:
+        host = urlsplit(str(params.url)).hostname or ""
+        trace.add_span(_host_kind(host), f"{params.method} {host}{params.url.path}", ctx.started, time.perf_counter())
+
+def trace_config() -> aiohttp.TraceConfig:
+    """aiohttp hook that records each request on a session as a span"""
+    config = aiohttp.TraceConfig()
+    config.on_request_start.append(_on_request_start)
+    config.on_request_end.append(_on_request_end)
+    config.on_request_exception.append(_on_request_end)
+    return config
+
+def _traced_discord(request):
+    @functools.wraps(request)
+    async def wrapper(self, route, *args, **kwargs):
+        trace = _current.get()
+        if trace is None:
+            return await request(self, route, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return await request(self, route, *args, **kwargs)
+        finally:
+            finished = time.perf_counter()
+            trace.add_span("discord", f"{route.method} {route.path}", started, finished)
+            if route.method == "POST" and trace.first_response_ms is None:
+                trace.first_response_ms = trace.queued_ms + (finished - trace.started) * 1000
+    wrapper.traced = True
+    return wrapper
+
+def instrument_discord():
+    """Record Discord REST calls (bot HTTP and interaction webhooks) as spans"""
+    from discord.http import HTTPClient
+    from discord.webhook.async_ import AsyncWebhookAdapter
+    for cls in (HTTPClient, AsyncWebhookAdapter):
+        if not getattr(cls.request, "traced", False):
+            cls.request = _traced_discord(cls.request)
@@ -0,0 +1,154 @@
+import re
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from utils.autocomplete import PrefixIndex
+
+class Unit(NamedTuple):
+    name: str
+    symbol: str
+    category: str
+    factor: float         # Base units per unit
+    offset: float = 0.0   # Added after scaling (temperature only)
+
+    @property
+    def label(self) -> str:
+        return f"{self.name} ({self.symbol})"
+
+# (name, symbol, factor to base, extra aliases); base unit has factor 1
+_CATEGORIES = {
+    "length": [  # metre
+        ("millimeter", "mm", 1e-3, ()),
+        ("centimeter", "cm", 1e-2, ()),
+        ("meter", "m", 1.0, ("metre",)),
+        ("kilometer", "km", 1e3, ("kilometre",)),
+        ("inch", "in", 0.0254, ("inches", '"')),
+        ("foot", "ft", 0.3048, ("feet", "'")),
+        ("yard", "yd", 0.9144, ()),
+        ("mile", "mi", 1609.344, ("miles",)),
+        ("nautical mile", "nmi", 1852.0, ()),
+        ("light year", "ly", 9.4607304725808e15, ()),
+    ],
+    "mass": [  # kilogram
+        ("milligram", "mg", 1e-6, ()),
+        ("gram", "g", 1e-3, ("grams",)),
+        ("kilogram", "kg", 1.0, ("kilo", "kilos")),
+        ("tonne", "t", 1e3, ("metric ton",)),
+        ("ounce", "oz", 0.028349523125, ("ounces",)),
+        ("pound", "lb", 0.45359237, ("lbs", "pounds")),
+        ("stone", "st", 6.35029318, ()),
+        ("short ton", "ton", 907.18474, ("us ton",)),
+    ],
+    "volume": [  # litre
+        ("milliliter", "ml", 1e-3, ("millilitre",)),
+        ("liter", "l", 1.0, ("litre",)),
+        ("cubic meter", "m3", 1e3, ("m³",)),
+        ("teaspoon", "tsp", 0.00492892159375, ()),
+        ("tablespoon", "tbsp", 0.01478676478125, ()),
+        ("fluid ounce", "floz", 0.0295735295625, ("fl oz",)),
+        ("cup", "cup", 0.2365882365, ("cups",)),
+        ("pint", "pt", 0.473176473, ()),
+        ("quart", "qt", 0.946352946, ()),
+        ("gallon", "gal", 3.785411784, ("us gallon",)),
+        ("imperial gallon", "impgal", 4.54609, ()),
+    ],
+    "speed": [  # metre per second
+        ("meters per second", "m/s", 1.0, ("mps",)),
+        ("kilometers per hour", "km/h", 1 / 3.6, ("kph", "kmh")),
+        ("miles per hour", "mph", 0.44704, ()),
+        ("feet per second", "ft/s", 0.3048, ("fps",)),
+        ("knot", "kn", 1852 / 3600, ("knots", "kt")),
+        ("speed of light", "c0", 299_792_458.0, ()),
+    ],
+    "data": [  # byte
+        ("bit", "b", 1 / 8, ("bits",)),
+        ("byte", "B", 1.0, ("bytes",)),
+        ("kilobyte", "KB", 1e3, ()),
+        ("megabyte", "MB", 1e6, ()),
+        ("gigabyte", "GB", 1e9, ()),
+        ("terabyte", "TB", 1e12, ()),
+        ("kibibyte", "KiB", 1024.0, ()),
+        ("mebibyte", "MiB", 1024.0 ** 2, ()),
+        ("gibibyte", "GiB", 1024.0 ** 3, ()),
+        ("tebibyte", "TiB", 1024.0 ** 4, ()),
+    ],
+    "time": [  # second
+        ("millisecond", "ms", 1e-3, ()),
+        ("second", "s", 1.0, ("sec", "secs", "seconds")),
+        ("minute", "min", 60.0, ("mins", "minutes")),
+        ("hour", "h", 3600.0, ("hr", "hrs", "hours")),
+        ("day", "d", 86400.0, ("days",)),
+        ("week", "wk", 604800.0, ("weeks",)),
+        ("year", "yr", 31_557_600.0, ("years",)),  # Julian year
+    ],
+}
+
+# Temperature: kelvin = value * factor + offset
+_TEMPERATURES = [
+    ("celsius", "°C", 1.0, 273.15, ("c",)),
+    ("fahrenheit", "°F", 5 / 9, 273.15 - 32 * 5 / 9, ("f",)),
+    ("kelvin", "K", 1.0, 0.0, ("k",)),
+    ("rankine", "°R", 5 / 9, 0.0, ("r",)),
+]
+
+def _key(text: str) -> str:
+    return re.sub(r"[\s_°]", "", text.lower())
+
+def _linear(scale: float, shift: float) -> Callable:
+    # Works on floats and numpy arrays alike
+    if shift == 0.0:
+        return lambda x: x * scale
+    return lambda x: x * scale + shift
+
+class UnitRegistry:
+    """Every unit pair's conversion, precomputed as a closure.
+
+    All supported units are affine in their category's base unit, so a pair
+    collapses to one multiply(-add); building the table up front makes any
+    lookup a dict hit.
+    """
+    def __init__(self):
+        self.units: List[Unit] = []
+        self.aliases: Dict[str, Unit] = {}
+        # Data sizes are case-sensitive (b vs B); everything else isn't
+        self.exact_aliases: Dict[str, Unit] = {}
+
+        for category, units in _CATEGORIES.items():
+            for name, symbol, factor, aliases in units:
+                self._add(Unit(name, symbol, category, factor), aliases)
+        for name, symbol, factor, offset, aliases in _TEMPERATURES:
+            self._add(Unit(name, symbol, "temperature", factor, offset), aliases)
+
+        self.conversions: Dict[Tuple[str, str], Callable] = {}
+        for a in self.units:
+            for b in self.units:
+                if a.category == b.category:
+                    self.conversions[a.name, b.name] = _linear(a.factor / b.factor, (a.offset - b.offset) / b.factor)
+
+        self.labels = {unit.label: unit for unit in self.units}
+        self.index = PrefixIndex(self.labels)
+        self.category_index = {
+            category: PrefixIndex(u.label for u in self.units if u.category == category)
+            for category in {u.category for u in self.units}
+        }
+
+    def _add(self, unit: Unit, aliases):
+        self.units.append(unit)
+        self.exact_aliases[unit.symbol] = unit
+        for alias in (unit.name, unit.symbol, unit.label, unit.name + "s", *aliases):
+            self.aliases.setdefault(_key(alias), unit)
+
+    def __len__(self):
+        return len(self.units)
+
+    def resolve(self, text: str) -> Optional[Unit]:
+        """Unit for a name, symbol, alias or autocomplete label"""
+        text = text.strip()
+        return self.exact_aliases.get(text) or self.labels.get(text) or self.aliases.get(_key(text))
+
+    def converter(self, source: Unit, target: Unit) -> Optional[Callable]:
+        return self.conversions.get((source.name, target.name))
+
+    def complete(self, query: str, like: Optional[Unit] = None, limit: int = 25) -> List[str]:
+        """Autocomplete labels, restricted to `like`'s category when given"""
+        index = self.category_index[like.category] if like else self.index
+        return index.complete(query, limit)
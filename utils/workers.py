@@ -0,0 +1,75 @@
+import asyncio
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+
+from utils import metrics, tracing
+
+logger = logging.getLogger(__name__)
+
+class PoolBusy(Exception):
+    """Raised when a pool's queue is full and the caller waited too long"""
+
+def _timed_call(func: Callable, args: tuple, kwargs: dict):
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return started, time.perf_counter(), result
+
+class WorkerPool:
+    """Bounded thread pool for CPU-heavy work that must stay off the event loop.
+
+    At most `max_workers + max_queue` jobs are admitted at once; further
+    callers wait up to `acquire_timeout` seconds and then get `PoolBusy`.
+    """
+    def __init__(self, name: str, max_workers: int = 2, max_queue: int = 8, acquire_timeout: float = 5.0):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.acquire_timeout = acquire_timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-worker")
+        self._slots = asyncio.Semaphore(max_workers + max_queue)
+        self.in_flight = 0
+        self.queue_wait = metrics.histogram(f"{name}.queue_wait_ms")
+        self.run_time = metrics.histogram(f"{name}.run_ms")
+        self.rejected = metrics.counter(f"{name}.rejected")
+
+    async def run(self, func: Callable, *args, **kwargs):
+        """Run `func(*args, **kwargs)` in the pool and return its result"""
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self.rejected.inc()
+            raise PoolBusy(f"{self.name} pool is saturated ({self.in_flight} jobs in flight)")
+
+        self.in_flight += 1
+        submitted = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            with tracing.span("cpu", f"{self.name}:{getattr(func, '__name__', 'job')}"):
+                started, finished, result = await loop.run_in_executor(
+                    self._executor, _timed_call, func, args, kwargs
+                )
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+
+        self.queue_wait.observe((started - submitted) * 1000)
+        self.run_time.observe((finished - started) * 1000)
+        return result
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+_pools: Dict[str, WorkerPool] = {}
+
+def get_pool(name: str, **kwargs) -> WorkerPool:
+    """Get a shared pool by name, creating it on first use"""
+    if name not in _pools:
+        _pools[name] = WorkerPool(name, **kwargs)
+    return _pools[name]
+
+def shutdown_all():
+    for pool in _pools.values():
+        pool.shutdown()
+    _pools.clear()